@@ -1,21 +1,15 @@
+import io
 import PIL.Image
 import google.generativeai as genai
 import streamlit as st
 import time
 import os
-import re
-import PyPDF2  # Add this import
-import os
-import pandas
-import docx
+from uploads import CACHE_DIR, ExtractionCache
 # Configure Gemini API
 genai.configure(api_key=os.getenv('GEMINI_API'))
 genai.GenerationConfig.temperature = 0.7
 model = genai.GenerativeModel("gemini-2.0-flash", system_instruction="You are a kind assistant",)
-
-# Ensure the 'files' directory exists
-if not os.path.exists("files"):
-    os.makedirs("files")
+RENDER_INTERVAL = 0.05  # seconds between markdown re-renders while a reply streams in
 
 st.set_page_config(
     page_title="Code-GPT",
@@ -108,108 +102,101 @@ st.markdown(f"""
     </div>
     """, unsafe_allow_html=True)
 
-def sanitize_filename(filename):
-    """Sanitize filename to only contain lowercase letters, numbers, and dashes."""
-    sanitized = re.sub(r'[^a-z0-9-]', '', filename.lower())
-    sanitized = sanitized.strip('-')  # Remove leading/trailing dashes
-    return sanitized if sanitized else 'file'
-
-def save_uploaded_file(uploadedfile):
-    """Save uploaded file after sanitizing its name."""
-    safe_filename = sanitize_filename(os.path.splitext(uploadedfile.name)[0])
-    file_extension = os.path.splitext(uploadedfile.name)[1].lower()
-    full_filename = f"{safe_filename}{file_extension}"
-    file_path = os.path.join("files", full_filename)
-
-    with open(file_path, "wb") as f:
-        f.write(uploadedfile.getbuffer())
-    
-    return file_path, file_extension
+@st.cache_resource
+def extraction_cache():
+    """One cache of extracted upload text for every session"""
+    return ExtractionCache(
+        CACHE_DIR,
+        disk=os.getenv("UPLOAD_DISK_CACHE", "1") != "0",
+        max_disk_bytes=int(os.getenv("UPLOAD_CACHE_MB", "200")) * 2**20,
+        max_age_seconds=float(os.getenv("UPLOAD_CACHE_DAYS", "7")) * 86400,
+    )
+
+# extension -> (label, how the extracted content is introduced in the prompt)
+DOCUMENT_PROMPTS = {
+    ".md": ("MD", "Here's the content from the md file:"),
+    ".pdf": ("PDF", "Here's the content from the PDF:"),
+    ".csv": ("Data-set", "Here's the content of the CSV/xlsx:"),
+    ".xlsx": ("Data-set", "Here's the content of the CSV/xlsx:"),
+    ".docx": ("DOCX", "Here's the content from the DOCX file:"),
+}
 
 def chat_bro(prompt, uploadedfile, chat_history):
-    """Handles chat with optional image, PDF, or video inputs."""
+    """Handles chat with optional image, PDF, or video inputs.
+
+    Returns the streaming response and the perf_counter time the request was sent.
+    """
     input_data = [prompt, chat_history]
 
     if uploadedfile:
-        file_path, file_extension = save_uploaded_file(uploadedfile)
+        data = uploadedfile.getvalue()
+        file_extension = os.path.splitext(uploadedfile.name)[1].lower()
 
         if file_extension in ['.png', '.jpg', '.jpeg']:
-            st.image(file_path, width=400)
+            st.image(data, width=400)
             try:
-                image = PIL.Image.open(file_path)  # ✅ Open the image correctly
+                image = PIL.Image.open(io.BytesIO(data))
                 input_data.insert(1, image)  # ✅ Add image to model input
             except Exception as e:
                 st.error(f"Error opening image: {e}")
 
-        elif file_extension == ".md":
-            st.success(f"Uploaded PDF: {uploadedfile.name}")
-            try:
-                md_text = ""
-                with open(file_path, "r", encoding='utf-8') as md_file:
-                    for content in md_file:
-                        md_text += content + "\n"
-                if md_text.strip():
-                    prompt_with_md = f"Here's the content from the md file: \n\n{md_text}\n\n{prompt}"
-                    input_data[0] = prompt_with_md
-                else:
-                    st.warning("The MD appears to be empty or unreadable")
-            except Exception as e:
-                st.error(f"Error processing MD: {e}")
-        
-        elif file_extension == ".pdf":
-            st.success(f"Uploaded PDF: {uploadedfile.name}")
-            try:
-                pdf_text = ""
-                with open(file_path, "rb") as pdf_file:
-                    pdf_reader = PyPDF2.PdfReader(pdf_file)
-                    for page in pdf_reader.pages:
-                        pdf_text += page.extract_text() + "\n"
-                
-                if pdf_text.strip():
-                    prompt_with_pdf = f"Here's the content from the PDF:\n\n{pdf_text}\n\n{prompt}"
-                    input_data[0] = prompt_with_pdf
-                else:
-                    st.warning("The PDF appears to be empty or unreadable")
-            except Exception as e:
-                st.error(f"Error processing PDF: {e}")
-        
-        elif file_extension in [".csv",".xlsx"]:
-            st.success(f"Uploaded Data-set : {uploadedfile.name}")
+        elif file_extension in DOCUMENT_PROMPTS:
+            label, intro = DOCUMENT_PROMPTS[file_extension]
+            st.success(f"Uploaded {label}: {uploadedfile.name}")
             try:
-                if file_extension == ".csv":
-                    df = pandas.read_csv(file_path)
-                else:
-                    df = pandas.read_csv(file_path)
-                st.dataframe(df.head())
-                prompt_with_df = f"Here's the content of the CSV/xlsx: \n\n{df.to_string()}\n\n{prompt}"
-                input_data[0] = prompt_with_df
-
+                extracted = extraction_cache().get_or_extract(data, file_extension)
             except Exception as e:
-                st.error(f"The Dataframe is not avaliable due to: {e}")
-
-        elif file_extension == ".docx":
-            st.success(f"Uploaded DOCX: {uploadedfile.name}")
-            try:
-                doc = docx.Document(file_path)
-                docx_text = "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
-                if docx_text.strip():
-                    input_data[0] = f"Here's the content from the DOCX file:\n\n{docx_text}\n\n{prompt}"
+                st.error(f"Error processing {label}: {e}")
+            else:
+                if extracted["table"] is not None:
+                    st.dataframe(extracted["table"].head())
+                if extracted["text"].strip():
+                    input_data[0] = f"{intro}\n\n{extracted['text']}\n\n{prompt}"
                 else:
-                    st.warning("The DOCX file appears to be empty.")
-            except Exception as e:
-                st.error(f"Error reading DOCX file: {e}")
+                    st.warning(f"The {label} appears to be empty or unreadable")
 
         elif file_extension == ".mp4":
-            st.video(file_path)
-            with open(file_path, "rb") as video_file:
-                video_content = video_file.read()
-            video_data = {"mime_type": "video/mp4", "data": video_content}
+            st.video(data)
+            video_data = {"mime_type": "video/mp4", "data": data}
             input_data.insert(1, video_data)
 
-    response = model.generate_content(input_data)
-    return response.text
-
-uploaded_file = st.file_uploader("Upload an image, PDF, or video", type=["jpg", "jpeg", "png", "mp4", "pdf", ".md",".csv",".xlsx"])
+    sent = time.perf_counter()
+    response = model.generate_content(input_data, stream=True)
+    return response, sent
+
+def stream_reply(response, sent, container):
+    """Render chunks as they arrive, at most every RENDER_INTERVAL. Returns the text and latency in ms."""
+    text = ""
+    first_token = None
+    last_render = 0.0
+    try:
+        for chunk in response:
+            try:
+                piece = chunk.text
+            except ValueError:  # chunk without text, e.g. only a finish reason or safety ratings
+                continue
+            now = time.perf_counter()
+            if first_token is None:
+                first_token = now
+            text += piece
+            if now - last_render >= RENDER_INTERVAL:
+                container.markdown(text + "▌")
+                last_render = now
+    except Exception as e:
+        st.error(f"The response stopped early: {e}")
+    container.markdown(text)
+    done = time.perf_counter()
+    return text, {
+        "ttft_ms": round((first_token - sent) * 1000) if first_token else None,
+        "total_ms": round((done - sent) * 1000),
+    }
+
+def show_latency(message):
+    if message.get("total_ms") is not None:
+        ttft = message.get("ttft_ms")
+        st.caption(f"first token {ttft if ttft is not None else '-'} ms · total {message['total_ms']} ms")
+
+uploaded_file = st.file_uploader("Upload an image, PDF, or video", type=["jpg", "jpeg", "png", "mp4", "pdf", ".md",".csv",".xlsx",".docx"])
 
 user_input = st.chat_input(placeholder="Enter your message")
 
@@ -221,6 +208,7 @@ with st.container(height=400,border=False ):
     for message in st.session_state["messages"]:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
+            show_latency(message)
 
     if user_input:
         st.session_state["messages"].append({"role": "user", "content": user_input})
@@ -234,16 +222,13 @@ with st.container(height=400,border=False ):
             st.session_state["messages"].append({"role": "user", "content": f"Uploaded: {uploaded_file.name}"})
 
         with st.spinner("Bot is typing..."):
-            response_text = chat_bro(user_input, uploaded_file, chat_history)
-            with st.chat_message('assistant', avatar="ai"):
-                response_container = st.empty()
-                streamed_response = ""
-
-                for chunk in response_text:
-                    streamed_response += chunk
-                    response_container.markdown(streamed_response)
-                    time.sleep(0.01)
-
-        st.session_state["messages"].append({"role": "ai", "content": streamed_response})
+            response, sent = chat_bro(user_input, uploaded_file, chat_history)
+        with st.chat_message('assistant', avatar="ai"):
+            response_container = st.empty()
+            streamed_response, latency = stream_reply(response, sent, response_container)
+            reply = {"role": "ai", "content": streamed_response, **latency}
+            show_latency(reply)
+
+        st.session_state["messages"].append(reply)
 
 # uploaded_file = st.file_uploader("Upload an image, PDF, or video", type=["jpg", "jpeg", "png", "mp4", "pdf"])
@@ -0,0 +1,81 @@
+import io
+import os
+import re
+import time
+
+import docx
+import pandas
+import pytest
+
+from uploads import EXTRACTORS, ExtractionCache, file_digest, remove_legacy_uploads
+
+CSV = b"name,score\nada,3\nbob,5\n"
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExtractionCache(str(tmp_path / "files" / ".extract-cache"))
+
+def test_same_bytes_with_another_extension_are_extracted_again(cache):
+    as_md = cache.get_or_extract(CSV, ".md")
+    as_csv = cache.get_or_extract(CSV, ".csv")
+    assert as_md["table"] is None
+    assert list(as_csv["table"]["score"]) == [3, 5]
+    assert cache.stats()["misses"] == 2
+    assert len(os.listdir(cache.directory)) == 2
+
+def test_entries_survive_a_restart_as_json(cache):
+    cache.get_or_extract(CSV, ".csv")
+    reopened = ExtractionCache(cache.directory)
+    entry = reopened.get_or_extract(CSV, ".csv")
+    assert reopened.stats()["disk_hits"] == 1
+    assert list(entry["table"].columns) == ["name", "score"]
+    assert entry["text"] == cache.get_or_extract(CSV, ".csv")["text"]
+
+def test_prune_removes_only_cache_entries(tmp_path):
+    directory = tmp_path / "files" / ".extract-cache"
+    cache = ExtractionCache(str(directory), max_age_seconds=60)
+    keep = directory / "keepme.txt"
+    keep.write_text("not the cache's")
+    upload = tmp_path / "files" / "report.pdf"
+    upload.write_bytes(b"%PDF")
+    cache.get_or_extract(b"old", ".md")
+    old = time.time() - 3600
+    for path in (keep, upload, *directory.glob("*.json")):
+        os.utime(path, (old, old))
+    cache.get_or_extract(b"new", ".md")
+    assert sorted(p.name for p in directory.iterdir()) == sorted(["keepme.txt", f"{file_digest(b'new')}.md.json"])
+    assert upload.exists()
+
+def test_legacy_uploads_are_removed_only_on_request(tmp_path):
+    files = tmp_path / "files"
+    (files / ".extract-cache").mkdir(parents=True)
+    for name in ("report.pdf", "photo.JPG", "keepme.txt"):
+        (files / name).write_bytes(b"x")
+    assert len(remove_legacy_uploads(str(files), dry_run=True)) == 2
+    assert len(list(files.iterdir())) == 4
+    removed = remove_legacy_uploads(str(files))
+    assert sorted(os.path.basename(p) for p in removed) == ["photo.JPG", "report.pdf"]
+    assert sorted(p.name for p in files.iterdir()) == [".extract-cache", "keepme.txt"]
+
+def test_xlsx_is_read_as_a_workbook(cache):
+    buffer = io.BytesIO()
+    pandas.DataFrame({"name": ["ada", "bob"], "score": [3, 5]}).to_excel(buffer, index=False)
+    entry = cache.get_or_extract(buffer.getvalue(), ".xlsx")
+    assert list(entry["table"]["score"]) == [3, 5]
+    assert "ada" in entry["text"]
+
+def test_docx_paragraphs_are_extracted(cache):
+    document = docx.Document()
+    document.add_paragraph("First paragraph")
+    document.add_paragraph("   ")
+    document.add_paragraph("Second paragraph")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    assert cache.get_or_extract(buffer.getvalue(), ".docx")["text"] == "First paragraph\nSecond paragraph"
+
+def test_every_extractor_is_offered_by_the_uploader():
+    with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages", "gpt.py"), encoding="utf-8") as f:
+        source = f.read()
+    offered = re.search(r"st\.file_uploader\([^)]*type=\[([^\]]*)\]", source).group(1)
+    types = {"." + t.strip().strip("\"'").lstrip(".") for t in offered.split(",")}
+    assert set(EXTRACTORS) <= types
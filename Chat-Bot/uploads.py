@@ -0,0 +1,205 @@
+"""Extraction cache for uploaded documents, keyed by the SHA-256 of the upload bytes and the extension.
+
+st.file_uploader keeps its file across reruns, so every chat message used to
+re-save and re-parse the same upload. Extracted text (and the table, for
+CSV files) is now kept in an in-memory LRU and, optionally, as one JSON file
+per key in files/.extract-cache, so other sessions and restarts reuse it.
+That directory holds nothing but cache entries and is pruned by age and total
+size whenever an entry is written. Uploads saved to files/ by older versions
+are left alone unless removed once with `python uploads.py --remove-legacy-uploads`.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import PyPDF2
+import docx
+import pandas
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FILES_DIR = os.path.join(HERE, "files")
+CACHE_DIR = os.path.join(FILES_DIR, ".extract-cache")
+LEGACY_UPLOADS = (".png", ".jpg", ".jpeg", ".md", ".pdf", ".csv", ".xlsx", ".docx", ".mp4")  # what older versions saved to files/
+
+def file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+def extract_md(data):
+    return {"text": data.decode("utf-8"), "table": None}
+
+def extract_pdf(data):
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return {"text": "".join((page.extract_text() or "") + "\n" for page in reader.pages), "table": None}
+
+def extract_table(data):
+    df = pandas.read_csv(io.BytesIO(data))
+    return {"text": df.to_string(), "table": df}
+
+def extract_excel(data):
+    """First sheet of an .xlsx workbook (read with openpyxl)"""
+    df = pandas.read_excel(io.BytesIO(data), engine="openpyxl")
+    return {"text": df.to_string(), "table": df}
+
+def extract_docx(data):
+    doc = docx.Document(io.BytesIO(data))
+    return {"text": "\n".join(para.text for para in doc.paragraphs if para.text.strip()), "table": None}
+
+# extension -> extractor; each returns {"text": str, "table": DataFrame or None}
+EXTRACTORS = {
+    ".md": extract_md,
+    ".pdf": extract_pdf,
+    ".csv": extract_table,
+    ".xlsx": extract_excel,
+    ".docx": extract_docx,
+}
+
+def dump_entry(entry):
+    """JSON text of an extraction result; the table is stored in pandas' split orientation"""
+    table = entry["table"]
+    return json.dumps({"text": entry["text"], "table": None if table is None else table.to_json(orient="split")})
+
+def load_entry(text):
+    entry = json.loads(text)
+    if entry["table"] is not None:
+        entry["table"] = pandas.read_json(io.StringIO(entry["table"]), orient="split")
+    return entry
+
+class ExtractionCache:
+    """LRU of extraction results by content digest and extension, optionally backed by directory.
+
+    The directory must belong to the cache alone: pruning deletes any .json file in it.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_entries=32, disk=True, max_disk_bytes=200 * 2**20, max_age_seconds=7 * 86400):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.disk = disk
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age_seconds = max_age_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        if disk:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """Cached entry for key, or None; disk hits are promoted to memory"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits["memory"] += 1
+                return entry
+        if self.disk:
+            path = self._path(key)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    entry = load_entry(f.read())
+                os.utime(path)  # age counts from the last use
+            except (OSError, ValueError, KeyError):
+                entry = None
+            if entry is not None:
+                self.hits["disk"] += 1
+                self._remember(key, entry)
+                return entry
+        self.misses += 1
+        return None
+
+    def put(self, key, entry):
+        self._remember(key, entry)
+        if not self.disk:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(dump_entry(entry))
+        os.replace(tmp, path)
+        self.prune(keep=path)
+
+    def get_or_extract(self, data, extension):
+        """Extraction result for the upload bytes, parsing them only on a miss.
+
+        The same bytes parse differently as .md and .csv, so the extension is part of the key.
+        """
+        key = f"{file_digest(data)}{extension}"
+        entry = self.get(key)
+        if entry is None:
+            entry = EXTRACTORS[extension](data)
+            self.put(key, entry)
+        return entry
+
+    def prune(self, keep=None):
+        """Delete entries older than max_age_seconds, then the oldest until the cache fits max_disk_bytes.
+
+        Only the .json entries put() writes are considered. Returns the number of files removed.
+        """
+        now = time.time()
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            if os.path.isfile(path):
+                files.append((info.st_mtime, info.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for mtime, size, path in files:
+            if path == keep or (now - mtime <= self.max_age_seconds and total <= self.max_disk_bytes):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "memory_hits": self.hits["memory"], "disk_hits": self.hits["disk"], "misses": self.misses}
+
+def remove_legacy_uploads(directory=FILES_DIR, dry_run=False):
+    """Delete uploads that older versions of the chat page saved to directory; returns their paths.
+
+    Only top-level files with an upload extension go; anything else is kept.
+    """
+    removed = []
+    if not os.path.isdir(directory):
+        return removed
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path) and os.path.splitext(name)[1].lower() in LEGACY_UPLOADS:
+            if not dry_run:
+                os.remove(path)
+            removed.append(path)
+    return removed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="One-off clean-up of uploads saved by older versions of the chat page")
+    parser.add_argument("--remove-legacy-uploads", metavar="DIR", nargs="?", const=FILES_DIR, required=True,
+                        help=f"Directory the uploads were saved to (default {FILES_DIR})")
+    parser.add_argument("--dry-run", action="store_true", help="List the files without deleting them")
+    args = parser.parse_args()
+    for path in remove_legacy_uploads(args.remove_legacy_uploads, args.dry_run):
+        print(("would remove " if args.dry_run else "removed ") + path)
@@ -1,132 +1,86 @@
 # app.py
 import streamlit as st
-import random
-import heapq
 import time
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
 
-# --- basic setup ---
-st.set_page_config(page_title="A* Maze (11x11)", page_icon="🧭", layout="centered")
+import numpy as np
 
-N = 11
-start = (0, 0)
-goal = (N - 1, N - 1)
+from cache import BoundedCache
+from render import render_frame, state_array
+from mazegen import GENERATORS, generate
+from incremental import LPAStar
+from precompute import MazeIndex, distance_field
+from replay import TracePlayer, export_gif, export_mp4, record
+from search import ENGINES, astar
 
-def make_grid(n, wall_p=0.25):
-    g = [[1 if random.random() < wall_p else 0 for _ in range(n)] for _ in range(n)]
-    g[start[0]][start[1]] = 0
-    g[goal[0]][goal[1]] = 0
-    return g
-
-def h(a, b):
-    # Manhattan distance
-    return abs(a[0] - b[0]) + abs(a[1] - b[1])
-
-def neighbors(r, c, n):
-    for dr, dc in ((1,0),(-1,0),(0,1),(0,-1)):
-        nr, nc = r + dr, c + dc
-        if 0 <= nr < n and 0 <= nc < n:
-            yield nr, nc
-
-def draw_grid(grid, path=set(), open_set=set(), closed_set=set(), current=None, placeholder=None):
-    n = len(grid)
-    fig, ax = plt.subplots(figsize=(5, 5))
-    ax.set_xlim(0, n)
-    ax.set_ylim(0, n)
-    ax.set_aspect("equal")
-    ax.axis("off")
-
-    for r in range(n):
-        for c in range(n):
-            # base color
-            if grid[r][c] == 1:
-                color = "#111827"  # wall
-            else:
-                color = "#e5e7eb"  # empty
-
-            cell = (r, c)
-            if cell in closed_set:
-                color = "#fb923c"  # closed (orange)
-            if cell in open_set:
-                color = "#38bdf8"  # open (sky)
-            if cell in path:
-                color = "#22c55e"  # path (green)
-            if cell == current:
-                color = "#f59e0b"  # current (amber)
-            if cell == start:
-                color = "#a78bfa"  # start (violet)
-            if cell == goal:
-                color = "#ef4444"  # goal (red)
-
-            ax.add_patch(Rectangle((c, n - r - 1), 1, 1, facecolor=color, edgecolor="#9ca3af", linewidth=0.75))
-
-    # grid lines (subtle)
-    for i in range(n + 1):
-        ax.plot([0, n], [i, i], color="#d1d5db", linewidth=0.3)
-        ax.plot([i, i], [0, n], color="#d1d5db", linewidth=0.3)
-
-    if placeholder:
-        placeholder.pyplot(fig, clear_figure=True)
-    else:
-        st.pyplot(fig, clear_figure=True)
-    plt.close(fig)
-
-def reconstruct(came_from, current):
-    path = [current]
-    while current in came_from:
-        current = came_from[current]
-        path.append(current)
-    path.reverse()
-    return path
-
-def astar_with_visuals(grid, start, goal, delay_ms=80, placeholder=None):
-    n = len(grid)
-    open_heap = []
-    heapq.heappush(open_heap, (h(start, goal), 0, start))
-    came_from = {}
-    g_score = {start: 0}
-    open_set = {start}
-    closed_set = set()
-
-    while open_heap:
-        _, g, current = heapq.heappop(open_heap)
-        if current not in open_set:
-            continue
-        open_set.remove(current)
-
-        if current == goal:
-            path = set(reconstruct(came_from, current))
-            draw_grid(grid, path=path, open_set=open_set, closed_set=closed_set, current=current, placeholder=placeholder)
-            return list(path)
-
-        closed_set.add(current)
-
-        # draw each step
-        draw_grid(grid, path=set(), open_set=open_set, closed_set=closed_set, current=current, placeholder=placeholder)
+# --- basic setup ---
+st.set_page_config(page_title="A* Maze", page_icon="🧭", layout="centered")
+
+MIN_N, MAX_N, DEFAULT_N = 5, 1000, 11
+MAX_PLAY_FRAMES = 400  # playback skips steps on longer traces
+RANDOM_EDITS = 5
+CACHE_MAX_MB = 512  # shared by all sessions of this server
+ENGINE_LABELS = {
+    "astar": "A*",
+    "jps": "Jump Point Search",
+    "bidirectional": "Bidirectional A*",
+    "bfs": "BFS",
+}
+GENERATOR_LABELS = {
+    "random": "Random walls",
+    "backtracker": "Perfect maze (backtracker)",
+    "kruskal": "Perfect maze (Kruskal)",
+}
+
+@st.cache_resource
+def shared_cache():
+    return BoundedCache(CACHE_MAX_MB * 1024 * 1024)
+
+def memo(kind, key, create):
+    """Shared-cache lookup under (kind, *key); edited grids have no key and are never cached"""
+    return create() if key is None else shared_cache().get_or_create((kind,) + key, create)
+
+def make_grid(n, wall_p=0.25, kind="random", seed=None):
+    return generate(kind, n, n, wall_p, seed)
+
+def make_index(grid):
+    index = MazeIndex(grid)
+    index.labels  # label now, so the cache sees its real size
+    return index
+
+def goal_field(index, grid_key, goal):
+    """Distance field to goal. For an unedited maze it is a cache entry of its own, so its bytes
+    count toward CACHE_MAX_MB; the shared index is sized once, when it is stored, and never grows."""
+    if grid_key is None:
+        return index.field(goal)
+    return memo("field", grid_key + (goal,), lambda: distance_field(index.grid, goal))
+
+def draw_grid(grid, path=set(), open_set=set(), closed_set=set(), current=None, placeholder=None, key=None):
+    frame = memo("frame", key, lambda: render_frame(state_array(grid, path, open_set, closed_set, current, start, goal)))
+    (placeholder or st).image(frame)
+
+def play(player, first, delay_ms, placeholder):
+    """Show frames first..last in the placeholder, delay_ms apart"""
+    last = player.frame_count - 1
+    stride = max(1, -(-(last - first) // MAX_PLAY_FRAMES))
+    for frame in [*range(first, last, stride), last]:
+        placeholder.image(player.frame(frame))
         time.sleep(max(0, delay_ms) / 1000.0)
 
-        r, c = current
-        for nr, nc in neighbors(r, c, n):
-            if grid[nr][nc] == 1:
-                continue
-            nxt = (nr, nc)
-            if nxt in closed_set:
-                continue
-            tentative_g = g + 1
-            if tentative_g < g_score.get(nxt, float("inf")):
-                came_from[nxt] = current
-                g_score[nxt] = tentative_g
-                f = tentative_g + h(nxt, goal)
-                heapq.heappush(open_heap, (f, tentative_g, nxt))
-                open_set.add(nxt)
-
-    # no path
-    draw_grid(grid, placeholder=placeholder)
-    return None
+def export_fps(delay_ms):
+    return max(1, min(50, 1000 // max(1, delay_ms)))
 
 # --- UI ---
-st.title("A* Pathfinding on a Random 11×11 Maze")
+N = st.sidebar.number_input("Grid size (N×N)", MIN_N, MAX_N, DEFAULT_N, 1)
+maze_kind = st.sidebar.selectbox("Maze generator", list(GENERATORS), format_func=GENERATOR_LABELS.get,
+                                 help="Perfect mazes always have exactly one path and ignore the wall density.")
+engine = st.sidebar.selectbox("Search engine", list(ENGINES), format_func=ENGINE_LABELS.get)
+exact_h = st.sidebar.checkbox("Exact heuristic", value=False, disabled=engine != "astar",
+                              help="A* guided by a cached BFS distance field to the goal: expands only the path.")
+animate = st.sidebar.checkbox("Animate search", value=N <= 51, help="Plays the recorded search after each run.")
+start = (0, 0)
+goal = (N - 1, N - 1)
+
+st.title(f"{ENGINE_LABELS[engine]} Pathfinding on a Random {N}×{N} Maze")
 col1, col2, col3 = st.columns(3)
 with col1:
     wall_p = st.slider("Wall density", 0.0, 0.45, 0.25, 0.01)
@@ -135,25 +89,136 @@ with col2:
 with col3:
     seed_val = st.number_input("Seed (optional)", value=0, step=1)
 
-btns = st.columns(2)
+btns = st.columns(3)
 new_maze = btns[0].button("New maze")
-run = btns[1].button("Run A*")
-
-if new_maze and seed_val:
-    random.seed(int(seed_val))
-
-if "grid" not in st.session_state or new_maze:
-    st.session_state.grid = make_grid(N, wall_p)
+run = btns[1].button(f"Run {ENGINE_LABELS[engine]}")
+replay_slot = btns[2].empty()  # filled after Run is handled, so Replay is enabled as soon as a trace exists
+
+with st.expander("Edit walls"):
+    ec = st.columns(3)
+    edit_r = ec[0].number_input("Row", 0, N - 1, 0)
+    edit_c = ec[1].number_input("Column", 0, N - 1, 0)
+    toggle = ec[2].button("Toggle wall")
+    scatter = st.button(f"Toggle {RANDOM_EDITS} random cells")
+
+# a maze is a pure function of (generator, seed, density, N); without a seed, New maze draws one
+if new_maze or "maze_seed" not in st.session_state:
+    st.session_state.maze_seed = int(np.random.default_rng().integers(1, 2**31))
+seed = int(seed_val) or st.session_state.maze_seed
+maze_key = (maze_kind, seed, wall_p if maze_kind == "random" else None, N)
+
+if new_maze or st.session_state.get("maze_key") != maze_key:
+    st.session_state.grid = memo("grid", maze_key, lambda: make_grid(N, wall_p, maze_kind, seed))
+    st.session_state.maze_key = maze_key
+    st.session_state.edited = False
+    st.session_state.index = memo("index", maze_key, lambda: make_index(st.session_state.grid))
+    st.session_state.pop("player", None)
+    st.session_state.pop("rejected", None)
+    st.session_state.pop("planner", None)
+    st.session_state.pop("replan", None)
+
+if toggle or scatter:
+    grid = st.session_state.grid
+    if not grid.flags.writeable:
+        grid = st.session_state.grid = grid.copy()  # the cached maze is shared; edit a private copy
+    st.session_state.edited = True
+    if toggle:
+        cells = {(int(edit_r), int(edit_c))}
+    else:
+        cells = {tuple(int(v) for v in divmod(i, N)) for i in np.random.default_rng().choice(N * N, RANDOM_EDITS, replace=False)}
+    cells -= {start, goal}
+    # the planner keeps its search between edits, so only the affected region is expanded again
+    planner = st.session_state.get("planner")
+    if planner is None:
+        planner = st.session_state.planner = LPAStar(grid, start, goal)
+        planner.compute()
+    for cell in cells:
+        grid[cell] ^= 1
+    planner.set_walls({cell: int(grid[cell]) for cell in cells})
+    path, stats = planner.compute()
+    st.session_state.replan = {"path": path, "edits": len(cells), "lpa": stats, "full": astar(grid, start, goal)[1]}
+    st.session_state.index = MazeIndex(grid)
+    st.session_state.pop("player", None)
+    st.session_state.pop("rejected", None)
 
 placeholder = st.empty()
-draw_grid(st.session_state.grid, placeholder=placeholder)
 
+index = st.session_state.index
+grid_key = None if st.session_state.edited else maze_key
 if run:
-    path = astar_with_visuals(st.session_state.grid, start, goal, delay_ms=delay_ms, placeholder=placeholder)
-    if path is None:
+    st.session_state.pop("replan", None)
+    st.session_state.pop("player", None)
+    # components are labelled once per maze, so an impossible pair costs no search at all
+    st.session_state.rejected = not index.connected(start, goal)
+    if not st.session_state.rejected:
+        use_field = engine == "astar" and exact_h
+        options = {"heuristic": goal_field(index, grid_key, goal)} if use_field else {}
+        st.session_state.trace_key = None if grid_key is None else grid_key + (engine, use_field)
+        # search once, headless; every frame afterwards comes from the trace
+        st.session_state.player = memo("trace", st.session_state.trace_key, lambda: TracePlayer(
+            st.session_state.grid, record(st.session_state.grid, start, goal, engine, **options)))
+        st.session_state.exports = {}
+        st.session_state.frame = 0
+
+replay = replay_slot.button("Replay", key="replay", disabled="player" not in st.session_state)
+player = st.session_state.get("player")
+replan = st.session_state.get("replan")
+if player is None and replan is not None:
+    draw_grid(st.session_state.grid, path=replan["path"] or (), placeholder=placeholder)
+    if replan["path"] is None:
+        st.warning("The edits cut the goal off from the start.")
+    else:
+        st.success(f"Path length: {len(replan['path'])}")
+    lpa, full = replan["lpa"], replan["full"]
+    st.caption(f"Replanned after {replan['edits']} edit(s): LPA* re-expanded {lpa['expanded']:,} cells in {lpa['elapsed_ms']:.1f} ms; "
+               f"a full A* re-solve expands {full['expanded']:,} cells ({full['elapsed_ms']:.1f} ms).")
+elif player is None:
+    draw_grid(st.session_state.grid, placeholder=placeholder, key=grid_key)
+    if st.session_state.get("rejected"):
+        st.warning(f"No path: start and goal are in different regions ({index.regions:,} regions). "
+                   "Try a lower wall density or generate a new maze.")
+else:
+    last = player.frame_count - 1
+    if (run and animate) or replay:
+        first = st.session_state.get("frame", 0)
+        play(player, 0 if run or first >= last else first, delay_ms, placeholder)
+    if run or replay:
+        st.session_state.frame = last
+    st.session_state.frame = min(st.session_state.get("frame", last), last)
+    frame = st.slider("Step", 0, last, key="frame", help="Scrub through the recorded search; the last step shows the path.")
+    trace_key = st.session_state.trace_key
+    placeholder.image(memo("frame", trace_key and trace_key + (frame,), lambda: player.frame(frame)))
+
+    trace = player.trace
+    if trace.path is None:
         st.warning("No path found. Try a lower wall density or generate a new maze.")
     else:
-        st.success(f"Path length: {len(path)}")
+        st.success(f"Path length: {len(trace.path)}")
+    stats = trace.stats
+    st.caption(f"{ENGINE_LABELS[trace.engine]}: expanded {stats['expanded']:,} cells, peak open list {stats['peak_open']:,}, "
+               f"search {stats['elapsed_ms']:.1f} ms, trace {trace.nbytes / 1024:,.0f} KiB. "
+               f"Distance fields reused: {index.hits if grid_key is None else shared_cache().hits['field']}.")
+
+    # encode each export once per trace and speed, shared across sessions when the maze is unedited
+    fps = export_fps(delay_ms)
+    exports = st.session_state.exports
+    ex = st.columns(2)
+    for col, fmt, encode, mime in ((ex[0], "gif", export_gif, "image/gif"), (ex[1], "mp4", export_mp4, "video/mp4")):
+        key = (fmt, fps)
+        data = exports.get(key) if trace_key is None else shared_cache().peek(("export",) + trace_key + key)
+        if data is None and col.button(f"Export {fmt.upper()} ({fps} fps)"):
+            try:
+                data = memo("export", trace_key and trace_key + key, lambda: encode(player, fps))
+                exports[key] = data
+            except ImportError:
+                col.error("MP4 export needs imageio and imageio-ffmpeg.")
+        if data is not None:
+            col.download_button(f"Download {fmt.upper()}", data, f"{trace.engine}.{fmt}", mime)
+
+stats = shared_cache().stats()
+hit_rate = f"{stats['hit_rate']:.0%}" if stats["hit_rate"] is not None else "–"
+st.sidebar.caption(f"Maze seed {seed}{' (edited)' if st.session_state.edited else ''}. Shared cache: {stats['entries']} entries, "
+                   f"{stats['bytes'] / 2**20:,.1f} of {CACHE_MAX_MB} MB, hit rate {hit_rate}, {stats['evictions']} evictions.")
 
 # Tip text
-st.caption("Start: top-left. Goal: bottom-right. A* uses Manhattan distance.")
+st.caption("Start: top-left. Goal: bottom-right. A* variants use Manhattan distance; JPS expands only jump points.")
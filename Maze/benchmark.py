@@ -0,0 +1,260 @@
+# benchmark.py
+"""Headless pathfinding benchmark with a regression gate.
+
+    python benchmark.py                                  # full sweep, compare with the baseline
+    python benchmark.py --sizes 11 101 501 --engines astar jps
+    python benchmark.py --generators random --densities 0.1 0.3 0.4
+    python benchmark.py --update-baseline                # accept the current numbers
+
+Generates a seeded maze for every generator, wall density and size, and
+solves it from the top-left to the bottom-right corner with each search
+engine. Random-wall mazes whose corners are disconnected are redrawn with
+the next seed, so every case is a real search; the seed used is recorded. Each run records the best wall time of --repeat runs, the nodes
+expanded, the peak traced memory (tracemalloc, in a separate untimed run,
+up to --memory-max-size) and whether the path is valid and as short as a
+plain BFS distance field.
+Results go to results.csv and results.json, with summary plots
+(matplotlib), in --output-dir. The run exits with status 1 if a case
+expands more than --threshold beyond the baseline or stops being optimal;
+both are deterministic for a seed. Timings only compare meaningfully on
+the machine that recorded the baseline, so slower cases are printed as
+advisory warnings; --gate-timing fails on them too, above TIMING_FLOOR_MS.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from mazegen import GENERATORS, generate
+from precompute import MazeIndex, distance_field
+from search import ENGINES, solve
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, "benchmarks", "baseline.json")
+RESULTS_DIR = os.path.join(HERE, "benchmarks", "results")
+TIMING_FLOOR_MS = 50  # with --gate-timing, slowdowns smaller than this never fail the run
+MEMORY_MAX_SIZE = 501  # tracemalloc slows the pure-Python searches 20-30x; 2000x2000 BFS takes minutes under it
+MAX_REDRAWS = 50  # seeds tried per random-wall case before it is skipped
+PERFECT = ("backtracker", "kruskal")  # generators that ignore density
+FIELDS = [
+    "generator", "density", "size", "seed", "engine", "time_ms", "expanded", "pushed",
+    "peak_open", "peak_kib", "path_length", "bfs_length", "valid", "optimal",
+]
+
+def cases(generators, densities, sizes):
+    """(generator, density, size) for every maze in the sweep; perfect mazes get one density, None"""
+    for kind in generators:
+        for density in ([None] if kind in PERFECT else densities):
+            for size in sizes:
+                yield kind, density, size
+
+def connected_maze(kind, size, density, seed):
+    """(grid, seed) of the first maze from seed onwards whose corners connect, or (None, None)"""
+    for attempt in range(seed, seed + MAX_REDRAWS):
+        grid = generate(kind, size, size, density, attempt)
+        if MazeIndex(grid).connected((0, 0), (size - 1, size - 1)):
+            return grid, attempt
+    return None, None
+
+def valid_path(grid, path, start, goal):
+    """path runs from start to goal through open cells in 4-connected unit steps"""
+    if path is None:
+        return True
+    if tuple(path[0]) != start or tuple(path[-1]) != goal:
+        return False
+    cells = np.asarray(path)
+    steps = np.abs(np.diff(cells, axis=0)).sum(axis=1)
+    return bool((steps == 1).all() and not grid[cells[:, 0], cells[:, 1]].any())
+
+def bench_engine(engine, grid, start, goal, repeat, trace_memory=True):
+    """Best-of-repeat time and stats of one engine on one maze, plus peak traced memory (None if not traced)"""
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        path, stats = solve(grid, start, goal, engine)
+        elapsed = (time.perf_counter() - t0) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+
+    # tracemalloc slows allocation down, so memory gets its own run
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            solve(grid, start, goal, engine)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return path, {
+        "time_ms": round(best, 3),
+        "expanded": stats["expanded"],
+        "pushed": stats["pushed"],
+        "peak_open": stats["peak_open"],
+        "peak_kib": None if peak is None else round(peak / 1024, 1),
+        "path_length": stats["path_length"],
+    }
+
+def run(generators, densities, sizes, engines, repeat, seed, memory_max_size=MEMORY_MAX_SIZE):
+    rows = []
+    print(f'{"generator":<12}{"density":>8}{"size":>6}  {"engine":<14}{"ms":>10}{"expanded":>11}{"peak KiB":>10}  optimal')
+    for kind, density, size in cases(generators, densities, sizes):
+        grid, used = connected_maze(kind, size, density, seed)
+        if grid is None:
+            print(f"SKIPPED {kind}/{density}/{size}: corners disconnected for seeds {seed}-{seed + MAX_REDRAWS - 1}")
+            continue
+        start, goal = (0, 0), (size - 1, size - 1)
+        bfs_length = distance_field(grid, goal)[0] + 1  # cells on a shortest path, 0 when unreachable
+        for engine in engines:
+            path, row = bench_engine(engine, grid, start, goal, repeat, size <= memory_max_size)
+            row = {"generator": kind, "density": density, "size": size, "seed": used, "engine": engine, **row}
+            row["bfs_length"] = bfs_length
+            row["valid"] = valid_path(grid, path, start, goal)
+            row["optimal"] = row["valid"] and row["path_length"] == bfs_length
+            rows.append(row)
+            shown = ["-" if value is None else value for value in (density, row["peak_kib"])]
+            print(f'{kind:<12}{shown[0]:>8}{size:>6}  {engine:<14}{row["time_ms"]:>10}{row["expanded"]:>11}{shown[1]:>10}  {row["optimal"]}')
+    return rows
+
+def case_key(row):
+    return row["generator"], row["density"], row["size"], row["engine"]
+
+def compare(rows, baseline, threshold, gate_timing=False):
+    """Human-readable (regressions, advisories) of rows against the baseline's rows.
+
+    Optimality and expansions always gate; time only with gate_timing, beyond TIMING_FLOOR_MS.
+    """
+    before = {case_key(row): row for row in baseline.get("results", [])}
+    limit = 1 + threshold
+    problems, advisories = [], []
+    for now in rows:
+        old = before.get(case_key(now))
+        if not old:
+            continue
+        kind, density, size, engine = case_key(now)
+        where = f"{kind}/{density if density is not None else '-'}/{size}/{engine}"
+        if old.get("seed", now["seed"]) != now["seed"]:
+            problems.append(f"{where}: connected maze at seed {now['seed']}, baseline {old['seed']}")
+            continue  # a different maze; its counts don't compare
+        if old["optimal"] and not now["optimal"]:
+            problems.append(f"{where}: path of {now['path_length']} cells, BFS finds {now['bfs_length']}")
+        if now["expanded"] > old["expanded"] * limit:
+            problems.append(f"{where}: expanded {now['expanded']} vs baseline {old['expanded']}")
+        if now["time_ms"] > old["time_ms"] * limit:
+            slower = f"{where}: time_ms {now['time_ms']} vs baseline {old['time_ms']}"
+            if gate_timing and now["time_ms"] - old["time_ms"] > TIMING_FLOOR_MS:
+                problems.append(slower)
+            else:
+                advisories.append(slower)
+    return problems, advisories
+
+def write_csv(rows, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def plot(rows, output_dir):
+    """One PNG per metric: the metric against grid size, a panel per maze kind, a line per engine"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    mazes = list(dict.fromkeys((row["generator"], row["density"]) for row in rows))
+    engines = list(dict.fromkeys(row["engine"] for row in rows))
+    written = []
+    for metric, label in (("time_ms", "wall time (ms)"), ("expanded", "nodes expanded"), ("peak_kib", "peak memory (KiB)")):
+        fig, axes = plt.subplots(1, len(mazes), figsize=(4 * len(mazes), 3.6), squeeze=False, sharey=True)
+        for ax, (kind, density) in zip(axes[0], mazes):
+            for engine in engines:
+                points = [(row["size"], row[metric]) for row in rows
+                          if (row["generator"], row["density"], row["engine"]) == (kind, density, engine) and row[metric] is not None]
+                if points:
+                    xs, ys = zip(*sorted(points))
+                    ax.plot(xs, [max(y, 1e-3) for y in ys], marker="o", label=engine)
+            ax.set_title(kind if density is None else f"{kind}, {density:.0%} walls")
+            ax.set_xscale("log")
+            ax.set_yscale("log")
+            ax.set_xlabel("grid size N (N×N)")
+            ax.grid(True, which="both", alpha=0.3)
+        axes[0][0].set_ylabel(label)
+        axes[0][-1].legend()
+        fig.tight_layout()
+        path = os.path.join(output_dir, f"{metric}.png")
+        fig.savefig(path, dpi=100)
+        plt.close(fig)
+        written.append(path)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[11, 101, 501, 1001, 2000], help="Grid sizes N, for N×N mazes")
+    parser.add_argument("--densities", nargs="+", type=float, default=[0.1, 0.25, 0.35], help="Wall densities for the random generator")
+    parser.add_argument("--generators", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the fastest counts")
+    parser.add_argument("--memory-max-size", type=int, default=MEMORY_MAX_SIZE, help="Largest N whose peak memory is traced")
+    parser.add_argument("--seed", type=int, default=1, help="Maze seed, the same for every case")
+    parser.add_argument("--output-dir", default=RESULTS_DIR, help="Where to write CSV, JSON and plots")
+    parser.add_argument("--no-plots", action="store_true", help="Skip the matplotlib summary plots")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed increase as a fraction, e.g. 0.25 = 25%%")
+    parser.add_argument("--gate-timing", action="store_true", help=f"Also fail on cases slower by over --threshold and {TIMING_FLOOR_MS} ms")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results to the baseline file")
+    args = parser.parse_args()
+
+    rows = run(args.generators, args.densities, args.sizes, args.engines, args.repeat, args.seed, args.memory_max_size)
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "memory_max_size": args.memory_max_size,
+        },
+        "results": rows,
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    with open(os.path.join(args.output_dir, "results.json"), "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+    write_csv(rows, os.path.join(args.output_dir, "results.csv"))
+    if not args.no_plots:
+        plots = plot(rows, args.output_dir)
+        print(f"Plots: {', '.join(plots)}")
+
+    not_optimal = [row for row in rows if not row["optimal"]]
+    for row in not_optimal:
+        print(f"NOT OPTIMAL {row['generator']}/{row['density']}/{row['size']}/{row['engine']}: "
+              f"{row['path_length']} cells, BFS finds {row['bfs_length']}, valid={row['valid']}")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Baseline updated: {args.baseline}")
+        return 1 if not_optimal else 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with; run with --update-baseline to record one.")
+        return 1 if not_optimal else 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    problems, advisories = compare(rows, baseline, args.threshold, args.gate_timing)
+    for advisory in advisories:
+        print(f"SLOWER (advisory) {advisory}")
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    if not problems:
+        print(f"No regressions beyond {args.threshold:.0%} of the baseline.")
+    return 1 if problems or not_optimal else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
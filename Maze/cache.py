@@ -0,0 +1,91 @@
+# cache.py
+"""Size-bounded LRU shared by every session of the app.
+
+Keys are tuples whose first item names the kind of entry ("grid",
+"trace", "frame", ...), so hit statistics can be split by kind. NumPy
+arrays are made read-only on the way in: a cached grid is shared, and
+anyone who wants to edit it has to copy it first.
+"""
+import sys
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+def sizeof(value):
+    """Approximate bytes held by a cached value"""
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+class BoundedCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = 0
+
+    def peek(self, key, default=None):
+        """Look up without touching the LRU order or the statistics"""
+        with self._lock:
+            entry = self._entries.get(key)
+        return default if entry is None else entry[0]
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses[key[0]] += 1
+                return default
+            self.hits[key[0]] += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        """Store value, evicting least recently used entries past max_bytes. Returns value."""
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+        nbytes = sizeof(value)
+        if nbytes > self.max_bytes:
+            return value  # would evict everything else
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, (_, size) = self._entries.popitem(last=False)
+                self._bytes -= size
+                self.evictions += 1
+        return value
+
+    def get_or_create(self, key, create):
+        """Cached value for key, or create() stored under it. Concurrent misses may both call create()."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, create())
+        return value
+
+    def stats(self):
+        with self._lock:
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+                "evictions": self.evictions,
+                "by_kind": {kind: (self.hits[kind], self.misses[kind]) for kind in sorted(set(self.hits) | set(self.misses))},
+            }
@@ -0,0 +1,138 @@
+# incremental.py
+"""Incremental replanning with Lifelong Planning A* (LPA*).
+
+LPA* keeps its g/rhs values between searches. After walls change, only
+the cells whose shortest distance actually changed are expanded again,
+instead of repeating the whole search. Start and goal stay fixed; this is
+the fixed-start form of D* Lite.
+"""
+import heapq
+import time
+from array import array
+
+import numpy as np
+
+class LPAStar:
+    """Replanner for one grid: call compute(), then set_walls() + compute() after each edit"""
+
+    def __init__(self, grid, start, goal):
+        walls = np.asarray(grid, dtype=bool)
+        self.rows, self.cols = walls.shape
+        self.n = n = self.rows * self.cols
+        self.inf = n + 1  # longer than any path
+        self.blocked = bytearray(walls.reshape(-1).view(np.uint8))
+        self.start = start[0] * self.cols + start[1]
+        self.goal = goal[0] * self.cols + goal[1]
+        self.g = array("l", [self.inf]) * n
+        self.rhs = array("l", [self.inf]) * n
+        self.queued = [-1] * n  # key each cell is queued under, -1 if none (keys outgrow 64 bits)
+        self.heap = []
+        self.pushes = 0
+        self.peak = 0  # largest heap size seen during the current compute()
+        self.expanded_total = 0
+        self.searches = 0
+        self.rhs[self.start] = 0
+        self._queue(self.start)
+
+    def _neighbors(self, u):
+        r, c = divmod(u, self.cols)
+        out = []
+        if r:
+            out.append(u - self.cols)
+        if r < self.rows - 1:
+            out.append(u + self.cols)
+        if c:
+            out.append(u - 1)
+        if c < self.cols - 1:
+            out.append(u + 1)
+        return out
+
+    def _key(self, u):
+        """[min(g, rhs) + h, min(g, rhs)] and the cell, packed into one int"""
+        m = min(self.g[u], self.rhs[u])
+        r, c = divmod(u, self.cols)
+        gr, gc = divmod(self.goal, self.cols)
+        return ((m + abs(r - gr) + abs(c - gc)) * (self.inf + 1) + m) * self.n + u
+
+    def _queue(self, u):
+        key = self._key(u)
+        self.queued[u] = key
+        heapq.heappush(self.heap, key)
+        self.pushes += 1
+        if len(self.heap) > self.peak:
+            self.peak = len(self.heap)
+
+    def _update(self, u):
+        g, rhs = self.g, self.rhs
+        if u != self.start:
+            best = self.inf
+            if not self.blocked[u]:
+                for v in self._neighbors(u):
+                    if not self.blocked[v] and g[v] + 1 < best:
+                        best = g[v] + 1
+            rhs[u] = best
+        self.queued[u] = -1  # any heap entry left for u is now stale
+        if g[u] != rhs[u]:
+            self._queue(u)
+
+    def set_walls(self, changes):
+        """Apply {(row, col): is_wall} edits; returns how many cells actually changed"""
+        changed = 0
+        for (r, c), wall in changes.items():
+            u = r * self.cols + c
+            if u in (self.start, self.goal) or self.blocked[u] == bool(wall):
+                continue
+            self.blocked[u] = bool(wall)
+            changed += 1
+            self._update(u)
+            for v in self._neighbors(u):
+                self._update(v)
+        return changed
+
+    def compute(self):
+        """Repair the search until the goal is consistent. Returns (path, stats) like search engines."""
+        t0 = time.perf_counter()
+        g, rhs, heap, queued, n = self.g, self.rhs, self.heap, self.queued, self.n
+        expanded, pushes = 0, self.pushes
+        self.peak = len(heap)  # includes entries queued by set_walls() since the last compute()
+        while heap:
+            top = heap[0]
+            u = top % n
+            if queued[u] != top:
+                heapq.heappop(heap)  # stale
+                continue
+            if top // n >= self._key(self.goal) // n and rhs[self.goal] == g[self.goal]:
+                break
+            heapq.heappop(heap)
+            queued[u] = -1
+            expanded += 1
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+            else:
+                g[u] = self.inf
+                self._update(u)
+            for v in self._neighbors(u):
+                self._update(v)
+        self.expanded_total += expanded
+        self.searches += 1
+        path = self.path()
+        return path, {
+            "expanded": expanded,
+            "pushed": self.pushes - pushes,
+            "peak_open": self.peak,
+            "elapsed_ms": round((time.perf_counter() - t0) * 1000, 3),
+            "path_length": len(path) if path else 0,
+        }
+
+    def path(self):
+        """Follow decreasing g from the goal back to the start, or None"""
+        g = self.g
+        if g[self.goal] >= self.inf:
+            return None
+        u = self.goal
+        cells = [u]
+        while u != self.start:
+            u = min((v for v in self._neighbors(u) if not self.blocked[v]), key=g.__getitem__)
+            cells.append(u)
+        cells.reverse()
+        return [divmod(u, self.cols) for u in cells]
@@ -0,0 +1,117 @@
+# mazegen.py
+"""Maze generators. Each returns a uint8 array with 1 for walls, and
+leaves the top-left start and bottom-right goal open.
+
+Perfect mazes (backtracker, kruskal) carve passages between the cells at
+even coordinates, so every open cell is reachable from every other by
+exactly one path. Randomness comes from a seeded numpy.random.Generator,
+so the same seed always gives the same maze.
+"""
+from array import array
+
+import numpy as np
+
+def _open_corner(grid, r, c):
+    """Open (r, c) and, if it lies off the passage lattice, a dead-end link back to it"""
+    grid[r - r % 2:r + 1, c] = 0
+    grid[r - r % 2, c - c % 2:c + 1] = 0
+
+def _finish(grid):
+    rows, cols = grid.shape
+    _open_corner(grid, 0, 0)
+    _open_corner(grid, rows - 1, cols - 1)
+    return grid
+
+def random_walls(rows, cols, density=0.25, seed=None):
+    """i.i.d. walls with probability density; may leave start and goal disconnected"""
+    rng = np.random.default_rng(seed)
+    grid = (rng.random((rows, cols)) < density).astype(np.uint8)
+    grid[0, 0] = grid[-1, -1] = 0
+    return grid
+
+def recursive_backtracker(rows, cols, density=None, seed=None):
+    """Perfect maze by randomized depth-first search, with an explicit stack.
+
+    Long, winding corridors with few branches. density is ignored.
+    """
+    rng = np.random.default_rng(seed)
+    lr, lc = (rows + 1) // 2, (cols + 1) // 2  # passage lattice
+    visited = bytearray(lr * lc)
+    draws = rng.random(lr * lc).tolist()
+    carved = array("l")  # grid flat indices of opened walls
+    visited[0] = 1
+    stack = [0]
+    d = 0
+    while stack:
+        k = stack[-1]
+        i, j = divmod(k, lc)
+        options = []
+        if i and not visited[k - lc]:
+            options.append(k - lc)
+        if i < lr - 1 and not visited[k + lc]:
+            options.append(k + lc)
+        if j and not visited[k - 1]:
+            options.append(k - 1)
+        if j < lc - 1 and not visited[k + 1]:
+            options.append(k + 1)
+        if not options:
+            stack.pop()
+            continue
+        nxt = options[int(draws[d] * len(options))]
+        d += 1
+        visited[nxt] = 1
+        stack.append(nxt)
+        ni, nj = divmod(nxt, lc)
+        carved.append((i + ni) * cols + j + nj)  # the wall between, in grid coordinates
+
+    grid = np.ones((rows, cols), dtype=np.uint8)
+    grid[::2, ::2] = 0
+    grid.reshape(-1)[np.asarray(carved, dtype=np.intp)] = 0
+    return _finish(grid)
+
+def kruskal(rows, cols, density=None, seed=None):
+    """Perfect maze by randomized Kruskal over a flat union-find.
+
+    Many short branches and dead ends. density is ignored.
+    """
+    rng = np.random.default_rng(seed)
+    lr, lc = (rows + 1) // 2, (cols + 1) // 2
+    cells = np.arange(lr * lc).reshape(lr, lc)
+    # every lattice edge as (a, b, wall index in the grid), in random order
+    a = np.concatenate([cells[:, :-1].ravel(), cells[:-1, :].ravel()])
+    b = np.concatenate([cells[:, 1:].ravel(), cells[1:, :].ravel()])
+    wall = (a // lc + b // lc) * cols + a % lc + b % lc
+    order = rng.permutation(len(a))
+    a, b, wall = a[order].tolist(), b[order].tolist(), wall[order].tolist()
+
+    parent = array("l", range(lr * lc))
+    carved = array("l")
+    needed = lr * lc - 1
+    for x, y, w in zip(a, b, wall):
+        while parent[x] != x:  # find, with path halving
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        while parent[y] != y:
+            parent[y] = parent[parent[y]]
+            y = parent[y]
+        if x == y:
+            continue
+        parent[x] = y
+        carved.append(w)
+        if len(carved) == needed:
+            break
+
+    grid = np.ones((rows, cols), dtype=np.uint8)
+    grid[::2, ::2] = 0
+    grid.reshape(-1)[np.asarray(carved, dtype=np.intp)] = 0
+    return _finish(grid)
+
+# name -> generator; every generator takes (rows, cols, density, seed)
+GENERATORS = {
+    "random": random_walls,
+    "backtracker": recursive_backtracker,
+    "kruskal": kruskal,
+}
+
+def generate(kind, rows, cols, density=0.25, seed=None):
+    return GENERATORS[kind](rows, cols, density, seed)
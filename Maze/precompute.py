@@ -0,0 +1,157 @@
+# precompute.py
+"""Per-maze precomputation for repeated queries on the same grid.
+
+MazeIndex labels connected components once, so a start/goal pair in
+different regions is rejected without searching. It also keeps BFS
+distance-to-goal fields per goal: an exact heuristic for A*, and a direct
+answer for any start once a goal's field exists.
+"""
+import threading
+from array import array
+from collections import OrderedDict, deque
+
+import numpy as np
+
+def label_components(grid):
+    """int32 labels: -1 for walls, otherwise the smallest flat index in the cell's component.
+
+    Hook-and-shortcut union over all open neighbour pairs, vectorized:
+    every round hooks each component root onto the smallest root it
+    touches, then jumps pointers until every label is a root again.
+    """
+    walls = np.asarray(grid, dtype=bool)
+    rows, cols = walls.shape
+    free = ~walls
+    idx = np.arange(rows * cols, dtype=np.int32).reshape(rows, cols)
+    pairs = free[:, :-1] & free[:, 1:], free[:-1, :] & free[1:, :]
+    u = np.concatenate([idx[:, :-1][pairs[0]], idx[:-1, :][pairs[1]]])
+    v = np.concatenate([idx[:, 1:][pairs[0]], idx[1:, :][pairs[1]]])
+
+    labels = idx.reshape(-1).copy()
+    while len(u):
+        lu, lv = labels[u], labels[v]
+        differ = lu != lv
+        if not differ.any():
+            break
+        u, v, lu, lv = u[differ], v[differ], lu[differ], lv[differ]  # settled pairs never split again
+        np.minimum.at(labels, np.maximum(lu, lv), np.minimum(lu, lv))
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+    labels[walls.reshape(-1)] = -1
+    return labels.reshape(rows, cols)
+
+def distance_field(grid, goal):
+    """BFS steps from every open cell to goal as a flat array('i'); -1 where goal can't be reached"""
+    walls = np.asarray(grid, dtype=bool)
+    rows, cols = walls.shape
+    blocked = bytearray(walls.reshape(-1).view(np.uint8))
+    dist = array("i", [-1]) * (rows * cols)
+    t = goal[0] * cols + goal[1]
+    if blocked[t]:
+        return dist
+    dist[t] = 0
+    queue = deque([t])
+    while queue:
+        cell = queue.popleft()
+        r, c = divmod(cell, cols)
+        nd = dist[cell] + 1
+        for nxt in (
+            cell - cols if r else -1,
+            cell + cols if r < rows - 1 else -1,
+            cell - 1 if c else -1,
+            cell + 1 if c < cols - 1 else -1,
+        ):
+            if nxt >= 0 and not blocked[nxt] and dist[nxt] == -1:
+                dist[nxt] = nd
+                queue.append(nxt)
+    return dist
+
+class MazeIndex:
+    """Components and per-goal distance fields of one grid; build a new index when the grid changes"""
+
+    def __init__(self, grid, max_fields=8):
+        self.grid = np.asarray(grid)
+        self.cols = self.grid.shape[1]
+        self.max_fields = max_fields
+        self._labels = None
+        self._regions = None
+        self._fields = OrderedDict()
+        self._lock = threading.Lock()  # an index may be shared by every session's thread
+        self.hits = self.misses = 0
+
+    @property
+    def labels(self):
+        if self._labels is None:
+            self._labels = label_components(self.grid)
+        return self._labels
+
+    @property
+    def regions(self):
+        if self._regions is None:
+            self._regions = int(np.unique(self.labels[self.labels >= 0]).size)
+        return self._regions
+
+    @property
+    def nbytes(self):
+        labels = self._labels.nbytes if self._labels is not None else 0
+        with self._lock:
+            return labels + sum(field.itemsize * len(field) for field in self._fields.values())
+
+    def connected(self, a, b):
+        """O(1) after the first call: both cells open and in the same component"""
+        la, lb = self.labels[a], self.labels[b]
+        return bool(la >= 0 and la == lb)
+
+    def field(self, goal):
+        """Distance field to goal, computed once and kept for the last max_fields goals.
+
+        The fields add to nbytes; an index in a byte-bounded cache should not be asked for them.
+        """
+        goal = tuple(goal)
+        with self._lock:
+            if goal in self._fields:
+                self.hits += 1
+                self._fields.move_to_end(goal)
+                return self._fields[goal]
+            self.misses += 1
+            dist = distance_field(self.grid, goal)
+            self._fields[goal] = dist
+            if len(self._fields) > self.max_fields:
+                self._fields.popitem(last=False)
+            return dist
+
+    def distance(self, start, goal):
+        """Shortest path length in steps, or None"""
+        if not self.connected(start, goal):
+            return None
+        return self.field(goal)[start[0] * self.cols + start[1]]
+
+    def path(self, start, goal):
+        """Shortest path by walking down goal's distance field: O(path length) once the field exists"""
+        if not self.connected(start, goal):
+            return None
+        dist = self.field(goal)
+        rows, cols = self.grid.shape
+        cell = start[0] * cols + start[1]
+        path = [tuple(start)]
+        while dist[cell]:
+            r, c = divmod(cell, cols)
+            for nxt in (
+                cell - cols if r else -1,
+                cell + cols if r < rows - 1 else -1,
+                cell - 1 if c else -1,
+                cell + 1 if c < cols - 1 else -1,
+            ):
+                if nxt >= 0 and dist[nxt] == dist[cell] - 1:
+                    cell = nxt
+                    break
+            path.append(divmod(cell, cols))
+        return path
+
+    def stats(self):
+        with self._lock:
+            fields = len(self._fields)
+        return {"regions": self.regions, "fields": fields, "field_hits": self.hits, "field_misses": self.misses}
@@ -0,0 +1,80 @@
+# render.py
+from functools import lru_cache
+
+import numpy as np
+
+# --- cell states, in increasing paint priority ---
+EMPTY, WALL, CLOSED, OPEN, PATH, CURRENT, START, GOAL = range(8)
+
+COLORS = {
+    EMPTY: "#e5e7eb",
+    WALL: "#111827",
+    CLOSED: "#fb923c",  # orange
+    OPEN: "#38bdf8",  # sky
+    PATH: "#22c55e",  # green
+    CURRENT: "#f59e0b",  # amber
+    START: "#a78bfa",  # violet
+    GOAL: "#ef4444",  # red
+}
+EDGE_COLOR = "#9ca3af"
+
+FRAME_PX = 500  # target width of a rendered frame
+MIN_EDGE_CELL_PX = 6  # below this, cell borders would cover the cells
+
+def _rgb(hex_color):
+    return [int(hex_color[i:i + 2], 16) for i in (1, 3, 5)]
+
+EDGE = len(COLORS)  # palette index of cell borders in rendered frames
+PALETTE = np.array([_rgb(COLORS[s]) for s in range(len(COLORS))] + [_rgb(EDGE_COLOR)], dtype=np.uint8)
+
+def _paint(state, cells, code):
+    """Set cells to code; cells is a boolean mask, flat indices or (row, col) pairs"""
+    if isinstance(cells, np.ndarray) and cells.dtype == bool:
+        state[cells] = code
+        return
+    if not isinstance(cells, np.ndarray):
+        cells = list(cells)
+    idx = np.asarray(cells, dtype=np.intp)
+    if idx.size == 0:
+        return
+    if idx.ndim == 1:
+        state.reshape(-1)[idx] = code
+    else:
+        state[idx[:, 0], idx[:, 1]] = code
+
+def state_array(grid, path=(), open_set=(), closed_set=(), current=None, start=None, goal=None):
+    """uint8 array of cell states; later layers win, as in the old per-cell drawing"""
+    state = np.where(np.asarray(grid, dtype=bool), WALL, EMPTY).astype(np.uint8)
+    _paint(state, closed_set, CLOSED)
+    _paint(state, open_set, OPEN)
+    _paint(state, path, PATH)
+    for cell, code in ((current, CURRENT), (start, START), (goal, GOAL)):
+        if cell is not None:
+            state[tuple(cell)] = code
+    return state
+
+@lru_cache(maxsize=32)
+def _pixel_index(rows, cols, cell_px):
+    # pixel -> cell lookup, shared by every frame of the same size
+    return np.arange(rows * cell_px)[:, None] // cell_px, np.arange(cols * cell_px)[None, :] // cell_px
+
+def render_indices(state, size=FRAME_PX):
+    """Palette-index frame (H, W) for a state array, about size pixels wide"""
+    rows, cols = state.shape
+    cell_px = max(1, size // max(rows, cols))
+    ys, xs = _pixel_index(rows, cols, cell_px)
+    frame = state[ys, xs]
+    if cell_px >= MIN_EDGE_CELL_PX:
+        frame[::cell_px] = EDGE
+        frame[:, ::cell_px] = EDGE
+        frame[-1] = EDGE
+        frame[:, -1] = EDGE
+    return frame
+
+def render_frame(state, size=FRAME_PX):
+    """RGB frame (H, W, 3) for a state array, about size pixels wide.
+
+    One palette lookup over the output pixels, so the cost depends on the
+    frame size rather than on the number of cells.
+    """
+    return PALETTE[render_indices(state, size)]
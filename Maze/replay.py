@@ -0,0 +1,138 @@
+# replay.py
+"""Record a search once, replay it as frames on demand.
+
+A trace is an int32 array of (step, cell, event) rows: step counts
+expansions, cell is the flat index and event is search.OPENED or
+search.CLOSED. The player turns it into per-cell open/close steps, so any
+frame can be drawn directly without re-running or replaying the search.
+"""
+import io
+from array import array
+
+import numpy as np
+
+from render import FRAME_PX, PALETTE, render_frame, render_indices, state_array
+from search import CLOSED, ENGINES, OPENED
+
+MAX_EXPORT_FRAMES = 600  # longer traces are sampled down when exported
+
+class TraceRecorder:
+    """visit callback that appends (step, cell, event) records"""
+
+    def __init__(self):
+        self.step = 0
+        self._records = array("l")
+
+    def __call__(self, event, index):
+        if event == CLOSED:
+            self.step += 1
+        self._records.extend((self.step, index, event))
+
+    def to_array(self):
+        return np.asarray(self._records, dtype=np.int32).reshape(-1, 3)
+
+class Trace:
+    def __init__(self, shape, records, path, stats, start, goal, engine="astar"):
+        self.engine = engine
+        self.shape = shape
+        self.records = records
+        self.path = path
+        self.stats = stats
+        self.start = start
+        self.goal = goal
+
+    @property
+    def steps(self):
+        return int(self.records[-1, 0]) if len(self.records) else 0
+
+    @property
+    def nbytes(self):
+        return self.records.nbytes
+
+def record(grid, start, goal, engine="astar", **options):
+    """Run the named engine once with a recorder attached and return the Trace"""
+    recorder = TraceRecorder()
+    path, stats = ENGINES[engine](grid, start, goal, visit=recorder, **options)
+    return Trace(np.shape(grid), recorder.to_array(), path, stats, start, goal, engine)
+
+class TracePlayer:
+    """Frames of a recorded trace: 0 is the empty maze, 1..steps are expansions, the last adds the path"""
+
+    def __init__(self, grid, trace):
+        self.grid = np.asarray(grid)
+        self.trace = trace
+        n = self.grid.size
+        never = np.iinfo(np.int32).max
+        steps, cells, events = trace.records.T
+        self.opened_at = np.full(n, never, dtype=np.int32)
+        self.closed_at = np.full(n, never, dtype=np.int32)
+        opened = events == OPENED
+        # the first OPENED record of a cell wins; cells may be re-opened with a better g
+        np.minimum.at(self.opened_at, cells[opened], steps[opened])
+        closed = events == CLOSED
+        self.closed_at[cells[closed]] = steps[closed]
+        self.expanded = np.full(trace.steps + 1, -1, dtype=np.int64)
+        self.expanded[steps[closed]] = cells[closed]
+
+    @property
+    def nbytes(self):
+        # the grid is shared with the caller and not counted
+        return self.opened_at.nbytes + self.closed_at.nbytes + self.expanded.nbytes + self.trace.nbytes
+
+    @property
+    def frame_count(self):
+        return self.trace.steps + 2
+
+    def state(self, frame):
+        frame = min(max(0, frame), self.frame_count - 1)
+        trace = self.trace
+        shape = self.grid.shape
+        if frame == self.frame_count - 1:
+            step, path, current = trace.steps, trace.path or (), trace.goal if trace.path else None
+        else:
+            step, path, current = frame, (), None
+            if frame and self.expanded[frame] >= 0:
+                current = divmod(int(self.expanded[frame]), shape[1])
+        closed = (self.closed_at <= step).reshape(shape)
+        open_ = (self.opened_at <= step).reshape(shape) & ~closed
+        return state_array(self.grid, path, open_, closed, current, trace.start, trace.goal)
+
+    def frame(self, frame, size=FRAME_PX):
+        return render_frame(self.state(frame), size)
+
+    def sample(self, max_frames=MAX_EXPORT_FRAMES):
+        """Frame numbers for an export: every frame, or an even spread that keeps the first and last"""
+        count = self.frame_count
+        if count <= max_frames:
+            return list(range(count))
+        return sorted(set(np.linspace(0, count - 1, max_frames).round().astype(int).tolist()))
+
+def export_gif(player, fps=20, size=FRAME_PX):
+    """Encode the trace as an animated GIF; the last frame holds for a second"""
+    from PIL import Image
+
+    # paletted frames straight from the cell states, so Pillow has nothing to quantize
+    palette = PALETTE.reshape(-1).tolist()
+    frames = []
+    for i in player.sample():
+        image = Image.fromarray(render_indices(player.state(i), size), mode="P")
+        image.putpalette(palette)
+        frames.append(image)
+    durations = [int(1000 / fps)] * len(frames)
+    durations[-1] = 1000
+    out = io.BytesIO()
+    frames[0].save(out, format="GIF", save_all=True, append_images=frames[1:], duration=durations, loop=0, optimize=False)
+    return out.getvalue()
+
+def export_mp4(player, fps=20, size=FRAME_PX):
+    """Encode the trace as H.264 MP4; needs imageio and imageio-ffmpeg"""
+    import imageio.v3 as iio
+    import imageio_ffmpeg  # noqa: F401 -- fail here rather than inside the writer
+
+    frames = np.stack([_pad16(player.frame(i, size)) for i in player.sample()])
+    return iio.imwrite("<bytes>", frames, extension=".mp4", plugin="FFMPEG", fps=fps, codec="libx264")
+
+def _pad16(frame):
+    # H.264 encoders want dimensions in whole 16-pixel macroblocks
+    h, w = frame.shape[:2]
+    return np.pad(frame, ((0, -h % 16), (0, -w % 16), (0, 0)), mode="edge")
@@ -0,0 +1,360 @@
+# search.py
+"""Headless grid search: no Streamlit, no drawing.
+
+Grids are 2-D arrays (or nested lists) where 1 marks a wall. Cells are
+addressed by flat index r * cols + c internally; paths come back as
+(row, col) tuples. Moves are 4-connected with unit cost.
+"""
+import heapq
+import time
+from array import array
+from collections import deque
+
+import numpy as np
+
+# events passed to the visit callback
+OPENED, CLOSED = 1, 2
+
+def to_flat(cell, cols):
+    return cell[0] * cols + cell[1]
+
+def to_cell(index, cols):
+    return divmod(index, cols)
+
+def _blocked(grid):
+    walls = np.asarray(grid, dtype=bool)
+    return walls.shape, bytearray(walls.reshape(-1).view(np.uint8))
+
+def _stats(t0, expanded, pushed, peak, path):
+    return {
+        "expanded": expanded,
+        "pushed": pushed,
+        "peak_open": peak,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 3),
+        "path_length": len(path) if path else 0,
+    }
+
+def _walk_back(parent, index):
+    path = [index]
+    while parent[index] != -1:
+        index = parent[index]
+        path.append(index)
+    path.reverse()
+    return path
+
+def astar(grid, start, goal, visit=None, heuristic=None):
+    """A* with the Manhattan heuristic, or a per-cell heuristic by flat index.
+
+    Returns (path, stats): the path as a list of (row, col) from start to
+    goal, or None if there is none, and a dict with expanded, pushed,
+    peak_open, elapsed_ms and path_length. visit(event, index) is called for
+    every OPENED and CLOSED cell, if given. With an exact heuristic (a
+    distance field, -1 where the goal is unreachable) only path cells are
+    expanded.
+    """
+    t0 = time.perf_counter()
+    (rows, cols), blocked = _blocked(grid)
+    n = rows * cols
+    s, t = to_flat(start, cols), to_flat(goal, cols)
+    gr, gc = goal
+    hmax = n if heuristic is not None else rows + cols  # h < hmax, so (f, h, cell) packs into one int
+
+    g = array("l", [-1]) * n
+    parent = array("l", [-1]) * n
+    closed = bytearray(n)
+    h0 = heuristic[s] if heuristic is not None else abs(start[0] - gr) + abs(start[1] - gc)
+    g[s] = 0
+    heap = [(h0 * hmax + h0) * n + s]
+    expanded, pushed, peak = 0, 1, 1
+    found = False
+    if visit:
+        visit(OPENED, s)
+
+    while heap:
+        cell = heapq.heappop(heap) % n
+        if closed[cell]:
+            continue  # stale entry
+        closed[cell] = 1
+        expanded += 1
+        if visit:
+            visit(CLOSED, cell)
+        if cell == t:
+            found = True
+            break
+
+        r, c = divmod(cell, cols)
+        ng = g[cell] + 1
+        for nxt in (
+            cell - cols if r else -1,
+            cell + cols if r < rows - 1 else -1,
+            cell - 1 if c else -1,
+            cell + 1 if c < cols - 1 else -1,
+        ):
+            if nxt < 0 or blocked[nxt] or closed[nxt]:
+                continue
+            old = g[nxt]
+            if old != -1 and old <= ng:
+                continue
+            if heuristic is not None:
+                hn = heuristic[nxt]
+                if hn < 0:
+                    continue  # the goal can't be reached from there
+            else:
+                hn = abs(nxt // cols - gr) + abs(nxt % cols - gc)
+            g[nxt] = ng
+            parent[nxt] = cell
+            heapq.heappush(heap, ((ng + hn) * hmax + hn) * n + nxt)
+            pushed += 1
+            if visit:
+                visit(OPENED, nxt)
+        if len(heap) > peak:
+            peak = len(heap)
+
+    path = [to_cell(i, cols) for i in _walk_back(parent, t)] if found else None
+    return path, _stats(t0, expanded, pushed, peak, path)
+
+def bfs(grid, start, goal, visit=None):
+    """Breadth-first search: optimal on unit costs, no heuristic. Same results as astar."""
+    t0 = time.perf_counter()
+    (rows, cols), blocked = _blocked(grid)
+    n = rows * cols
+    s, t = to_flat(start, cols), to_flat(goal, cols)
+    parent = array("l", [-1]) * n
+    seen = bytearray(n)
+    seen[s] = 1
+    queue = deque([s])
+    expanded, pushed, peak = 0, 1, 1
+    found = False
+    if visit:
+        visit(OPENED, s)
+
+    while queue:
+        cell = queue.popleft()
+        expanded += 1
+        if visit:
+            visit(CLOSED, cell)
+        if cell == t:
+            found = True
+            break
+        r, c = divmod(cell, cols)
+        for nxt in (
+            cell - cols if r else -1,
+            cell + cols if r < rows - 1 else -1,
+            cell - 1 if c else -1,
+            cell + 1 if c < cols - 1 else -1,
+        ):
+            if nxt < 0 or blocked[nxt] or seen[nxt]:
+                continue
+            seen[nxt] = 1
+            parent[nxt] = cell
+            queue.append(nxt)
+            pushed += 1
+            if visit:
+                visit(OPENED, nxt)
+        if len(queue) > peak:
+            peak = len(queue)
+
+    path = [to_cell(i, cols) for i in _walk_back(parent, t)] if found else None
+    return path, _stats(t0, expanded, pushed, peak, path)
+
+def bidirectional_astar(grid, start, goal, visit=None):
+    """A* from both ends, expanding the smaller frontier, until neither can beat the best meeting."""
+    t0 = time.perf_counter()
+    (rows, cols), blocked = _blocked(grid)
+    n = rows * cols
+    s, t = to_flat(start, cols), to_flat(goal, cols)
+    hmax = rows + cols
+    span = hmax * n  # key // span is the f of a packed (f, h, cell) key
+    targets = (goal, start)
+
+    g = (array("l", [-1]) * n, array("l", [-1]) * n)
+    parent = (array("l", [-1]) * n, array("l", [-1]) * n)
+    closed = (bytearray(n), bytearray(n))
+    h0 = abs(start[0] - goal[0]) + abs(start[1] - goal[1])
+    g[0][s] = g[1][t] = 0
+    heaps = ([(h0 * hmax + h0) * n + s], [(h0 * hmax + h0) * n + t])
+    best, meet = 0 if s == t else n + 1, s if s == t else -1
+    expanded, pushed, peak = 0, 2, 2
+    if visit:
+        visit(OPENED, s)
+        visit(OPENED, t)
+
+    while heaps[0] and heaps[1]:
+        # every unfound path crosses both frontiers, so either lower bound can stop the search
+        if heaps[0][0] // span >= best or heaps[1][0] // span >= best:
+            break
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        heap, gs, par, done = heaps[side], g[side], parent[side], closed[side]
+        other = g[1 - side]
+        tr, tc = targets[side]
+
+        cell = heapq.heappop(heap) % n
+        if done[cell]:
+            continue
+        done[cell] = 1
+        expanded += 1
+        if visit:
+            visit(CLOSED, cell)
+
+        r, c = divmod(cell, cols)
+        ng = gs[cell] + 1
+        for nxt in (
+            cell - cols if r else -1,
+            cell + cols if r < rows - 1 else -1,
+            cell - 1 if c else -1,
+            cell + 1 if c < cols - 1 else -1,
+        ):
+            if nxt < 0 or blocked[nxt] or done[nxt]:
+                continue
+            old = gs[nxt]
+            if old != -1 and old <= ng:
+                continue
+            gs[nxt] = ng
+            par[nxt] = cell
+            if other[nxt] != -1 and ng + other[nxt] < best:
+                best, meet = ng + other[nxt], nxt
+            hn = abs(nxt // cols - tr) + abs(nxt % cols - tc)
+            heapq.heappush(heap, ((ng + hn) * hmax + hn) * n + nxt)
+            pushed += 1
+            if visit:
+                visit(OPENED, nxt)
+        if len(heaps[0]) + len(heaps[1]) > peak:
+            peak = len(heaps[0]) + len(heaps[1])
+
+    path = None
+    if meet != -1:
+        back = _walk_back(parent[1], meet)
+        back.reverse()
+        path = [to_cell(i, cols) for i in _walk_back(parent[0], meet) + back[1:]]
+    return path, _stats(t0, expanded, pushed, peak, path)
+
+def _next_stop(stop, forward):
+    """For every position of a flat bool array, the index of the nearest stop at or after (or before) it"""
+    n = stop.size
+    if forward:
+        idx = np.where(stop, np.arange(n, dtype=np.int32), np.int32(n))
+        return np.minimum.accumulate(idx[::-1])[::-1]
+    idx = np.where(stop, np.arange(n, dtype=np.int32), np.int32(-1))
+    return np.maximum.accumulate(idx)
+
+def _jump_tables(walls, t):
+    """Where a jump from each cell of the padded wall array ends, per direction.
+
+    A horizontal run stops at a wall, the goal or a cell with a forced
+    neighbour; a vertical run also stops where a sideways run would. The
+    blocked border guarantees every run stops inside its own row or column,
+    so np.roll's wrap-around never reaches an open cell.
+    """
+    h, w = walls.shape
+    goal = np.zeros_like(walls)
+    goal.flat[t] = True
+    free = ~walls
+
+    def shifted(a, dr, dc):
+        # value of a at (r + dr, c + dc)
+        return np.roll(a, (-dr, -dc), axis=(0, 1))
+
+    tables = {}
+    for d, dc in ((1, 1), (-1, -1)):
+        forced = (shifted(free, -1, 0) & shifted(walls, -1, -dc)) | (shifted(free, 1, 0) & shifted(walls, 1, -dc))
+        tables[d] = _next_stop((walls | goal | forced).reshape(-1), d > 0)
+    # does a sideways run from each cell end on a jump point?
+    found = {d: free.reshape(-1)[tables[d]].reshape(h, w) for d in (1, -1)}
+    sideways = shifted(found[1], 0, 1) | shifted(found[-1], 0, -1)
+    for d, dr in ((w, 1), (-w, -1)):
+        forced = (shifted(free, 0, -1) & shifted(walls, -dr, -1)) | (shifted(free, 0, 1) & shifted(walls, -dr, 1))
+        stop = (walls | goal | forced | sideways).T.reshape(-1)  # column-major, so columns are contiguous
+        ends = _next_stop(stop, d > 0)
+        tables[d] = ((ends % h) * w + ends // h).reshape(w, h).T.reshape(-1)
+    return {d: array("i", table.astype(np.int32).tobytes()) for d, table in tables.items()}
+
+def jump_point_search(grid, start, goal, visit=None):
+    """Jump Point Search for 4-connected uniform-cost grids.
+
+    Straight runs are skipped without touching the open list; only cells
+    where the shortest path may turn (jump points) are pushed. Where every
+    run ends is precomputed with NumPy, so a jump is one lookup. Reported
+    expansions count jump points; the returned path has every cell.
+    """
+    t0 = time.perf_counter()
+    rows, cols = np.shape(grid)
+    walls = np.pad(np.asarray(grid, dtype=bool), 1, constant_values=True)
+    w = walls.shape[1]
+    blocked = bytearray(walls.reshape(-1).view(np.uint8))
+    n = len(blocked)
+    s = (start[0] + 1) * w + start[1] + 1
+    t = (goal[0] + 1) * w + goal[1] + 1
+    gr, gc = goal[0] + 1, goal[1] + 1
+    hmax = rows + cols + 4
+    ends = _jump_tables(walls, t)
+
+    def flat(p):
+        return (p // w - 1) * cols + p % w - 1
+
+    g = array("l", [-1]) * n
+    parent = array("l", [-1]) * n
+    closed = bytearray(n)
+    h0 = abs(start[0] - goal[0]) + abs(start[1] - goal[1])
+    g[s] = 0
+    heap = [(h0 * hmax + h0) * n + s]
+    expanded, pushed, peak = 0, 1, 1
+    found = False
+    if visit:
+        visit(OPENED, flat(s))
+
+    while heap:
+        cell = heapq.heappop(heap) % n
+        if closed[cell]:
+            continue
+        closed[cell] = 1
+        expanded += 1
+        if visit:
+            visit(CLOSED, flat(cell))
+        if cell == t:
+            found = True
+            break
+
+        # prune the way back: a parent on the same line already covered it
+        p = parent[cell]
+        back = 0 if p == -1 else (-1 if p < cell else 1) * (1 if (cell - p) % w else w)
+        for d in (1, -1, w, -w):
+            if d == back:
+                continue
+            nxt = ends[d][cell + d]
+            if blocked[nxt] or closed[nxt]:
+                continue
+            ng = g[cell] + abs(nxt - cell) // abs(d)
+            old = g[nxt]
+            if old != -1 and old <= ng:
+                continue
+            g[nxt] = ng
+            parent[nxt] = cell
+            hn = abs(nxt // w - gr) + abs(nxt % w - gc)
+            heapq.heappush(heap, ((ng + hn) * hmax + hn) * n + nxt)
+            pushed += 1
+            if visit:
+                visit(OPENED, flat(nxt))
+        if len(heap) > peak:
+            peak = len(heap)
+
+    path = None
+    if found:
+        points = _walk_back(parent, t)
+        cells = [points[0]]
+        for a, b in zip(points, points[1:]):
+            step = (1 if (b - a) % w else w) * (1 if b > a else -1)
+            cells.extend(range(a + step, b + step, step))
+        path = [to_cell(flat(i), cols) for i in cells]
+    return path, _stats(t0, expanded, pushed, peak, path)
+
+# name -> engine; every engine takes (grid, start, goal, visit=None) and returns (path, stats)
+ENGINES = {
+    "astar": astar,
+    "jps": jump_point_search,
+    "bidirectional": bidirectional_astar,
+    "bfs": bfs,
+}
+
+def solve(grid, start, goal, engine="astar", visit=None, **options):
+    """Run the named engine; options go to it unchanged (e.g. heuristic= for astar)"""
+    return ENGINES[engine](grid, start, goal, visit=visit, **options)
@@ -0,0 +1,18 @@
+import os
+
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+def test_replay_is_enabled_by_the_run_that_records_a_trace():
+    at = AppTest.from_file(APP, default_timeout=60).run()
+    at.slider[0].set_value(0.05).run()  # sparse walls, so start and goal connect
+    at.slider[1].set_value(0).run()
+    assert at.button(key="replay").disabled
+    at.button[1].click().run()
+    assert not at.exception
+    assert not at.button(key="replay").disabled
+    at.button(key="replay").click().run()
+    assert at.success[0].value.startswith("Path length")
+    at.button[0].click().run()  # a new maze drops the trace
+    assert at.button(key="replay").disabled
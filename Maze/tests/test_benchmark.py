@@ -0,0 +1,36 @@
+from benchmark import compare
+from mazegen import generate
+
+def row(time_ms, expanded, optimal=True):
+    return {
+        "generator": "random", "density": 0.25, "size": 101, "seed": 1, "engine": "astar",
+        "time_ms": time_ms, "expanded": expanded, "optimal": optimal, "path_length": 201, "bfs_length": 201,
+    }
+
+BASELINE = {"results": [row(1.0, 1000)]}
+
+def test_timing_is_advisory_by_default():
+    problems, advisories = compare([row(30.0, 1000)], BASELINE, 0.25)
+    assert problems == []
+    assert len(advisories) == 1
+
+def test_gated_timing_ignores_slowdowns_under_the_floor():
+    assert compare([row(30.0, 1000)], BASELINE, 0.25, gate_timing=True)[0] == []
+    assert len(compare([row(100.0, 1000)], BASELINE, 0.25, gate_timing=True)[0]) == 1
+
+def test_expansions_and_optimality_always_gate():
+    assert compare([row(1.0, 1200)], BASELINE, 0.25)[0] == []
+    problems, _ = compare([row(1.0, 1300, optimal=False)], BASELINE, 0.25)
+    assert len(problems) == 2
+
+def test_disconnected_random_mazes_are_redrawn():
+    from benchmark import connected_maze
+    from precompute import MazeIndex
+    assert not MazeIndex(generate("random", 101, 101, 0.35, 1)).connected((0, 0), (100, 100))
+    grid, seed = connected_maze("random", 101, 0.35, 1)
+    assert seed > 1 and MazeIndex(grid).connected((0, 0), (100, 100))
+    assert connected_maze("random", 11, 1.0, 1) == (None, None)
+
+def test_a_case_on_another_seed_is_flagged_not_compared():
+    problems, _ = compare([{**row(1.0, 1000), "seed": 2}], BASELINE, 0.25)
+    assert problems == ["random/0.25/101/astar: connected maze at seed 2, baseline 1"]
@@ -0,0 +1,51 @@
+import heapq
+import random
+
+import incremental
+from incremental import LPAStar
+from mazegen import generate
+from precompute import distance_field
+from search import solve
+
+def bfs_length(grid, start, goal):
+    """Cells on a shortest path, 0 when the goal is unreachable"""
+    return distance_field(grid, goal)[start[0] * grid.shape[1] + start[1]] + 1
+
+def test_lpastar_matches_astar_after_random_edits():
+    rng = random.Random(7)
+    for seed in range(5):
+        grid = generate("random", 40, 40, 0.3, seed).copy()
+        start, goal = (0, 0), (39, 39)
+        planner = LPAStar(grid, start, goal)
+        planner.compute()
+        for _ in range(30):
+            edits = {}
+            for _ in range(rng.randint(1, 8)):
+                cell = (rng.randrange(40), rng.randrange(40))
+                if cell not in (start, goal):
+                    edits[cell] = not grid[cell]
+            for cell, wall in edits.items():
+                grid[cell] = wall
+            planner.set_walls(edits)
+            path, stats = planner.compute()
+            astar_path, astar_stats = solve(grid, start, goal, "astar")
+            assert stats["path_length"] == astar_stats["path_length"] == bfs_length(grid, start, goal)
+            if path:
+                assert path[0] == start and path[-1] == goal
+                assert not any(grid[cell] for cell in path)
+
+def test_peak_open_is_the_largest_heap_during_compute(monkeypatch):
+    sizes = []
+    push = heapq.heappush
+
+    def recording_push(heap, item):
+        push(heap, item)
+        sizes.append(len(heap))
+
+    monkeypatch.setattr(incremental.heapq, "heappush", recording_push)
+    grid = generate("random", 60, 60, 0.2, 3).copy()
+    planner = LPAStar(grid, (0, 0), (59, 59))
+    sizes.clear()
+    _, stats = planner.compute()
+    assert stats["peak_open"] == max(sizes)
+    assert stats["peak_open"] > len(planner.heap)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from mazegen import GENERATORS, generate
+from precompute import MazeIndex
+
+SIZES = [(5, 5), (6, 6), (11, 11), (12, 31), (50, 50), (101, 100)]
+
+@pytest.mark.parametrize("kind", ["backtracker", "kruskal"])
+@pytest.mark.parametrize("rows, cols", SIZES)
+def test_perfect_mazes_are_trees_joining_the_corners(kind, rows, cols):
+    for seed in range(3):
+        grid = generate(kind, rows, cols, None, seed)
+        assert grid.shape == (rows, cols)
+        index = MazeIndex(grid)
+        assert index.connected((0, 0), (rows - 1, cols - 1))
+        assert index.regions == 1
+        # a connected graph is a tree, one path between any two cells, when edges = vertices - 1
+        open_ = grid == 0
+        edges = (open_[1:] & open_[:-1]).sum() + (open_[:, 1:] & open_[:, :-1]).sum()
+        assert edges == open_.sum() - 1
+
+@pytest.mark.parametrize("kind", list(GENERATORS))
+def test_same_seed_same_grid(kind):
+    first = generate(kind, 41, 41, 0.3, 12)
+    assert np.array_equal(first, generate(kind, 41, 41, 0.3, 12))
+    assert not np.array_equal(first, generate(kind, 41, 41, 0.3, 13))
+
+def test_random_walls_keep_the_corners_open_at_any_density():
+    grid = generate("random", 20, 20, 1.0, 0)
+    assert grid[0, 0] == 0 and grid[-1, -1] == 0
+    assert grid.sum() == 20 * 20 - 2
@@ -0,0 +1,43 @@
+import threading
+
+from cache import BoundedCache
+from mazegen import generate
+from precompute import MazeIndex, distance_field
+
+def test_field_matches_distance_field_and_is_reused():
+    grid = generate("kruskal", 41, 41, None, 2)
+    index = MazeIndex(grid)
+    assert list(index.field((40, 40))) == list(distance_field(grid, (40, 40)))
+    assert index.field((40, 40)) is index.field([40, 40])
+    assert index.stats()["fields"] == 1 and index.hits == 2
+
+def test_fields_cached_as_their_own_entries_count_toward_the_limit():
+    grid = generate("random", 200, 200, 0.2, 1)
+    cache = BoundedCache(10 * 2**20)
+    index = cache.put(("index", 1), MazeIndex(grid))
+    index.labels
+    before = cache.stats()["bytes"]
+    cache.get_or_create(("field", 1, (199, 199)), lambda: distance_field(grid, (199, 199)))
+    assert cache.stats()["bytes"] - before >= 4 * 200 * 200
+
+def test_concurrent_field_requests_keep_the_lru_bounded():
+    grid = generate("random", 60, 60, 0.2, 4)
+    index = MazeIndex(grid, max_fields=3)
+    goals = [(r, c) for r in range(0, 60, 6) for c in range(0, 60, 6) if not grid[r, c]]
+    errors = []
+
+    def worker(offset):
+        try:
+            for goal in goals[offset:] + goals[:offset]:
+                assert len(index.field(goal)) == 60 * 60
+        except Exception as e:  # a broken OrderedDict surfaces as RuntimeError/KeyError here
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert index.stats()["fields"] == 3
+    assert index.hits + index.misses == 8 * len(goals)
@@ -0,0 +1,19 @@
+import pytest
+
+from mazegen import GENERATORS, generate
+from precompute import distance_field
+from search import ENGINES, solve
+
+@pytest.mark.parametrize("kind", list(GENERATORS))
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_engines_find_shortest_paths(kind, engine):
+    for seed in range(4):
+        grid = generate(kind, 31, 31, 0.3, seed)
+        start, goal = (0, 0), (30, 30)
+        path, stats = solve(grid, start, goal, engine)
+        shortest = distance_field(grid, goal)[0] + 1
+        assert stats["path_length"] == shortest
+        if path:
+            assert path[0] == start and path[-1] == goal
+            assert all(abs(r1 - r2) + abs(c1 - c2) == 1 for (r1, c1), (r2, c2) in zip(path, path[1:]))
+            assert not any(grid[cell] for cell in path)
@@ -1,54 +1,107 @@
 import os
-import base64
-import requests
-from flask import Flask, request, jsonify
+import json
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from dotenv import load_dotenv
+import time
+from assets import AssetStore
+from functools import partial
+from solver import count_solutions, find_conflict, geometry, BudgetExceeded, SearchBudget, SOLVERS, DEFAULT_SOLVER
+from batch import ORDERS, cancel_batch, parse_batch_text, submit_batch
+from cache import ImageHashCache, SolutionCache, image_hash
+from generator import DIFFICULTIES, PuzzlePool
+from metrics import OCR_ERRORS, OCR_LATENCY, OCR_PARSE_LATENCY, OCR_PAYLOAD_BYTES, REQUEST_LATENCY, RequestProfile, observe_solve, register_collector, render
+from ocr_client import OCRBusyError, OCRClient, OCRError, OCRRequestError, OCRTimeoutError, parse_ocr_result
+from ocr_local import local_ocr
+from uploads import encode_for_ocr, load_grayscale, read_upload, upload_size
 
 load_dotenv()
 
-from flask import send_from_directory
-
-app = Flask(__name__, static_folder='.', static_url_path='')
+app = Flask(__name__, static_folder=None)
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_UPLOAD_MB', 16)) * 1024 * 1024
 OCR_API_KEY = os.getenv('OCR_API_KEY')
+OCR_ENGINES = ('remote', 'local')
+OCR_ENGINE = os.getenv('OCR_ENGINE', 'remote')  # 'remote' = OCR.space, 'local' = offline OpenCV pipeline
+OCR_API_URL = os.getenv('OCR_API_URL', 'https://api.ocr.space/parse/image')
+OCR_TIMEOUT = float(os.getenv('OCR_TIMEOUT', 30))  # Seconds
+OCR_MAX_CONCURRENCY = int(os.getenv('OCR_MAX_CONCURRENCY', 8))
+OCR_RETRIES = int(os.getenv('OCR_RETRIES', 3))
+OCR_CACHE_SIZE = int(os.getenv('OCR_CACHE_SIZE', 256))
+OCR_CACHE_TTL = int(os.getenv('OCR_CACHE_TTL', 3600))  # Seconds
+OCR_CACHE_MAX_DISTANCE = int(os.getenv('OCR_CACHE_MAX_DISTANCE', 4))  # Conflicting hash pixels still treated as the same image
+OCR_MAX_EDGE = int(os.getenv('OCR_MAX_EDGE', 1024))  # Longest side, in px, of the image forwarded to OCR.space
 
-if not OCR_API_KEY or OCR_API_KEY == 'YOUR_API_KEY_HERE':
+if OCR_ENGINE not in OCR_ENGINES:
+    raise RuntimeError(f'ERROR: Unknown OCR_ENGINE {OCR_ENGINE!r}. Choose one of: {", ".join(OCR_ENGINES)}.')
+if OCR_ENGINE == 'remote' and (not OCR_API_KEY or OCR_API_KEY == 'YOUR_API_KEY_HERE'):
     raise RuntimeError('ERROR: OCR.space API key is missing. Please add it to your .env file.')
 
-def is_valid(board, row, col, num):
-    """Check if placing num at board[row][col] is valid according to Sudoku rules"""
-    # Check row
-    for x in range(9):
-        if board[row][x] == num:
-            return False
- 
-    # Check column
-    for x in range(9):
-        if board[x][col] == num:
-            return False
- 
-    # Check 3x3 sub-grid
-    start_row = row - row % 3
-    start_col = col - col % 3
-    for i in range(3):
-        for j in range(3):
-            if board[start_row + i][start_col + j] == num:
-                return False
- 
-    return True
-
-def solve_sudoku(board):
-    """Solve Sudoku puzzle using backtracking algorithm"""
-    for row in range(9):
-        for col in range(9):
-            if board[row][col] == 0:  # Empty cell found
-                for num in range(1, 10):  # Try numbers 1-9
-                    if is_valid(board, row, col, num):
-                        board[row][col] = num
-                        if solve_sudoku(board):
-                            return True
-                        board[row][col] = 0  # Backtrack
-                return False  # No valid number found
-    return True  # All cells filled successfully
+MAX_ANALYZE_LIMIT = 1000
+MAX_BOARD_SIZE = int(os.getenv('MAX_BOARD_SIZE', 25))  # Largest accepted board side (16 = 16x16, 25 = 25x25)
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', 0)) or None  # None = one per CPU
+BATCH_MAX_BOARDS = int(os.getenv('BATCH_MAX_BOARDS', 10000))
+SOLUTION_CACHE_SIZE = int(os.getenv('SOLUTION_CACHE_SIZE', 10000))
+SOLUTION_CACHE_DB = os.getenv('SOLUTION_CACHE_DB')  # Optional sqlite file for a persistent tier
+# Default and ceiling for per-request solver budgets
+SOLVER_MAX_NODES = int(os.getenv('SOLVER_MAX_NODES', 1000000))
+SOLVER_TIMEOUT_MS = int(os.getenv('SOLVER_TIMEOUT_MS', 10000))
+SOLVER_ENGINE = os.getenv('SOLVER_ENGINE', DEFAULT_SOLVER)
+PUZZLE_POOL_SIZE = int(os.getenv('PUZZLE_POOL_SIZE', 20))  # Ready puzzles kept per difficulty, 0 disables /new-puzzle
+PUZZLE_POOL_WORKERS = int(os.getenv('PUZZLE_POOL_WORKERS', 1))
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')  # Allow the X-Profile request header
+if SOLVER_ENGINE not in SOLVERS:
+    raise RuntimeError(f'ERROR: Unknown SOLVER_ENGINE {SOLVER_ENGINE!r}. Choose one of: {", ".join(SOLVERS)}.')
+
+solution_cache = SolutionCache(SOLUTION_CACHE_SIZE, SOLUTION_CACHE_DB) if SOLUTION_CACHE_SIZE > 0 else None
+ocr_cache = ImageHashCache(OCR_CACHE_SIZE, OCR_CACHE_TTL, OCR_CACHE_MAX_DISTANCE) if OCR_CACHE_SIZE > 0 else None
+ocr_client = OCRClient(OCR_API_URL, OCR_API_KEY, OCR_TIMEOUT, OCR_MAX_CONCURRENCY, OCR_RETRIES)
+assets = AssetStore(os.path.dirname(os.path.abspath(__file__)))
+# Started by the first /new-puzzle (or the ASGI lifespan), not at import: every importing process would spawn workers
+puzzle_pool = PuzzlePool(PUZZLE_POOL_SIZE, PUZZLE_POOL_WORKERS) if PUZZLE_POOL_SIZE > 0 else None
+
+def collect_state():
+    """Scrape-time gauges for the caches and the puzzle pool"""
+    caches = {name: cache.stats() for name, cache in (('solutions', solution_cache), ('ocr', ocr_cache)) if cache is not None}
+    yield 'sudoku_cache_hits_total', 'counter', 'Cache lookups answered from the cache.', [({'cache': name}, s['hits']) for name, s in caches.items()]
+    yield 'sudoku_cache_misses_total', 'counter', 'Cache lookups that missed.', [({'cache': name}, s['misses']) for name, s in caches.items()]
+    yield 'sudoku_cache_hit_ratio', 'gauge', 'Hits over lookups since startup.', [({'cache': name}, s['hit_ratio']) for name, s in caches.items()]
+    yield 'sudoku_cache_entries', 'gauge', 'Entries held in memory.', [({'cache': name}, s['size']) for name, s in caches.items()]
+    if puzzle_pool is not None:
+        pools = puzzle_pool.stats()['pools']
+        yield 'sudoku_puzzle_pool_depth', 'gauge', 'Ready puzzles per difficulty.', [({'difficulty': d}, p['depth']) for d, p in pools.items()]
+
+register_collector(collect_state)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.profile = None
+    if PROFILING_ENABLED and request.headers.get('X-Profile'):
+        limit = request.headers['X-Profile']
+        profile = RequestProfile(int(limit) if limit.isdigit() else 25)
+        g.profile = profile if profile.start() else False
+
+@app.after_request
+def record_request(response):
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    REQUEST_LATENCY.observe(time.perf_counter() - g.request_start, route=route, method=request.method, status=response.status_code)
+    if g.profile:
+        summary = g.profile.stop()
+        g.profile = None
+        # The summary rides along in JSON bodies; other responses only get the header
+        body = response.get_json(silent=True) if response.is_json and not response.is_streamed else None
+        if isinstance(body, dict):
+            body['profile'] = summary
+            response.set_data(json.dumps(body))
+        response.headers['X-Profile'] = 'included' if isinstance(body, dict) else 'omitted'
+    elif g.profile is False:
+        response.headers['X-Profile'] = 'busy'
+    return response
+
+@app.teardown_request
+def stop_profile(exc):
+    # after_request is skipped when the view raises; release the profiler anyway
+    if g.get('profile'):
+        g.profile.stop()
 
 def encode_board(board):
     return '%5B' + '%5D%2C%5B'.join([','.join(map(str, row)) for row in board]) + '%5D'
@@ -56,100 +109,392 @@ def encode_board(board):
 def encode_params(params):
     return '&'.join(f'{key}=%5B{encode_board(value)}%5D' for key, value in params.items())
 
-def parse_ocr_result(parsed_result):
-    grid = [[0 for _ in range(9)] for _ in range(9)]
-    lines = parsed_result.get('TextOverlay', {}).get('Lines', [])
-    if not lines:
-        return grid
-    min_x = min_y = float('inf')
-    max_x = max_y = float('-inf')
-    for line in lines:
-        for word in line['Words']:
-            min_x = min(min_x, word['Left'])
-            min_y = min(min_y, word['Top'])
-            max_x = max(max_x, word['Left'] + word['Width'])
-            max_y = max(max_y, word['Top'] + word['Height'])
-    if float('inf') in [min_x, min_y] or float('-inf') in [max_x, max_y]:
-        return grid
-    puzzle_width = max_x - min_x
-    puzzle_height = max_y - min_y
-    cell_width = puzzle_width / 9
-    cell_height = puzzle_height / 9
-    for line in lines:
-        for word in line['Words']:
-            digit_text = word['WordText'].strip()[:1]
-            try:
-                digit = int(digit_text)
-            except ValueError:
-                continue
-            if 1 <= digit <= 9:
-                center_x = word['Left'] + word['Width'] / 2
-                center_y = word['Top'] + word['Height'] / 2
-                col = int((center_x - min_x) / cell_width)
-                row = int((center_y - min_y) / cell_height)
-                if 0 <= row < 9 and 0 <= col < 9 and grid[row][col] == 0:
-                    grid[row][col] = digit
-    return grid
+OCR_PAYLOAD = {
+    'OCREngine': '2',
+    'isOverlayRequired': 'true',
+    'detectOrientation': 'true',
+}
+
+def prepare_remote_ocr(upload):
+    """CPU half of a remote OCR call: decode, hash, check the cache and encode the image to send.
+
+    Returns (cached grid or None, state for complete_remote_ocr). Raises ValueError if the
+    upload is not an image.
+    """
+    start = time.perf_counter()
+    bytes_in = upload_size(upload)
+    OCR_PAYLOAD_BYTES.observe(bytes_in, direction='in')
+    img = load_grayscale(upload, OCR_MAX_EDGE)
+    timings = {'decode_ms': round((time.perf_counter() - start) * 1000, 3)}
+    key = image_hash(img) if ocr_cache is not None else None
+    timings['hash_ms'] = round((time.perf_counter() - start) * 1000 - timings['decode_ms'], 3)
+    state = {'start': start, 'timings': timings, 'key': key, 'upload': {'bytes_in': bytes_in, 'bytes_forwarded': 0}}
+    if key is not None:
+        grid = ocr_cache.get(key)
+        if grid is not None:
+            timings['total_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            return grid, state
+
+    # Forward the downscaled grayscale copy as a binary file part instead of the base64 original
+    encode_start = time.perf_counter()
+    data, mimetype, filetype = encode_for_ocr(img)
+    timings['encode_ms'] = round((time.perf_counter() - encode_start) * 1000, 3)
+    state['payload'] = {**OCR_PAYLOAD, 'filetype': filetype}
+    state['files'] = {'file': (f'image.{filetype.lower()}', data, mimetype)}
+    state['upload']['bytes_forwarded'] = len(data)
+    return None, state
+
+def complete_remote_ocr(result, request_ms, state):
+    """Turn the OCR.space response into a grid and cache it. Returns (grid, timings, upload stats).
+
+    Raises OCRError if OCR.space could not process the image.
+    """
+    timings = state['timings']
+    timings['request_ms'] = round(request_ms, 3)
+    parse_start = time.perf_counter()
+    if result.get('IsErroredOnProcessing'):
+        raise OCRError(result.get('ErrorMessage', ['Unknown error'])[0])
+    parsed_result = result['ParsedResults'][0]
+    grid = parse_ocr_result(parsed_result)
+    parse_s = time.perf_counter() - parse_start
+    timings['parse_ms'] = round(parse_s * 1000, 3)
+    OCR_LATENCY.observe(request_ms / 1000, engine='remote')
+    OCR_PARSE_LATENCY.observe(parse_s)
+    OCR_PAYLOAD_BYTES.observe(state['upload']['bytes_forwarded'], direction='forwarded')
+    if state['key'] is not None:
+        ocr_cache.put(state['key'], grid)
+    timings['total_ms'] = round((time.perf_counter() - state['start']) * 1000, 3)
+
+    # The old path sent the original as base64 (4/3 of its size); assume upload time
+    # scales with payload size to estimate what the smaller body saved.
+    stats = state['upload']
+    forwarded = stats['bytes_forwarded']
+    stats['bytes_saved'] = (stats['bytes_in'] + 2) // 3 * 4 - forwarded
+    stats['est_time_saved_ms'] = round(request_ms * stats['bytes_saved'] / forwarded, 3) if forwarded else 0
+    return grid, timings, stats
+
+def remote_ocr(upload):
+    """Read a Sudoku grid through the OCR.space API. Returns (grid, timings in ms, cached, upload stats).
+
+    Raises ValueError if the upload is not an image, or one of the ocr_client errors.
+    """
+    grid, state = prepare_remote_ocr(upload)
+    if grid is not None:
+        return grid, state['timings'], True, state['upload']
+    request_start = time.perf_counter()
+    result = ocr_client.parse_image(state['payload'], state['files'])
+    grid, timings, stats = complete_remote_ocr(result, (time.perf_counter() - request_start) * 1000, state)
+    return grid, timings, False, stats
+
+def ocr_error_status(e):
+    """HTTP status for an exception raised while reading an image"""
+    if isinstance(e, ValueError):
+        return 400
+    if isinstance(e, OCRBusyError):
+        return 503
+    if isinstance(e, OCRTimeoutError):
+        return 504
+    if isinstance(e, OCRRequestError):
+        return 502
+    return 500
 
 @app.route('/process-image', methods=['POST'])
 def process_image():
-    data = request.get_json()
-    image = data.get('image')
-    if not image:
-        return jsonify({'error': 'No image provided'}), 400
-    if not image.startswith('data:image'):
-        image = f'data:image/png;base64,{image}'
-    payload = {
-        'base64Image': image,
-        'OCREngine': '2',
-        'isOverlayRequired': 'true',
-        'detectOrientation': 'true'
+    # Multipart and raw binary uploads carry the engine in the form or query string
+    if request.is_json:
+        options = request.get_json() or {}
+    elif request.mimetype == 'multipart/form-data':
+        options = request.form
+    else:
+        options = request.args
+    engine = options.get('engine', OCR_ENGINE)
+    if engine not in OCR_ENGINES:
+        return jsonify({'error': f'Unknown OCR engine. Choose one of: {", ".join(OCR_ENGINES)}.'}), 400
+    try:
+        upload = read_upload(request)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if engine == 'local':
+        cached = False
+        try:
+            upload_stats = {'bytes_in': upload_size(upload)}
+            grid, timings = local_ocr(upload.read())
+        except (ValueError, RuntimeError) as e:
+            OCR_ERRORS.inc(error=type(e).__name__)
+            return jsonify({'error': str(e)}), 400 if isinstance(e, ValueError) else 500
+        OCR_PAYLOAD_BYTES.observe(upload_stats['bytes_in'], direction='in')
+        OCR_LATENCY.observe(timings['total_ms'] / 1000, engine='local')
+    else:
+        if not OCR_API_KEY or OCR_API_KEY == 'YOUR_API_KEY_HERE':
+            return jsonify({'error': 'OCR.space API key is missing.'}), 500
+        try:
+            grid, timings, cached, upload_stats = remote_ocr(upload)
+        except (ValueError, OCRBusyError, OCRError, OCRTimeoutError, OCRRequestError) as e:
+            OCR_ERRORS.inc(error=type(e).__name__)
+            return jsonify({'error': str(e)}), ocr_error_status(e)
+    return jsonify({'grid': grid, 'engine': engine, 'timings': timings, 'cached': cached, 'upload': upload_stats})
+
+def parse_size(options):
+    """Read the board side length from request options. Returns (size, error)."""
+    size = options.get('size', 9)
+    if isinstance(size, str) and size.isdigit():
+        size = int(size)
+    if not isinstance(size, int) or isinstance(size, bool) or size < 4 or size > MAX_BOARD_SIZE:
+        return None, f'Size must be an integer 4-{MAX_BOARD_SIZE}.'
+    try:
+        geometry(size)
+    except ValueError as e:
+        return None, str(e)
+    return size, None
+
+def validate_board(board, size=9):
+    """Return an error message if board is not a size x size grid of integers 0-size, else None"""
+    if not board or not isinstance(board, list):
+        return 'Invalid board data provided.'
+
+    # Validate board dimensions
+    if len(board) != size or any(not isinstance(row, list) or len(row) != size for row in board):
+        return f'Board must be {size}x{size} grid.'
+
+    # Validate board values
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if not isinstance(cell, int) or cell < 0 or cell > size:
+                return f'Invalid value at position ({i}, {j}). Values must be integers 0-{size}.'
+    return None
+
+def parse_budget(options):
+    """Read max_nodes/timeout_ms from request options, capped by the server defaults. Returns (max_nodes, timeout_ms, error)."""
+    limits = []
+    for name, ceiling in (('max_nodes', SOLVER_MAX_NODES), ('timeout_ms', SOLVER_TIMEOUT_MS)):
+        value = options.get(name, ceiling)
+        if isinstance(value, str) and value.isdigit():
+            value = int(value)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            return None, None, f'{name} must be a positive integer.'
+        limits.append(min(value, ceiling))
+    return limits[0], limits[1], None
+
+def conflict_body(conflict):
+    return {'error': 'No solution exists for this Sudoku puzzle.', 'conflict': list(conflict)}
+
+def budget_exceeded_body(reason, stats, elapsed_ms):
+    return {
+        'error': str(BudgetExceeded(reason)),
+        'budget_exceeded': True,
+        'reason': reason,
+        'stats': {
+            'nodes': stats.get('nodes', 0),
+            'backtracks': stats.get('backtracks', 0),
+            'elapsed_ms': round(elapsed_ms, 3),
+        },
+    }
+
+def analysis_body(board, limit, count, stats, elapsed_ms):
+    if count == 0:
+        status = 'none'
+    elif count == 1:
+        status = 'unique'
+    else:
+        status = 'multiple'
+    return {
+        'solutions': count,
+        'limit': limit,
+        'limit_reached': count >= limit,
+        'unique': count == 1,
+        'status': status,
+        'givens': sum(1 for row in board for cell in row if cell),
+        'stats': {
+            'nodes': stats['nodes'],
+            'backtracks': stats['backtracks'],
+            'elapsed_ms': round(elapsed_ms, 3),
+        },
     }
-    headers = {'apikey': OCR_API_KEY}
-    response = requests.post('https://api.ocr.space/parse/image', data=payload, headers=headers)
-    data = response.json()
-    if data.get('IsErroredOnProcessing'):
-        return jsonify({'error': data.get('ErrorMessage', ['Unknown error'])[0]}), 500
-    parsed_result = data['ParsedResults'][0]
-    grid = parse_ocr_result(parsed_result)
-    return jsonify({'grid': grid})
 
 @app.route('/solve-puzzle', methods=['POST'])
 def solve_puzzle():
     data = request.get_json()
     board = data.get('board')
+    engine = data.get('engine', SOLVER_ENGINE)
     
-    if not board or not isinstance(board, list):
-        return jsonify({'error': 'Invalid board data provided.'}), 400
+    size, error = parse_size(data)
+    if error:
+        return jsonify({'error': error}), 400
+    error = validate_board(board, size)
+    if error:
+        return jsonify({'error': error}), 400
     
-    # Validate board dimensions
-    if len(board) != 9 or any(len(row) != 9 for row in board):
-        return jsonify({'error': 'Board must be 9x9 grid.'}), 400
+    if not isinstance(engine, str) or engine not in SOLVERS:
+        return jsonify({'error': f'Unknown solver engine. Choose one of: {", ".join(SOLVERS)}.'}), 400
     
-    # Validate board values
-    for i, row in enumerate(board):
-        for j, cell in enumerate(row):
-            if not isinstance(cell, int) or cell < 0 or cell > 9:
-                return jsonify({'error': f'Invalid value at position ({i}, {j}). Values must be integers 0-9.'}), 400
+    max_nodes, timeout_ms, error = parse_budget(data)
+    if error:
+        return jsonify({'error': error}), 400
     
-    # Create a deep copy of the board to avoid modifying the original
-    import copy
-    solution_board = copy.deepcopy(board)
+    # Conflicting givens have no solution, whatever the engine; answer before anything is solved or cached
+    conflict = find_conflict(board)
+    if conflict is not None:
+        observe_solve(engine, 'unsolvable', {}, 0)
+        return jsonify(conflict_body(conflict)), 400
     
-    # Try to solve the puzzle
-    if solve_sudoku(solution_board):
-        return jsonify({'solution': solution_board})
+    stats = {}
+    solver = partial(SOLVERS[engine], stats=stats, budget=SearchBudget(max_nodes, timeout_ms))
+    start = time.perf_counter()
+    try:
+        # Repeated and isomorphic puzzles are answered from the cache unless the client opts out
+        if solution_cache is not None and size == 9 and data.get('cache', True):
+            solution_board, cached = solution_cache.solve(board, solver)
+        else:
+            # Create a deep copy of the board to avoid modifying the original
+            import copy
+            solution_board = copy.deepcopy(board)
+            cached = False
+            if not solver(solution_board):
+                solution_board = None
+    except BudgetExceeded as e:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        observe_solve(engine, 'budget_exceeded', stats, elapsed_ms)
+        return jsonify(budget_exceeded_body(e.reason, stats, elapsed_ms)), 422
+    outcome = 'cached' if cached else 'solved' if solution_board is not None else 'unsolvable'
+    observe_solve(engine, outcome, stats, (time.perf_counter() - start) * 1000)
+    
+    if solution_board is not None:
+        return jsonify({'solution': solution_board, 'size': size, 'engine': engine, 'cached': cached})
     else:
         return jsonify({'error': 'No solution exists for this Sudoku puzzle.'}), 400
 
+@app.route('/solve-batch', methods=['POST'])
+def solve_batch():
+    # Boards come either as JSON ({"boards": [...]}) or as one 81-char puzzle per line
+    as_text = not request.is_json
+    if as_text:
+        options = request.args
+        jobs = parse_batch_text(request.get_data(as_text=True))
+    else:
+        options = request.get_json()
+        boards = options.get('boards')
+        if not isinstance(boards, list):
+            return jsonify({'error': 'Invalid batch data provided.'}), 400
+        size, error = parse_size(options)
+        if error:
+            return jsonify({'error': error}), 400
+        jobs = []
+        for board in boards:
+            error = validate_board(board, size)
+            jobs.append((None, error) if error else (board, None))
+
+    engine = options.get('engine', SOLVER_ENGINE)
+    order = options.get('order', 'input')
+    if not isinstance(engine, str) or engine not in SOLVERS:
+        return jsonify({'error': f'Unknown solver engine. Choose one of: {", ".join(SOLVERS)}.'}), 400
+    if order not in ORDERS:
+        return jsonify({'error': f'Order must be one of: {", ".join(ORDERS)}.'}), 400
+    if not jobs:
+        return jsonify({'error': 'No boards provided.'}), 400
+    if len(jobs) > BATCH_MAX_BOARDS:
+        return jsonify({'error': f'Batch is limited to {BATCH_MAX_BOARDS} boards.'}), 400
+    max_nodes, timeout_ms, error = parse_budget(options)
+    if error:
+        return jsonify({'error': error}), 400
+
+    try:
+        batch_id, results = submit_batch(jobs, engine, order, as_text=as_text, max_workers=BATCH_WORKERS,
+                                         max_nodes=max_nodes, timeout_ms=timeout_ms)
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 503
+    response = Response(stream_with_context(results), mimetype='application/x-ndjson')
+    response.headers['X-Batch-Id'] = batch_id
+    return response
+
+@app.route('/solve-batch/<batch_id>/cancel', methods=['POST'])
+def cancel_solve_batch(batch_id):
+    if not cancel_batch(batch_id):
+        return jsonify({'error': 'Unknown or finished batch.'}), 404
+    return jsonify({'cancelled': batch_id})
+
+@app.route('/analyze-puzzle', methods=['POST'])
+def analyze_puzzle():
+    data = request.get_json()
+    board = data.get('board')
+    limit = data.get('limit', 2)
+
+    size, error = parse_size(data)
+    if error:
+        return jsonify({'error': error}), 400
+    error = validate_board(board, size)
+    if error:
+        return jsonify({'error': error}), 400
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1 or limit > MAX_ANALYZE_LIMIT:
+        return jsonify({'error': f'Limit must be an integer 1-{MAX_ANALYZE_LIMIT}.'}), 400
+    max_nodes, timeout_ms, error = parse_budget(data)
+    if error:
+        return jsonify({'error': error}), 400
+
+    stats = {}
+    start = time.perf_counter()
+    try:
+        count = count_solutions(board, limit, stats, SearchBudget(max_nodes, timeout_ms))
+    except BudgetExceeded as e:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        observe_solve('dlx', 'budget_exceeded', stats, elapsed_ms)
+        return jsonify(budget_exceeded_body(e.reason, stats, elapsed_ms)), 422
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    observe_solve('dlx', 'analyzed', stats, elapsed_ms)
+    return jsonify(analysis_body(board, limit, count, stats, elapsed_ms))
+
+@app.route('/new-puzzle')
+def new_puzzle():
+    difficulty = request.args.get('difficulty', 'medium')
+    if difficulty not in DIFFICULTIES:
+        return jsonify({'error': f'Difficulty must be one of: {", ".join(DIFFICULTIES)}.'}), 400
+    if puzzle_pool is None:
+        return jsonify({'error': 'Puzzle generation is disabled.'}), 404
+
+    item = puzzle_pool.take(difficulty)
+    if item is None:
+        response = jsonify({'error': f'No {difficulty} puzzle is ready yet, try again shortly.'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    puzzle, solution, rating = item
+    # The solution is already known, so a later /solve-puzzle for this board is a cache hit
+    if solution_cache is not None:
+        solution_cache.store(puzzle, solution)
+    return jsonify({'puzzle': puzzle, 'difficulty': difficulty, 'rating': rating})
+
+@app.route('/puzzle-pool')
+def puzzle_pool_stats():
+    if puzzle_pool is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **puzzle_pool.stats()})
+
+@app.route('/metrics')
+def metrics():
+    return Response(render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/cache-stats')
+def cache_stats():
+    return jsonify({
+        'solutions': {'enabled': True, **solution_cache.stats()} if solution_cache is not None else {'enabled': False},
+        'ocr': {'enabled': True, **ocr_cache.stats()} if ocr_cache is not None else {'enabled': False},
+    })
+
+def asset_response(path):
+    found = assets.respond(path, request.headers)
+    if found is None:
+        return jsonify({'error': 'Not found.'}), 404
+    status, headers, body = found
+    return Response(body, status=status, headers=headers)
+
 @app.route('/')
 def root():
-    return send_from_directory('.', 'index.html')
+    return asset_response('')
 
 @app.route('/<path:path>')
 def static_proxy(path):
-    # Serve static files (script.js, style.css)
-    return send_from_directory('.', path)
+    # Serve static files (script.js, style.css); nothing outside the asset list is reachable
+    return asset_response(path)
 
 if __name__ == '__main__':
+    assets.reload = True  # Pick up edits to the front-end files while developing
     app.run(debug=True)
\ No newline at end of file
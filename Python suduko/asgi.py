@@ -0,0 +1,220 @@
+"""Async entry point: run with `uvicorn asgi:app`.
+
+/process-image awaits OCR.space instead of holding a worker thread, and
+/solve-puzzle and /analyze-puzzle run their searches on the shared process
+pool, so neither slow uploads nor hard puzzles stall the event loop. Every
+other route is served by the Flask app unchanged.
+"""
+import asyncio
+import contextlib
+import tempfile
+import time
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+import app as flask_app
+from batch import analyze_board, get_executor, solve_board
+from ocr_client import AsyncOCRClient, OCRBusyError, OCRError, OCRRequestError, OCRTimeoutError
+from metrics import OCR_ERRORS, OCR_LATENCY, OCR_PAYLOAD_BYTES, REQUEST_LATENCY, observe_solve
+from ocr_local import local_ocr
+from solver import SOLVERS, find_conflict
+from uploads import SPOOL_MAX_SIZE, decode_base64_image, upload_size
+
+MAX_UPLOAD_BYTES = flask_app.app.config['MAX_CONTENT_LENGTH']
+
+ocr_client = AsyncOCRClient(
+    flask_app.OCR_API_URL,
+    flask_app.OCR_API_KEY,
+    flask_app.OCR_TIMEOUT,
+    flask_app.OCR_MAX_CONCURRENCY,
+    flask_app.OCR_RETRIES,
+)
+
+def error(message, status=400):
+    return JSONResponse({'error': message}, status)
+
+async def run_in_pool(fn, *args):
+    """Run a picklable function on the shared process pool without blocking the loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(flask_app.BATCH_WORKERS), fn, *args)
+
+def timed(route):
+    """Record an async handler's latency under the same metric as the Flask routes"""
+    def wrap(handler):
+        async def endpoint(request):
+            start = time.perf_counter()
+            response = await handler(request)
+            REQUEST_LATENCY.observe(time.perf_counter() - start, route=route, method=request.method, status=response.status_code)
+            return response
+        return endpoint
+    return wrap
+
+async def read_upload(request):
+    """Async counterpart of uploads.read_upload. Returns (upload, options)."""
+    if int(request.headers.get('content-length') or 0) > MAX_UPLOAD_BYTES:
+        raise OverflowError
+    content_type = request.headers.get('content-type', '')
+    if content_type.startswith('multipart/form-data'):
+        form = await request.form()
+        image = form.get('image')
+        if image is None or isinstance(image, str) or not image.filename:
+            raise ValueError('No image provided')
+        return image.file, form
+    if content_type.startswith('application/json'):
+        try:
+            options = await request.json()
+        except ValueError:
+            raise ValueError('Invalid JSON body.')
+        if not isinstance(options, dict):
+            raise ValueError('No image provided')
+        return decode_base64_image(options.get('image')), options
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    async for chunk in request.stream():
+        spool.write(chunk)
+        if spool.tell() > MAX_UPLOAD_BYTES:
+            raise OverflowError
+    if not spool.tell():
+        raise ValueError('No image provided')
+    spool.seek(0)
+    return spool, request.query_params
+
+@timed('/process-image')
+async def process_image(request):
+    try:
+        upload, options = await read_upload(request)
+    except OverflowError:
+        return error('Upload is too large.', 413)
+    except ValueError as e:
+        return error(str(e))
+    engine = options.get('engine', flask_app.OCR_ENGINE)
+    if engine not in flask_app.OCR_ENGINES:
+        return error(f'Unknown OCR engine. Choose one of: {", ".join(flask_app.OCR_ENGINES)}.')
+
+    if engine == 'local':
+        cached = False
+        try:
+            upload_stats = {'bytes_in': upload_size(upload)}
+            grid, timings = await run_in_threadpool(local_ocr, upload.read())
+        except (ValueError, RuntimeError) as e:
+            OCR_ERRORS.inc(error=type(e).__name__)
+            return error(str(e), 400 if isinstance(e, ValueError) else 500)
+        OCR_PAYLOAD_BYTES.observe(upload_stats['bytes_in'], direction='in')
+        OCR_LATENCY.observe(timings['total_ms'] / 1000, engine='local')
+    else:
+        if not flask_app.OCR_API_KEY or flask_app.OCR_API_KEY == 'YOUR_API_KEY_HERE':
+            return error('OCR.space API key is missing.', 500)
+        try:
+            # Decoding, hashing and re-encoding are CPU work; only the OCR request itself is awaited
+            grid, state = await run_in_threadpool(flask_app.prepare_remote_ocr, upload)
+            cached = grid is not None
+            if cached:
+                timings, upload_stats = state['timings'], state['upload']
+            else:
+                request_start = time.perf_counter()
+                result = await ocr_client.parse_image(state['payload'], state['files'])
+                request_ms = (time.perf_counter() - request_start) * 1000
+                grid, timings, upload_stats = flask_app.complete_remote_ocr(result, request_ms, state)
+        except (ValueError, OCRBusyError, OCRError, OCRTimeoutError, OCRRequestError) as e:
+            OCR_ERRORS.inc(error=type(e).__name__)
+            return error(str(e), flask_app.ocr_error_status(e))
+    return JSONResponse({'grid': grid, 'engine': engine, 'timings': timings, 'cached': cached, 'upload': upload_stats})
+
+async def read_json(request):
+    try:
+        data = await request.json()
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+@timed('/solve-puzzle')
+async def solve_puzzle(request):
+    data = await read_json(request)
+    if data is None:
+        return error('Invalid board data provided.')
+    board = data.get('board')
+    engine = data.get('engine', flask_app.SOLVER_ENGINE)
+
+    size, message = flask_app.parse_size(data)
+    if message:
+        return error(message)
+    message = flask_app.validate_board(board, size)
+    if message:
+        return error(message)
+    if not isinstance(engine, str) or engine not in SOLVERS:
+        return error(f'Unknown solver engine. Choose one of: {", ".join(SOLVERS)}.')
+    max_nodes, timeout_ms, message = flask_app.parse_budget(data)
+    if message:
+        return error(message)
+    conflict = find_conflict(board)
+    if conflict is not None:
+        observe_solve(engine, 'unsolvable', {}, 0)
+        return JSONResponse(flask_app.conflict_body(conflict), 400)
+
+    cache = flask_app.solution_cache if size == 9 and data.get('cache', True) else None
+    if cache is not None:
+        hit, solution = cache.lookup(board)
+        if hit:
+            observe_solve(engine, 'cached', {}, 0)
+            if solution is None:
+                return error('No solution exists for this Sudoku puzzle.')
+            return JSONResponse({'solution': solution, 'size': size, 'engine': engine, 'cached': True})
+
+    solved, solution, elapsed_ms, stats, reason = await run_in_pool(solve_board, board, engine, max_nodes, timeout_ms)
+    observe_solve(engine, 'budget_exceeded' if reason else 'solved' if solved else 'unsolvable', stats, elapsed_ms)
+    if reason:
+        return JSONResponse(flask_app.budget_exceeded_body(reason, stats, elapsed_ms), 422)
+    if cache is not None and not cache.store(board, solution if solved else None):
+        solved = False  # Not a valid solution; never serve it
+    if not solved:
+        return error('No solution exists for this Sudoku puzzle.')
+    return JSONResponse({'solution': solution, 'size': size, 'engine': engine, 'cached': False})
+
+@timed('/analyze-puzzle')
+async def analyze_puzzle(request):
+    data = await read_json(request)
+    if data is None:
+        return error('Invalid board data provided.')
+    board = data.get('board')
+    limit = data.get('limit', 2)
+
+    size, message = flask_app.parse_size(data)
+    if message:
+        return error(message)
+    message = flask_app.validate_board(board, size)
+    if message:
+        return error(message)
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1 or limit > flask_app.MAX_ANALYZE_LIMIT:
+        return error(f'Limit must be an integer 1-{flask_app.MAX_ANALYZE_LIMIT}.')
+    max_nodes, timeout_ms, message = flask_app.parse_budget(data)
+    if message:
+        return error(message)
+
+    count, elapsed_ms, stats, reason = await run_in_pool(analyze_board, board, limit, max_nodes, timeout_ms)
+    observe_solve('dlx', 'budget_exceeded' if reason else 'analyzed', stats, elapsed_ms)
+    if reason:
+        return JSONResponse(flask_app.budget_exceeded_body(reason, stats, elapsed_ms), 422)
+    return JSONResponse(flask_app.analysis_body(board, limit, count, stats, elapsed_ms))
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    if flask_app.puzzle_pool is not None:
+        flask_app.puzzle_pool.start()  # Only in the serving process, so pools start filling before the first request
+    yield
+    if flask_app.puzzle_pool is not None:
+        flask_app.puzzle_pool.stop()
+    await ocr_client.aclose()
+
+app = Starlette(
+    routes=[
+        Route('/process-image', process_image, methods=['POST']),
+        Route('/solve-puzzle', solve_puzzle, methods=['POST']),
+        Route('/analyze-puzzle', analyze_puzzle, methods=['POST']),
+        Mount('/', WSGIMiddleware(flask_app.app)),
+    ],
+    lifespan=lifespan,
+)
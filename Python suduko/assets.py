@@ -0,0 +1,139 @@
+import gzip
+import hashlib
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # Brotli variants are optional; gzip is always built
+    brotli = None
+
+# Only these files are ever served; everything else in the directory (app.py, .env, ...) stays private
+ASSETS = ('index.html', 'script.js', 'style.css')
+ENTRY = 'index.html'
+MIMETYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'text/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+}
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+MIN_COMPRESS_SIZE = 256  # Smaller files are not worth a compressed variant
+
+class Asset:
+    """One file held in memory with its precompressed variants"""
+
+    def __init__(self, name, data):
+        self.name = name
+        self.mimetype = MIMETYPES[os.path.splitext(name)[1]]
+        self.digest = hashlib.sha256(data).hexdigest()[:16]
+        stem, ext = os.path.splitext(name)
+        self.fingerprinted = f'{stem}.{self.digest[:10]}{ext}'
+        self.variants = {'identity': data}
+        if len(data) >= MIN_COMPRESS_SIZE:
+            self.variants['gzip'] = gzip.compress(data, 9, mtime=0)
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(data, quality=11)
+        # Keep a variant only if it is actually smaller
+        for encoding in ('gzip', 'br'):
+            if encoding in self.variants and len(self.variants[encoding]) >= len(data):
+                del self.variants[encoding]
+
+    def etag(self, encoding):
+        return f'"{self.digest}-{encoding}"'
+
+def choose_encoding(accept_encoding, available):
+    """Pick br, gzip or identity from an Accept-Encoding header, honouring q=0"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    for encoding in ('br', 'gzip'):
+        if encoding in available and accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return 'identity'
+
+def _if_none_match(header, etag):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # Weak comparison, as RFC 9110 prescribes for If-None-Match
+    tags = [tag.strip() for tag in header.split(',')]
+    return etag in tags or f'W/{etag}' in tags
+
+class AssetStore:
+    """Fingerprinted, precompressed front-end assets.
+
+    index.html is rewritten to reference script.<hash>.js and style.<hash>.css,
+    which are served with an immutable Cache-Control; index.html and the plain
+    names are revalidated through their ETag on every load.
+    """
+
+    def __init__(self, root, names=ASSETS, reload=False):
+        self.root = root
+        self.names = names
+        self.reload = reload
+        self._mtimes = None
+        self._paths = {}
+        self._load()
+
+    def _stat(self):
+        return tuple(os.stat(os.path.join(self.root, name)).st_mtime_ns for name in self.names)
+
+    def _load(self):
+        self._mtimes = self._stat()
+        raw = {}
+        for name in self.names:
+            with open(os.path.join(self.root, name), 'rb') as f:
+                raw[name] = f.read()
+
+        assets = {name: Asset(name, data) for name, data in raw.items() if name != ENTRY}
+        if ENTRY in raw:
+            html = raw[ENTRY].decode('utf-8')
+            for name, asset in assets.items():
+                html = re.sub(rf'((?:src|href)=["\']){re.escape(name)}(["\'])', rf'\g<1>{asset.fingerprinted}\g<2>', html)
+            assets[ENTRY] = Asset(ENTRY, html.encode('utf-8'))
+
+        paths = {}
+        for name, asset in assets.items():
+            paths[name] = (asset, False)
+            if name != ENTRY:
+                paths[asset.fingerprinted] = (asset, True)
+        if ENTRY in assets:
+            paths[''] = (assets[ENTRY], False)
+        self._paths = paths
+
+    def respond(self, path, headers):
+        """Build the response for a request path ('' for the root) and its request headers.
+
+        Returns (status, response headers, body), or None if path is not an asset.
+        """
+        if self.reload and self._stat() != self._mtimes:
+            self._load()
+        found = self._paths.get(path)
+        if found is None:
+            return None
+        asset, immutable = found
+        encoding = choose_encoding(headers.get('Accept-Encoding'), asset.variants)
+        etag = asset.etag(encoding)
+        response_headers = {
+            'ETag': etag,
+            'Cache-Control': IMMUTABLE if immutable else REVALIDATE,
+            'Vary': 'Accept-Encoding',
+        }
+        if _if_none_match(headers.get('If-None-Match'), etag):
+            return 304, response_headers, b''
+        body = asset.variants[encoding]
+        response_headers['Content-Type'] = asset.mimetype
+        if encoding != 'identity':
+            response_headers['Content-Encoding'] = encoding
+        return 200, response_headers, body
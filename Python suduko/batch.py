@@ -0,0 +1,192 @@
+import json
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, ProcessPoolExecutor, as_completed
+
+from metrics import observe_solve
+from solver import SOLVERS, BudgetExceeded, SearchBudget, count_solutions
+
+ORDERS = ('input', 'completion')
+MAX_CONCURRENT_BATCHES = 256
+
+_executor = None
+_cancel_flags = None  # Shared with the workers: one byte per batch slot
+_free_slots = list(range(MAX_CONCURRENT_BATCHES))
+_batches = {}
+_lock = threading.Lock()
+
+def _init_worker(cancel_flags):
+    global _cancel_flags
+    _cancel_flags = cancel_flags
+
+def get_executor(max_workers=None):
+    """Return the shared process pool, creating it on first use"""
+    global _executor, _cancel_flags
+    if _executor is None:
+        _cancel_flags = multiprocessing.RawArray('b', MAX_CONCURRENT_BATCHES)
+        _executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(_cancel_flags,))
+    return _executor
+
+def parse_board_line(line):
+    """Parse an 81-character puzzle line ('0' or '.' for empty cells) into a 9x9 board"""
+    line = line.strip()
+    if len(line) != 81:
+        raise ValueError('Puzzle lines must have exactly 81 characters.')
+    cells = []
+    for ch in line:
+        if ch == '.':
+            cells.append(0)
+        elif '0' <= ch <= '9':
+            cells.append(ord(ch) - 48)
+        else:
+            raise ValueError(f'Invalid character {ch!r} in puzzle line.')
+    return [cells[r * 9:r * 9 + 9] for r in range(9)]
+
+def format_board_line(board):
+    return ''.join(str(cell) for row in board for cell in row)
+
+def parse_batch_text(text):
+    """Split a text body into (board, error) pairs, one per non-empty, non-comment line"""
+    jobs = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            jobs.append((parse_board_line(line), None))
+        except ValueError as e:
+            jobs.append((None, str(e)))
+    return jobs
+
+def solve_board(board, engine, max_nodes=None, timeout_ms=None, slot=None):
+    """Worker entry point: solve one board within its budget and time it"""
+    cancelled = (lambda: _cancel_flags[slot]) if slot is not None else None
+    budget = SearchBudget(max_nodes, timeout_ms, cancelled)
+    stats = {}
+    start = time.perf_counter()
+    try:
+        solved = SOLVERS[engine](board, stats, budget)
+        reason = None
+    except BudgetExceeded as e:
+        solved = False
+        reason = e.reason
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return solved, board, elapsed_ms, stats, reason
+
+def analyze_board(board, limit, max_nodes=None, timeout_ms=None):
+    """Worker entry point: count solutions of one board within its budget"""
+    budget = SearchBudget(max_nodes, timeout_ms)
+    stats = {}
+    start = time.perf_counter()
+    try:
+        count = count_solutions(board, limit, stats, budget)
+        reason = None
+    except BudgetExceeded as e:
+        count = None
+        reason = e.reason
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return count, elapsed_ms, stats, reason
+
+def submit_batch(jobs, engine, order='input', as_text=False, max_workers=None, max_nodes=None, timeout_ms=None):
+    """Queue (board, error) jobs on the process pool.
+
+    Returns (batch_id, generator yielding one NDJSON line per board). Raises
+    RuntimeError if too many batches are already running.
+    """
+    executor = get_executor(max_workers)
+    with _lock:
+        if not _free_slots:
+            raise RuntimeError('Too many batches in progress.')
+        slot = _free_slots.pop()
+        _cancel_flags[slot] = 0
+        batch_id = uuid.uuid4().hex
+        futures = {}
+        _batches[batch_id] = (slot, futures)
+
+    errors = {}
+    for index, (board, error) in enumerate(jobs):
+        if error:
+            errors[index] = {'index': index, 'error': error}
+        else:
+            futures[executor.submit(solve_board, board, engine, max_nodes, timeout_ms, slot)] = index
+    return batch_id, _stream(batch_id, engine, len(jobs), futures, errors, order, as_text)
+
+def cancel_batch(batch_id):
+    """Stop a running batch: queued boards are dropped and running ones give up. Returns False if unknown."""
+    with _lock:
+        batch = _batches.get(batch_id)
+        if batch is None:
+            return False
+        slot, futures = batch
+        _cancel_flags[slot] = 1
+    for future in futures:
+        future.cancel()
+    return True
+
+def _result_line(index, engine, future, as_text):
+    try:
+        solved, board, elapsed_ms, stats, reason = future.result()
+    except CancelledError:
+        return {'index': index, 'error': 'Cancelled.', 'cancelled': True}
+    observe_solve(engine, 'budget_exceeded' if reason else 'solved' if solved else 'unsolvable', stats, elapsed_ms)
+    if reason:
+        return {
+            'index': index,
+            'error': f'Solver budget exceeded ({reason}).',
+            'budget_exceeded': True,
+            'reason': reason,
+            'stats': stats,
+            'elapsed_ms': round(elapsed_ms, 3),
+        }
+    if not solved:
+        return {'index': index, 'error': 'No solution exists for this Sudoku puzzle.', 'elapsed_ms': round(elapsed_ms, 3)}
+    return {
+        'index': index,
+        'solution': format_board_line(board) if as_text else board,
+        'elapsed_ms': round(elapsed_ms, 3),
+    }
+
+def _stream(batch_id, engine, count, futures, errors, order, as_text):
+    try:
+        if order == 'completion':
+            for line in errors.values():
+                yield json.dumps(line) + '\n'
+            for future in as_completed(futures):
+                yield json.dumps(_result_line(futures[future], engine, future, as_text)) + '\n'
+        else:
+            by_index = {index: future for future, index in futures.items()}
+            for index in range(count):
+                if index in errors:
+                    yield json.dumps(errors[index]) + '\n'
+                else:
+                    yield json.dumps(_result_line(index, engine, by_index[index], as_text)) + '\n'
+    finally:
+        # Finished, or the client went away: stop anything still queued or running
+        cancel_batch(batch_id)
+        with _lock:
+            slot, _ = _batches.pop(batch_id)
+        _release_slot(slot, futures)
+
+def _release_slot(slot, futures):
+    """Put slot back on the free list once no future of its batch is still running.
+
+    Reusing the slot resets its cancel flag, which a cancelled worker that has
+    not yet noticed the flag would otherwise see cleared and run to the end.
+    """
+    running = [future for future in futures if not future.done()]
+    if not running:
+        with _lock:
+            _free_slots.append(slot)
+        return
+    left = [len(running)]
+
+    def done(_):
+        with _lock:
+            left[0] -= 1
+            if not left[0]:
+                _free_slots.append(slot)
+
+    for future in running:
+        future.add_done_callback(done)  # Runs at once if the future finished meanwhile
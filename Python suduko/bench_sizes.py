@@ -0,0 +1,79 @@
+"""Scaling benchmark: solve time versus board size for each solver engine.
+
+    python bench_sizes.py
+    python bench_sizes.py --sizes 9 16 25 --puzzles 10 --givens 0.6 --engines bitmask dlx
+
+Puzzles are random relabelings of a valid pattern grid with a fixed fraction
+of cells kept as givens, so every size gets comparable, solvable boards. Each
+solve runs under --timeout-ms; timed-out solves are counted, not averaged.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from math import isqrt
+
+from solver import SOLVERS, BudgetExceeded, SearchBudget
+
+def solved_grid(size, rng):
+    """A random valid size x size grid: a shuffled base pattern"""
+    box = isqrt(size)
+    rows = [b * box + r for b in rng.sample(range(box), box) for r in rng.sample(range(box), box)]
+    cols = [b * box + c for b in rng.sample(range(box), box) for c in rng.sample(range(box), box)]
+    digits = rng.sample(range(1, size + 1), size)
+    return [[digits[(box * (r % box) + r // box + c) % size] for c in cols] for r in rows]
+
+def make_puzzle(size, givens, rng):
+    return [[cell if rng.random() < givens else 0 for cell in row] for row in solved_grid(size, rng)]
+
+def bench(engine, size, puzzles, timeout_ms):
+    times, nodes, timeouts = [], [], 0
+    for puzzle in puzzles:
+        board = [row[:] for row in puzzle]
+        stats = {}
+        start = time.perf_counter()
+        try:
+            SOLVERS[engine](board, stats, SearchBudget(timeout_ms=timeout_ms))
+        except BudgetExceeded:
+            timeouts += 1
+            continue
+        times.append((time.perf_counter() - start) * 1000)
+        nodes.append(stats['nodes'])
+    return {
+        'engine': engine,
+        'size': size,
+        'puzzles': len(puzzles),
+        'timeouts': timeouts,
+        'median_ms': round(statistics.median(times), 3) if times else None,
+        'max_ms': round(max(times), 3) if times else None,
+        'median_nodes': statistics.median(nodes) if nodes else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[4, 9, 16, 25])
+    parser.add_argument('--engines', nargs='+', default=list(SOLVERS), choices=list(SOLVERS))
+    parser.add_argument('--puzzles', type=int, default=5, help='Puzzles per size')
+    parser.add_argument('--givens', type=float, default=0.55, help='Fraction of cells kept as givens')
+    parser.add_argument('--timeout-ms', type=int, default=5000, help='Per-solve time budget')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='Print one JSON object per row')
+    args = parser.parse_args()
+
+    if not args.json:
+        print(f'{"engine":<14}{"size":>5}{"solved":>8}{"median ms":>12}{"max ms":>12}{"nodes":>10}')
+    for size in args.sizes:
+        rng = random.Random(args.seed + size)
+        puzzles = [make_puzzle(size, args.givens, rng) for _ in range(args.puzzles)]
+        for engine in args.engines:
+            row = bench(engine, size, puzzles, args.timeout_ms)
+            if args.json:
+                print(json.dumps(row))
+                continue
+            solved = f'{row["puzzles"] - row["timeouts"]}/{row["puzzles"]}'
+            fmt = lambda value: '-' if value is None else value
+            print(f'{engine:<14}{size:>5}{solved:>8}{fmt(row["median_ms"]):>12}{fmt(row["max_ms"]):>12}{fmt(row["median_nodes"]):>10}')
+
+if __name__ == '__main__':
+    main()
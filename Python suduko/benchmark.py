@@ -0,0 +1,244 @@
+"""Solver and OCR-parsing benchmark with a regression gate.
+
+    python benchmark.py                          # run, write results, compare with the baseline
+    python benchmark.py --engines bitmask dlx --corpora hard 17clue
+    python benchmark.py --update-baseline        # accept the current numbers as the new baseline
+
+Solves every puzzle in benchmarks/corpora/*.txt with each engine, reporting
+solve-time percentiles and node counts, and times parse_ocr_result on the
+recorded OCR.space responses in benchmarks/fixtures/ocr/. Results are written
+as JSON to benchmarks/results.json (--output - prints them instead). The run
+exits with status 1 if a deterministic figure is worse than the baseline: more
+puzzles over the --max-nodes budget (timeouts), fewer solved puzzles, node or backtrack totals up by more than
+--threshold, or lower OCR accuracy. Timings only compare meaningfully on the
+machine that recorded the baseline, so slower timings are printed as advisory
+warnings; --gate-timing fails on them too, above a TIMING_FLOOR_MS floor.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from batch import parse_batch_text, parse_board_line
+from ocr_client import parse_ocr_result
+from solver import SOLVERS, BudgetExceeded, SearchBudget
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPORA_DIR = os.path.join(HERE, 'benchmarks', 'corpora')
+FIXTURES_DIR = os.path.join(HERE, 'benchmarks', 'fixtures', 'ocr')
+BASELINE = os.path.join(HERE, 'benchmarks', 'baseline.json')
+RESULTS = os.path.join(HERE, 'benchmarks', 'results.json')
+TIMING_FLOOR_MS = 50  # With --gate-timing, slowdowns smaller than this never fail the run
+
+def load_corpora(names=None):
+    corpora = {}
+    for path in sorted(glob.glob(os.path.join(CORPORA_DIR, '*.txt'))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if names and name not in names:
+            continue
+        with open(path) as f:
+            jobs = parse_batch_text(f.read())
+        bad = [error for _, error in jobs if error]
+        if bad:
+            raise ValueError(f'{path}: {bad[0]}')
+        corpora[name] = [board for board, _ in jobs]
+    return corpora
+
+def percentile(values, p):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered) + 0.5) - 1))]
+
+def bench_solver(engine, boards, repeat, timeout_ms, max_nodes=None):
+    """Best-of-repeat time, node and backtrack counts per puzzle for one engine"""
+    times, nodes, backtracks, timeouts, unsolved = [], [], [], 0, 0
+    for board in boards:
+        best = None
+        for _ in range(repeat):
+            work = [row[:] for row in board]
+            stats = {}
+            start = time.perf_counter()
+            try:
+                solved = SOLVERS[engine](work, stats, SearchBudget(max_nodes, timeout_ms))
+            except BudgetExceeded:
+                best = None
+                break
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        if best is None:
+            timeouts += 1
+            continue
+        if not solved:
+            unsolved += 1
+        times.append(best)
+        nodes.append(stats['nodes'])
+        backtracks.append(stats['backtracks'])
+
+    result = {'puzzles': len(boards), 'solved': len(times) - unsolved, 'timeouts': timeouts}
+    if times:
+        result.update({
+            'p50_ms': round(percentile(times, 50), 3),
+            'p90_ms': round(percentile(times, 90), 3),
+            'p99_ms': round(percentile(times, 99), 3),
+            'max_ms': round(max(times), 3),
+            'mean_ms': round(statistics.fmean(times), 3),
+            'total_ms': round(sum(times), 3),
+            'nodes_p50': percentile(nodes, 50),
+            'nodes_max': max(nodes),
+            'nodes_total': sum(nodes),
+            'backtracks_total': sum(backtracks),
+        })
+    return result
+
+def bench_ocr_parse(min_seconds):
+    """parse_ocr_result throughput and per-cell accuracy over the recorded fixtures"""
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.json'))):
+        with open(path) as f:
+            data = json.load(f)
+        fixtures.append((data['response']['ParsedResults'][0], parse_board_line(data['expected'])))
+    if not fixtures:
+        return None
+
+    correct = sum(
+        got == want
+        for parsed, expected in fixtures
+        for got_row, want_row in zip(parse_ocr_result(parsed), expected)
+        for got, want in zip(got_row, want_row)
+    )
+    calls, samples = 0, []
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_seconds:
+        for parsed, _ in fixtures:
+            t = time.perf_counter()
+            parse_ocr_result(parsed)
+            samples.append((time.perf_counter() - t) * 1e6)
+            calls += 1
+    elapsed = time.perf_counter() - start
+    return {
+        'fixtures': len(fixtures),
+        'calls': calls,
+        'per_sec': round(calls / elapsed, 1),
+        'p50_us': round(percentile(samples, 50), 2),
+        'p99_us': round(percentile(samples, 99), 2),
+        'accuracy': round(correct / (81 * len(fixtures)), 4),
+    }
+
+def compare(results, baseline, threshold, gate_timing=False):
+    """Human-readable (regressions, advisories) of results against baseline.
+
+    Counts and accuracy are deterministic and always gate. Timings are advisory
+    unless gate_timing, and then only beyond TIMING_FLOOR_MS.
+    """
+    problems, advisories = [], []
+    limit = 1 + threshold
+
+    def timing(message, slower_ms):
+        if gate_timing and slower_ms > TIMING_FLOOR_MS:
+            problems.append(message)
+        else:
+            advisories.append(message)
+
+    for corpus, engines in results['solvers'].items():
+        for engine, now in engines.items():
+            before = baseline.get('solvers', {}).get(corpus, {}).get(engine)
+            if not before:
+                continue
+            where = f'{corpus}/{engine}'
+            if now['timeouts'] > before['timeouts']:
+                problems.append(f'{where}: {now["timeouts"]} timeouts (baseline {before["timeouts"]})')
+            if now['solved'] < before['solved']:
+                problems.append(f'{where}: solved {now["solved"]} (baseline {before["solved"]})')
+            for key in ('nodes_total', 'backtracks_total'):
+                if key in now and key in before and now[key] > before[key] * limit:
+                    problems.append(f'{where}: {key} {now[key]} vs baseline {before[key]}')
+            # Tail percentiles of ten-odd puzzles are too noisy to report; the median and total less so
+            for key in ('p50_ms', 'total_ms'):
+                if key in now and key in before and now[key] > before[key] * limit:
+                    timing(f'{where}: {key} {now[key]} vs baseline {before[key]}', now[key] - before[key])
+
+    now, before = results.get('ocr_parse'), baseline.get('ocr_parse')
+    if now and before:
+        if now['per_sec'] * limit < before['per_sec']:
+            # Slowdown of one pass over the fixtures
+            slower_ms = (1 / now['per_sec'] - 1 / before['per_sec']) * 1000 * now['fixtures']
+            timing(f'ocr_parse: {now["per_sec"]}/s vs baseline {before["per_sec"]}/s', slower_ms)
+        if now['accuracy'] < before['accuracy']:
+            problems.append(f'ocr_parse: accuracy {now["accuracy"]} vs baseline {before["accuracy"]}')
+    return problems, advisories
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--engines', nargs='+', default=list(SOLVERS), choices=list(SOLVERS))
+    parser.add_argument('--corpora', nargs='+', help='Corpus names (default: all in benchmarks/corpora)')
+    parser.add_argument('--repeat', type=int, default=5, help='Solves per puzzle; the fastest counts')
+    parser.add_argument('--max-nodes', type=int, default=200000, help='Per-solve node budget; unlike time, it gives up on the same puzzles everywhere')
+    parser.add_argument('--timeout-ms', type=int, default=30000, help='Per-solve time budget, a safety net behind --max-nodes')
+    parser.add_argument('--ocr-seconds', type=float, default=1.0, help='How long to loop parse_ocr_result')
+    parser.add_argument('--output', default=RESULTS, help='Where to write the results; - for stdout')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed increase as a fraction, e.g. 0.25 = 25%%')
+    parser.add_argument('--gate-timing', action='store_true', help=f'Also fail on timings slower by over --threshold and {TIMING_FLOOR_MS} ms')
+    parser.add_argument('--update-baseline', action='store_true', help='Write the results to the baseline file')
+    args = parser.parse_args()
+
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'repeat': args.repeat,
+            'max_nodes': args.max_nodes,
+            'timeout_ms': args.timeout_ms,
+        },
+        'solvers': {},
+    }
+    print(f'{"corpus":<12}{"engine":<14}{"solved":>9}{"p50 ms":>10}{"p90 ms":>10}{"p99 ms":>10}{"nodes p50":>11}')
+    for corpus, boards in load_corpora(args.corpora).items():
+        results['solvers'][corpus] = {}
+        for engine in args.engines:
+            row = bench_solver(engine, boards, args.repeat, args.timeout_ms, args.max_nodes)
+            results['solvers'][corpus][engine] = row
+            solved = f'{row["solved"]}/{row["puzzles"]}'
+            cells = [row.get(key, '-') for key in ('p50_ms', 'p90_ms', 'p99_ms', 'nodes_p50')]
+            print(f'{corpus:<12}{engine:<14}{solved:>9}{cells[0]:>10}{cells[1]:>10}{cells[2]:>10}{cells[3]:>11}')
+
+    results['ocr_parse'] = bench_ocr_parse(args.ocr_seconds)
+    if results['ocr_parse']:
+        ocr = results['ocr_parse']
+        print(f'parse_ocr_result: {ocr["per_sec"]}/s, p50 {ocr["p50_us"]} us, accuracy {ocr["accuracy"]} over {ocr["fixtures"]} fixtures')
+
+    if args.output == '-':
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f'Baseline updated: {args.baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline to compare with; run with --update-baseline to record one.')
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    problems, advisories = compare(results, baseline, args.threshold, args.gate_timing)
+    for advisory in advisories:
+        print(f'SLOWER (advisory) {advisory}')
+    for problem in problems:
+        print(f'REGRESSION {problem}')
+    if not problems:
+        print(f'No regressions beyond {args.threshold:.0%} of the baseline.')
+    return 1 if problems else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
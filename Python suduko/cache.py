@@ -0,0 +1,264 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from itertools import permutations
+from operator import itemgetter
+
+from PIL import Image
+
+from solver import find_conflict, is_solution
+
+def _build_transforms():
+    """Cell permutations for transposition x band permutations x stack permutations (72 in total)"""
+    transforms = []
+    for transpose in (False, True):
+        for bands in permutations(range(3)):
+            for stacks in permutations(range(3)):
+                perm = []
+                for r in range(9):
+                    for c in range(9):
+                        src_r = bands[r // 3] * 3 + r % 3
+                        src_c = stacks[c // 3] * 3 + c % 3
+                        if transpose:
+                            src_r, src_c = src_c, src_r
+                        perm.append(src_r * 9 + src_c)
+                transforms.append((perm, itemgetter(*perm)))
+    return transforms
+
+TRANSFORMS = _build_transforms()
+IDENTITY = bytes(range(256))
+
+def flatten(board):
+    return bytes(cell for row in board for cell in row)
+
+def unflatten(flat):
+    return [list(flat[r * 9:r * 9 + 9]) for r in range(9)]
+
+def canonicalize(board):
+    """Map board to its canonical form under digit relabeling, transposition and band/stack permutations.
+
+    Returns (key, perm, labels): key is the canonical 81-byte puzzle, canonical cell k
+    holds labels[board cell perm[k]].
+    """
+    flat = flatten(board)
+    unused = [d for d in range(1, 10) if d not in flat]
+    best = None
+    for perm, take in TRANSFORMS:
+        seq = bytes(take(flat))
+        # Relabel digits in order of first appearance, then the unused ones in order
+        labels = bytearray(IDENTITY)
+        label = 1
+        for d in dict.fromkeys(seq):
+            if d:
+                labels[d] = label
+                label += 1
+        for d in unused:
+            labels[d] = label
+            label += 1
+        key = seq.translate(labels)
+        if best is None or key < best[0]:
+            best = (key, perm, labels)
+    return best
+
+def to_canonical(solution, perm, labels):
+    flat = flatten(solution)
+    return bytes(labels[flat[p]] for p in perm)
+
+def from_canonical(key, perm, labels):
+    inverse = {labels[d]: d for d in range(10)}
+    flat = bytearray(81)
+    for k, p in enumerate(perm):
+        flat[p] = inverse[key[k]]
+    return unflatten(flat)
+
+class SolutionCache:
+    """Bounded LRU of canonical puzzle -> canonical solution, with an optional sqlite tier"""
+
+    NO_SOLUTION = b''
+
+    def __init__(self, maxsize=10000, db_path=None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute('CREATE TABLE IF NOT EXISTS solutions (puzzle BLOB PRIMARY KEY, solution BLOB NOT NULL)')
+            self._db.commit()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+            if self._db is not None:
+                row = self._db.execute('SELECT solution FROM solutions WHERE puzzle = ?', (key,)).fetchone()
+                if row is not None and row[0] and not is_solution(unflatten(key), unflatten(row[0])):
+                    # Written before solutions were verified (e.g. by an engine fed conflicting givens)
+                    self._db.execute('DELETE FROM solutions WHERE puzzle = ?', (key,))
+                    self._db.commit()
+                    row = None
+                if row is not None:
+                    self.disk_hits += 1
+                    self._remember(key, row[0])
+                    return row[0]
+            return None
+
+    def _put(self, key, entry, persist=True):
+        with self._lock:
+            self._remember(key, entry)
+            if persist and self._db is not None:
+                self._db.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?)', (key, entry))
+                self._db.commit()
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def lookup(self, board):
+        """Look board up without solving it. Returns (hit, solution or None)."""
+        # Every key maps to a solution of that literal puzzle, so exact repeats share
+        # the table with canonical forms and skip canonicalization entirely.
+        flat = flatten(board)
+        entry = self._get(flat)
+        if entry is None:
+            key, perm, labels = canonicalize(board)
+            entry = self._get(key)
+            if entry:
+                entry = flatten(from_canonical(entry, perm, labels))
+            if entry is not None:
+                self._put(flat, entry, persist=False)
+
+        self._count(entry is not None)
+        if entry is None:
+            return False, None
+        return True, (unflatten(entry) if entry else None)
+
+    def store(self, board, solution):
+        """Remember the solution of board (None if it has none) for it and every isomorphic puzzle.
+
+        Entries are served to every engine, so a solution that breaks the rules or
+        drops a given is refused. Returns whether it was stored.
+        """
+        if solution is not None and not is_solution(board, solution):
+            return False
+        key, perm, labels = canonicalize(board)
+        if solution is None:
+            self._put(key, self.NO_SOLUTION)
+            self._put(flatten(board), self.NO_SOLUTION, persist=False)
+        else:
+            self._put(key, to_canonical(solution, perm, labels))
+            self._put(flatten(board), flatten(solution), persist=False)
+        return True
+
+    def solve(self, board, solver):
+        """Solve board through the cache. Returns (solution or None, hit)."""
+        if find_conflict(board) is not None:
+            return None, False  # Unsolvable as given; nothing to look up or remember
+        hit, solution = self.lookup(board)
+        if hit:
+            return solution, True
+        solution = [row[:] for row in board]
+        if not solver(solution):
+            solution = None
+        if not self.store(board, solution):
+            solution = None  # The engine returned a grid that is not a solution; never serve it
+        return solution, False
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'disk': self._db is not None,
+            }
+
+def image_hash(img, size=128, dead_zone=32):
+    """Perceptual hash of a PIL image: which pixels of a size x size grayscale thumbnail are
+    clearly dark and which are clearly light.
+
+    Pixels within dead_zone of the mid-gray threshold belong to neither set, so
+    the anti-aliased edges that recompression nudges back and forth don't count.
+    Returns (dark bits, light bits) as two ints.
+    """
+    pixels = img.convert('L').resize((size, size), Image.BOX).tobytes()
+    threshold = (min(pixels) + max(pixels)) / 2
+    # Map every pixel to '1' or '0' and read the result as one big binary number
+    dark = pixels.translate(bytes(49 if v < threshold - dead_zone else 48 for v in range(256)))
+    light = pixels.translate(bytes(49 if v > threshold + dead_zone else 48 for v in range(256)))
+    return int(dark, 2), int(light, 2)
+
+def hash_distance(a, b):
+    """Number of pixels clearly dark in one hash and clearly light in the other"""
+    return bin((a[0] & b[1]) | (a[1] & b[0])).count('1')
+
+class ImageHashCache:
+    """LRU of perceptual image hash -> parsed grid, with a TTL and near-duplicate lookup"""
+
+    def __init__(self, maxsize=256, ttl=3600, max_distance=4):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            match = key if key in self._entries else None
+            if match is None and self.max_distance:
+                # Near duplicates: the closest hash within max_distance conflicting pixels
+                best = self.max_distance + 1
+                for other in self._entries:
+                    distance = hash_distance(key, other)
+                    if distance < best:
+                        match, best = other, distance
+            if match is not None:
+                grid, expires = self._entries[match]
+                if expires > now:
+                    self._entries.move_to_end(match)
+                    self.hits += 1
+                    return [row[:] for row in grid]
+                del self._entries[match]
+            self.misses += 1
+            return None
+
+    def put(self, key, grid):
+        with self._lock:
+            self._entries[key] = ([row[:] for row in grid], time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+            }
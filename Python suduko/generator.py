@@ -0,0 +1,310 @@
+import atexit
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from solver import count_solutions, geometry, solve_bitmask
+
+DIFFICULTIES = ('easy', 'medium', 'hard', 'expert')
+# Human techniques from easiest to hardest, with the weight each use adds to the score
+TECHNIQUES = {
+    'naked_single': 1,
+    'hidden_single': 2,
+    'locked_candidates': 6,
+    'naked_pair': 8,
+}
+SEARCH_WEIGHT = 20  # Score per search node once logic alone stalls
+# Givens kept when digging towards each difficulty: easy puzzles stop early, the rest dig to a minimal puzzle
+MIN_GIVENS = {'easy': 36, 'medium': 0, 'hard': 0, 'expert': 0}
+
+G = geometry(9)
+PEERS = [sorted({j for unit in G.units if i in unit for j in unit} - {i}) for i in range(81)]
+
+def _candidates(board):
+    """Candidate bitmask for each empty cell (0 for givens)"""
+    cells = [board[i // 9][i % 9] for i in range(81)]
+    cand = [0] * 81
+    for i in range(81):
+        if not cells[i]:
+            used = 0
+            for j in PEERS[i]:
+                if cells[j]:
+                    used |= 1 << (cells[j] - 1)
+            cand[i] = G.all_digits & ~used
+    return cells, cand
+
+def _assign(cells, cand, i, bit):
+    cells[i] = G.digit[bit]
+    cand[i] = 0
+    for j in PEERS[i]:
+        cand[j] &= ~bit
+
+def _naked_single(cells, cand):
+    for i in range(81):
+        c = cand[i]
+        if c and not c & (c - 1):
+            _assign(cells, cand, i, c)
+            return True
+    return False
+
+def _hidden_single(cells, cand):
+    for unit in G.units:
+        once = twice = 0
+        for i in unit:
+            twice |= once & cand[i]
+            once |= cand[i]
+        singles = once & ~twice
+        if singles:
+            bit = singles & -singles
+            for i in unit:
+                if cand[i] & bit:
+                    _assign(cells, cand, i, bit)
+                    return True
+    return False
+
+def _locked_candidates(cells, cand):
+    """Pointing and claiming: a digit confined to one box-line intersection leaves the rest of the other unit"""
+    rows, cols, boxes = G.units[:9], G.units[9:18], G.units[18:]
+    for box in boxes:
+        box_set = set(box)
+        for lines in (rows, cols):
+            for line in lines:
+                inter = box_set.intersection(line)
+                if not inter:
+                    continue
+                for bit in (1 << d for d in range(9)):
+                    in_inter = any(cand[i] & bit for i in inter)
+                    if not in_inter:
+                        continue
+                    in_box_rest = any(cand[i] & bit for i in box if i not in inter)
+                    in_line_rest = any(cand[i] & bit for i in line if i not in inter)
+                    if in_box_rest == in_line_rest:
+                        continue
+                    # Pointing clears the line outside the box, claiming clears the box outside the line
+                    for i in (line if not in_box_rest else box):
+                        if i not in inter:
+                            cand[i] &= ~bit
+                    return True
+    return False
+
+def _naked_pair(cells, cand):
+    for unit in G.units:
+        pairs = {}
+        for i in unit:
+            c = cand[i]
+            if c and G.popcount(c) == 2:
+                pairs.setdefault(c, []).append(i)
+        for c, members in pairs.items():
+            if len(members) != 2:
+                continue
+            changed = False
+            for i in unit:
+                if i not in members and cand[i] & c:
+                    cand[i] &= ~c
+                    changed = True
+            if changed:
+                return True
+    return False
+
+STEPS = (
+    ('naked_single', _naked_single),
+    ('hidden_single', _hidden_single),
+    ('locked_candidates', _locked_candidates),
+    ('naked_pair', _naked_pair),
+)
+
+def rate(board):
+    """Grade a 9x9 puzzle by the hardest technique it needs and by search effort.
+
+    Returns a dict with the difficulty, technique use counts, the search nodes
+    the bitmask solver spends and a numeric score.
+    """
+    cells, cand = _candidates(board)
+    used = Counter()
+    while not all(cells):
+        for name, step in STEPS:
+            if step(cells, cand):
+                used[name] += 1
+                break
+        else:
+            break  # Logic stalls: the rest needs search
+    stats = {}
+    solve_bitmask([row[:] for row in board], stats)
+    stalled = not all(cells)
+
+    if stalled:
+        difficulty = 'expert'
+    elif used['locked_candidates'] or used['naked_pair']:
+        difficulty = 'hard'
+    elif used['hidden_single']:
+        difficulty = 'medium'
+    else:
+        difficulty = 'easy'
+    score = sum(TECHNIQUES[name] * count for name, count in used.items())
+    if stalled:
+        score += SEARCH_WEIGHT * max(1, stats['nodes'])
+    return {
+        'difficulty': difficulty,
+        'score': score,
+        'techniques': dict(used),
+        'search_nodes': stats['nodes'] if stalled else 0,
+        'givens': sum(1 for row in board for cell in row if cell),
+    }
+
+def random_solution(rng):
+    """A random complete 9x9 grid: fill the independent diagonal boxes at random, then solve"""
+    board = [[0] * 9 for _ in range(9)]
+    for b in (0, 4, 8):
+        digits = rng.sample(range(1, 10), 9)
+        for k, i in enumerate(i for i in range(81) if G.box_of[i] == b):
+            board[i // 9][i % 9] = digits[k]
+    solve_bitmask(board)
+    # Shuffle rows within bands and columns within stacks so the diagonal seeding doesn't show
+    rows = [band * 3 + r for band in rng.sample(range(3), 3) for r in rng.sample(range(3), 3)]
+    cols = [stack * 3 + c for stack in rng.sample(range(3), 3) for c in rng.sample(range(3), 3)]
+    return [[board[r][c] for c in cols] for r in rows]
+
+def dig(solution, rng, min_givens=0):
+    """Remove givens in random order while the puzzle keeps a unique solution"""
+    board = [row[:] for row in solution]
+    givens = 81
+    for i in rng.sample(range(81), 81):
+        if givens <= min_givens:
+            break
+        r, c = divmod(i, 9)
+        board[r][c] = 0
+        if count_solutions(board, 2) != 1:
+            board[r][c] = solution[r][c]
+        else:
+            givens -= 1
+    return board
+
+def generate_puzzle(difficulty, seed=None, attempts=200):
+    """Worker entry point: dig unique-solution puzzles until one rates as difficulty.
+
+    Returns (puzzle, solution, rating, elapsed_ms), or None if no attempt matched.
+    """
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(attempts):
+        solution = random_solution(rng)
+        puzzle = dig(solution, rng, MIN_GIVENS[difficulty])
+        rating = rate(puzzle)
+        if rating['difficulty'] == difficulty:
+            return puzzle, solution, rating, (time.perf_counter() - start) * 1000
+    return None
+
+class PuzzlePool:
+    """Per-difficulty queues of ready puzzles, kept topped up by worker processes in the background"""
+
+    RATE_WINDOW = 60  # Seconds of refills counted in the reported refill rate
+
+    def __init__(self, target=20, workers=1):
+        self.target = target
+        self.workers = workers
+        self._ready = {d: deque() for d in DIFFICULTIES}
+        self._inflight = Counter()
+        self._served = Counter()
+        self._empty = Counter()
+        self._generated = Counter()
+        self._generate_ms = Counter()
+        self._refills = {d: deque() for d in DIFFICULTIES}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._executor = None
+        self._stopped = False
+
+    def start(self):
+        """Start the refill thread and its worker processes (once); they are shut down at exit"""
+        with self._lock:
+            if self._thread is None and not self._stopped:
+                self._executor = ProcessPoolExecutor(self.workers)
+                self._thread = threading.Thread(target=self._run, name='puzzle-pool', daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def stop(self):
+        """Stop refilling and shut the worker processes down; queued puzzles can still be taken"""
+        with self._lock:
+            self._stopped = True
+            executor, self._executor = self._executor, None
+        self._wake.set()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def take(self, difficulty):
+        """Pop a ready (puzzle, solution, rating) for difficulty, or None if that pool is empty.
+
+        The first call starts the pool, so importing the app spawns no processes.
+        """
+        self.start()
+        with self._lock:
+            ready = self._ready[difficulty]
+            if not ready:
+                self._empty[difficulty] += 1
+                item = None
+            else:
+                self._served[difficulty] += 1
+                item = ready.popleft()
+        self._wake.set()
+        return item
+
+    def _run(self):
+        while True:
+            with self._lock:
+                executor = self._executor
+                if executor is None:
+                    return  # Stopped
+                # Keep at most one job per worker in flight, going to the emptiest pools first
+                wanted = sorted(
+                    (d for d in DIFFICULTIES if len(self._ready[d]) + self._inflight[d] < self.target),
+                    key=lambda d: len(self._ready[d]) + self._inflight[d],
+                )
+                for difficulty in wanted[:max(0, self.workers - sum(self._inflight.values()))]:
+                    try:
+                        future = executor.submit(generate_puzzle, difficulty, random.getrandbits(64))
+                    except RuntimeError:
+                        return  # Stopped or interpreter shutting down
+                    self._inflight[difficulty] += 1
+                    future.add_done_callback(lambda f, d=difficulty: self._done(d, f))
+            self._wake.wait()
+            self._wake.clear()
+
+    def _done(self, difficulty, future):
+        try:
+            result = future.result()
+        except Exception:
+            result = None
+        with self._lock:
+            self._inflight[difficulty] -= 1
+            if result is not None:
+                puzzle, solution, rating, elapsed_ms = result
+                self._ready[difficulty].append((puzzle, solution, rating))
+                self._generated[difficulty] += 1
+                self._generate_ms[difficulty] += elapsed_ms
+                self._refills[difficulty].append(time.monotonic())
+        self._wake.set()
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            pools = {}
+            for d in DIFFICULTIES:
+                refills = self._refills[d]
+                while refills and refills[0] < now - self.RATE_WINDOW:
+                    refills.popleft()
+                generated = self._generated[d]
+                pools[d] = {
+                    'depth': len(self._ready[d]),
+                    'target': self.target,
+                    'in_flight': self._inflight[d],
+                    'served': self._served[d],
+                    'empty': self._empty[d],
+                    'generated': generated,
+                    'refill_per_min': round(len(refills) * 60 / self.RATE_WINDOW, 1),
+                    'avg_generate_ms': round(self._generate_ms[d] / generated, 1) if generated else None,
+                }
+            return {'workers': self.workers, 'running': self._executor is not None, 'pools': pools}
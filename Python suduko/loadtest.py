@@ -0,0 +1,157 @@
+"""Load test for /process-image against a local fake OCR.space server.
+
+    python loadtest.py                     # gunicorn sync workers vs. uvicorn asgi:app
+    python loadtest.py --url http://127.0.0.1:5000   # an already running server
+
+The fake server answers every OCR call after --delay seconds, standing in for
+a slow upstream. Each request uploads a freshly generated image so the OCR
+cache never answers for the upstream.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from PIL import Image, ImageDraw
+
+OCR_RESULT = json.dumps({'ParsedResults': [{'TextOverlay': {'Lines': [{'Words': [
+    {'WordText': '5', 'Left': 0, 'Top': 0, 'Width': 10, 'Height': 10},
+    {'WordText': '3', 'Left': 80, 'Top': 80, 'Width': 10, 'Height': 10},
+]}]}}]}).encode()
+
+def start_fake_ocr(port, delay):
+    """Serve a canned OCR.space response after delay seconds, on a background thread"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(OCR_RESULT)))
+            self.end_headers()
+            self.wfile.write(OCR_RESULT)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    server.request_queue_size = 1024
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def make_image(seed):
+    """A small PNG with a random pattern, so every upload hashes differently"""
+    rng = random.Random(seed)
+    img = Image.new('L', (360, 360), 255)
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x, y = rng.randrange(340), rng.randrange(340)
+        draw.rectangle((x, y, x + 20, y + 20), fill=0)
+    out = io.BytesIO()
+    img.save(out, 'PNG')
+    return out.getvalue()
+
+def run_load(url, requests_total, concurrency):
+    """Fire requests_total uploads with concurrency in flight. Returns a summary dict."""
+    images = [make_image(i) for i in range(requests_total)]
+    session = requests.Session()
+    session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+
+    def one(image):
+        start = time.perf_counter()
+        try:
+            response = session.post(f'{url}/process-image', files={'image': ('grid.png', image, 'image/png')}, timeout=120)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        return ok, (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, images))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(ms for _, ms in results)
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': requests_total,
+        'concurrency': concurrency,
+        'errors': sum(1 for ok, _ in results if not ok),
+        'throughput_rps': round(requests_total / elapsed, 1),
+        'p50_ms': round(quantiles[49], 1),
+        'p95_ms': round(quantiles[94], 1),
+        'max_ms': round(latencies[-1], 1),
+    }
+
+def wait_until_up(url, proc, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'Server exited with code {proc.returncode}.')
+        try:
+            requests.get(f'{url}/cache-stats', timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server at {url} did not start.')
+
+def serve(name, command, env, url, args):
+    """Start a server command, load it, stop it and return the summary"""
+    proc = subprocess.Popen(command, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(url, proc)
+        return {'server': name, **run_load(url, args.requests, args.concurrency)}
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Load an already running server instead of starting both')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--delay', type=float, default=0.5, help='Seconds the fake OCR server takes per call')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes for each server')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--ocr-port', type=int, default=8765)
+    args = parser.parse_args()
+
+    start_fake_ocr(args.ocr_port, args.delay)
+    if args.url:
+        print(json.dumps(run_load(args.url.rstrip('/'), args.requests, args.concurrency)))
+        return
+
+    env = {
+        **os.environ,
+        'OCR_ENGINE': 'remote',
+        'OCR_API_KEY': os.getenv('OCR_API_KEY') or 'loadtest',
+        'OCR_API_URL': f'http://127.0.0.1:{args.ocr_port}/',
+        'OCR_CACHE_SIZE': '0',
+        'PUZZLE_POOL_SIZE': '0',
+        # Let each worker keep every in-flight request upstream, so the server model is what's measured
+        'OCR_MAX_CONCURRENCY': str(args.concurrency),
+    }
+    url = f'http://127.0.0.1:{args.port}'
+    bind = f'127.0.0.1:{args.port}'
+    servers = [
+        ('gunicorn sync', [sys.executable, '-m', 'gunicorn', '-w', str(args.workers), '-b', bind, 'app:app']),
+        ('uvicorn asgi', [sys.executable, '-m', 'uvicorn', '--workers', str(args.workers), '--port', str(args.port),
+                          '--log-level', 'warning', 'asgi:app']),
+    ]
+    for name, command in servers:
+        print(json.dumps(serve(name, command, env, url, args)))
+
+if __name__ == '__main__':
+    main()
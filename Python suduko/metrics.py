@@ -0,0 +1,154 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Each server process keeps its own counters; with several gunicorn/uvicorn
+workers, scrape each worker or aggregate on the Prometheus side.
+"""
+import cProfile
+import io
+import pstats
+import threading
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+NODE_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+_metrics = []
+_collectors = []
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic counter, optionally split by labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self.labelnames, key, (), value) for key, value in self._values.items()]
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally split by labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> (per-bucket counts, sum, count)
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0, 0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += n
+                    out.append((self.name + '_bucket', self.labelnames, key, (('le', _format_value(float(bound))),), cumulative))
+                out.append((self.name + '_sum', self.labelnames, key, (), total))
+                out.append((self.name + '_count', self.labelnames, key, (), count))
+        return out
+
+def register_collector(collect):
+    """Add a callable run at scrape time that returns (name, kind, documentation, [(labels dict, value)]) tuples"""
+    _collectors.append(collect)
+
+def render():
+    """All metrics in the Prometheus text format"""
+    lines = []
+    for metric in _metrics:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for name, labelnames, key, extra, value in metric.samples():
+            lines.append(f'{name}{_format_labels(labelnames, key, extra)} {_format_value(value)}')
+    for collect in _collectors:
+        for name, kind, documentation, samples in collect():
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                lines.append(f'{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+REQUEST_LATENCY = Histogram('sudoku_http_request_duration_seconds', 'Request latency by route.', ('route', 'method', 'status'))
+SOLVES = Counter('sudoku_solves_total', 'Solver calls by engine and outcome.', ('engine', 'outcome'))
+SOLVER_NODES = Counter('sudoku_solver_nodes_total', 'Search nodes expanded by the solvers.', ('engine',))
+SOLVER_BACKTRACKS = Counter('sudoku_solver_backtracks_total', 'Backtracks made by the solvers.', ('engine',))
+SOLVE_LATENCY = Histogram('sudoku_solve_duration_seconds', 'Time spent searching, per solver call.', ('engine',))
+SOLVE_NODES = Histogram('sudoku_solve_nodes', 'Search nodes per solver call.', ('engine',), NODE_BUCKETS)
+OCR_LATENCY = Histogram('sudoku_ocr_request_duration_seconds', 'OCR round trip (remote) or pipeline time (local).', ('engine',))
+OCR_PARSE_LATENCY = Histogram('sudoku_ocr_parse_duration_seconds', 'Time spent in parse_ocr_result.')
+OCR_ERRORS = Counter('sudoku_ocr_errors_total', 'Failed /process-image calls by error type.', ('error',))
+OCR_PAYLOAD_BYTES = Histogram('sudoku_ocr_payload_bytes', 'Uploaded and forwarded image sizes.', ('direction',), SIZE_BUCKETS)
+
+def observe_solve(engine, outcome, stats, elapsed_ms):
+    """Record one solver call; outcome is solved, unsolvable, budget_exceeded, cached or analyzed"""
+    SOLVES.inc(engine=engine, outcome=outcome)
+    if outcome == 'cached':
+        return
+    SOLVER_NODES.inc(stats.get('nodes', 0), engine=engine)
+    SOLVER_BACKTRACKS.inc(stats.get('backtracks', 0), engine=engine)
+    SOLVE_LATENCY.observe(elapsed_ms / 1000, engine=engine)
+    SOLVE_NODES.observe(stats.get('nodes', 0), engine=engine)
+
+_profile_lock = threading.Lock()
+
+class RequestProfile:
+    """cProfile one call at a time; start() returns False if another request is already being profiled"""
+
+    def __init__(self, limit=25):
+        self.limit = limit
+        self._profile = None
+
+    def start(self):
+        if not _profile_lock.acquire(blocking=False):
+            return False
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        return True
+
+    def stop(self):
+        """Stop profiling and return the top functions by cumulative time as text"""
+        self._profile.disable()
+        _profile_lock.release()
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).sort_stats('cumulative').print_stats(self.limit)
+        return out.getvalue()
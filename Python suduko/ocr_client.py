@@ -0,0 +1,158 @@
+import asyncio
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, ReadTimeoutError
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:  # Only the async serving mode (asgi.py) needs httpx
+    httpx = None
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class OCRBusyError(Exception):
+    """Raised when no OCR request slot frees up within the timeout"""
+
+class OCRError(Exception):
+    """Raised when the OCR service reports that it could not process an image"""
+
+class OCRTimeoutError(Exception):
+    """Raised when the OCR service does not answer within the timeout"""
+
+class OCRRequestError(Exception):
+    """Raised when the OCR service cannot be reached or keeps failing after retries"""
+
+def parse_ocr_result(parsed_result):
+    """Place the digits of an OCR.space ParsedResult on a 9x9 grid by their position within the text's bounding box"""
+    grid = [[0 for _ in range(9)] for _ in range(9)]
+    lines = parsed_result.get('TextOverlay', {}).get('Lines', [])
+    if not lines:
+        return grid
+    min_x = min_y = float('inf')
+    max_x = max_y = float('-inf')
+    for line in lines:
+        for word in line['Words']:
+            min_x = min(min_x, word['Left'])
+            min_y = min(min_y, word['Top'])
+            max_x = max(max_x, word['Left'] + word['Width'])
+            max_y = max(max_y, word['Top'] + word['Height'])
+    if float('inf') in [min_x, min_y] or float('-inf') in [max_x, max_y]:
+        return grid
+    puzzle_width = max_x - min_x
+    puzzle_height = max_y - min_y
+    cell_width = puzzle_width / 9
+    cell_height = puzzle_height / 9
+    for line in lines:
+        for word in line['Words']:
+            digit_text = word['WordText'].strip()[:1]
+            try:
+                digit = int(digit_text)
+            except ValueError:
+                continue
+            if 1 <= digit <= 9:
+                center_x = word['Left'] + word['Width'] / 2
+                center_y = word['Top'] + word['Height'] / 2
+                col = int((center_x - min_x) / cell_width)
+                row = int((center_y - min_y) / cell_height)
+                if 0 <= row < 9 and 0 <= col < 9 and grid[row][col] == 0:
+                    grid[row][col] = digit
+    return grid
+
+class OCRClient:
+    """Shared, connection-pooled client for the OCR.space API with timeouts, retries and a concurrency cap"""
+
+    def __init__(self, url, api_key, timeout=30, max_concurrency=8, retries=3, backoff=0.5):
+        self.url = url
+        self.api_key = api_key
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'POST'}),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['apikey'] = api_key or ''
+
+    def parse_image(self, payload, files=None):
+        """POST a form payload (and optional file parts) to the OCR endpoint and return the decoded JSON.
+
+        Raises OCRBusyError if every slot stays taken for the timeout, OCRTimeoutError,
+        or OCRRequestError on network errors once retries run out.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise OCRBusyError('OCR service is busy, try again shortly.')
+        try:
+            response = self.session.post(self.url, data=payload, files=files, timeout=(min(5, self.timeout), self.timeout))
+            response.raise_for_status()
+            return response.json()
+        except requests.Timeout:
+            raise OCRTimeoutError('OCR service timed out.')
+        except requests.ConnectionError as e:
+            # Once the retry adapter is involved, a timeout arrives wrapped in MaxRetryError
+            if isinstance(getattr(e.args[0] if e.args else None, 'reason', None), (ConnectTimeoutError, ReadTimeoutError)):
+                raise OCRTimeoutError('OCR service timed out.')
+            raise OCRRequestError(f'OCR service request failed: {e}')
+        except requests.RequestException as e:
+            raise OCRRequestError(f'OCR service request failed: {e}')
+        finally:
+            self._slots.release()
+
+class AsyncOCRClient:
+    """asyncio counterpart of OCRClient built on httpx, for the ASGI app"""
+
+    def __init__(self, url, api_key, timeout=30, max_concurrency=8, retries=3, backoff=0.5):
+        if httpx is None:
+            raise RuntimeError('The async OCR client needs httpx installed.')
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            headers={'apikey': api_key or ''},
+            timeout=httpx.Timeout(timeout, connect=min(5, timeout)),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        )
+
+    async def parse_image(self, payload, files=None):
+        """POST a form payload (and optional file parts) to the OCR endpoint and return the decoded JSON.
+
+        Raises the same errors as OCRClient.parse_image.
+        """
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise OCRBusyError('OCR service is busy, try again shortly.')
+        try:
+            for attempt in range(self.retries + 1):
+                last = attempt == self.retries
+                try:
+                    response = await self._client.post(self.url, data=payload, files=files)
+                except httpx.TimeoutException:
+                    if last:
+                        raise OCRTimeoutError('OCR service timed out.')
+                except httpx.HTTPError as e:
+                    if last:
+                        raise OCRRequestError(f'OCR service request failed: {e}')
+                else:
+                    if response.status_code not in RETRY_STATUSES or last:
+                        try:
+                            response.raise_for_status()
+                            return response.json()
+                        except (httpx.HTTPError, ValueError) as e:
+                            raise OCRRequestError(f'OCR service request failed: {e}')
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+        finally:
+            self._slots.release()
+
+    async def aclose(self):
+        await self._client.aclose()
@@ -0,0 +1,264 @@
+import os
+import time
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:  # The local engine is optional; the remote OCR.space path needs neither
+    cv2 = None
+    np = None
+
+WARP_SIZE = 450  # Side of the rectified grid, 50 px per cell
+GLYPH_SIZE = 20  # Side of the normalized digit image fed to the classifier
+CELL_MARGIN = 0.12  # Fraction of each cell trimmed away to drop grid lines
+MIN_INK = 0.02  # Fraction of a cell that must be ink for it to hold a digit...
+MIN_GLYPH_HEIGHT = 0.35  # ...unless the ink spans this fraction of its height (thin fonts, a lone 1)
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'digits.npz')
+# Sans, serif, monospace and bold faces the bundled model is built from (python ocr_local.py --build-model)
+TRAINING_FONTS = (
+    'DejaVuSans.ttf',
+    'DejaVuSans-Bold.ttf',
+    'DejaVuSerif.ttf',
+    'DejaVuSerif-Bold.ttf',
+    'DejaVuSansMono.ttf',
+    'DejaVuSansMono-Bold.ttf',
+)
+
+_model = None
+
+def _normalize_glyph(mask):
+    """Crop a binary glyph to its bounding box and center it in a GLYPH_SIZE square, as a unit vector"""
+    ys, xs = np.nonzero(mask)
+    glyph = mask[ys.min():ys.max() + 1, xs.min():xs.max() + 1]
+    h, w = glyph.shape
+    scale = (GLYPH_SIZE - 4) / max(h, w)
+    h, w = max(1, round(h * scale)), max(1, round(w * scale))
+    glyph = cv2.resize(glyph, (w, h), interpolation=cv2.INTER_AREA)
+    out = np.zeros((GLYPH_SIZE, GLYPH_SIZE), np.float32)
+    top, left = (GLYPH_SIZE - h) // 2, (GLYPH_SIZE - w) // 2
+    out[top:top + h, left:left + w] = glyph
+    out = cv2.GaussianBlur(out, (5, 5), 0).ravel()
+    out -= out.mean()
+    norm = np.linalg.norm(out)
+    return out / norm if norm else out
+
+def _glyph_variants(image):
+    """Features of a dark-on-light digit image, straight and with small rotations and stroke-weight changes"""
+    h, w = image.shape
+    for angle in (-4, 0, 4):
+        rotation = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+        turned = cv2.warpAffine(image, rotation, (w, h), borderValue=255)
+        _, binary = cv2.threshold(turned, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+        for weight in (None, cv2.dilate, cv2.erode):
+            mask = _cell_glyph(binary if weight is None else weight(binary, np.ones((2, 2), np.uint8)))
+            if mask is not None:
+                yield _normalize_glyph(mask)
+
+def _truetype_digits(font_path):
+    """(digit, image) pairs of font_path's digits at several sizes, rendered like a 50 px cell"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    for size in (22, 30, 38):
+        font = ImageFont.truetype(font_path, size)
+        for digit in range(1, 10):
+            img = Image.new('L', (50, 50), 255)
+            ImageDraw.Draw(img).text((25, 25), str(digit), font=font, fill=0, anchor='mm')
+            yield digit, np.array(img)
+
+def _hershey_digits():
+    """(digit, image) pairs in OpenCV's built-in fonts and weights"""
+    fonts = (
+        cv2.FONT_HERSHEY_SIMPLEX,
+        cv2.FONT_HERSHEY_DUPLEX,
+        cv2.FONT_HERSHEY_COMPLEX,
+        cv2.FONT_HERSHEY_TRIPLEX,
+        cv2.FONT_HERSHEY_PLAIN,
+    )
+    for font in fonts:
+        scale = 3.0 if font == cv2.FONT_HERSHEY_PLAIN else 1.6
+        for thickness in (1, 2, 3, 4):
+            for digit in range(1, 10):
+                canvas = np.full((64, 64), 255, np.uint8)
+                cv2.putText(canvas, str(digit), (12, 52), font, scale, 0, thickness, cv2.LINE_AA)
+                yield digit, canvas
+
+def build_model(fonts=TRAINING_FONTS):
+    """Nearest-neighbour templates for digits 1-9 from the Hershey fonts and the given TrueType fonts.
+
+    Fonts are paths or names Pillow can find; missing ones are skipped. Returns
+    (features, labels, fonts used).
+    """
+    features, labels, used = [], [], []
+    sources = [_hershey_digits()]
+    for font in fonts:
+        try:
+            sources.append(list(_truetype_digits(font)))
+        except OSError:
+            continue
+        used.append(os.path.basename(font))
+    for index, source in enumerate(sources):
+        for digit, image in source:
+            # The Hershey weights already vary the strokes; TrueType digits get the extra variants
+            variants = _glyph_variants(image) if index else [_normalize_glyph(_cell_glyph(255 - image))]
+            for feature in variants:
+                features.append(feature)
+                labels.append(digit)
+    features, labels = np.array(features, np.float32), np.array(labels, np.int8)
+    keep = _distinct(features, labels)
+    return features[keep], labels[keep], used
+
+def _distinct(features, labels, max_similarity=0.97):
+    """Indices of templates that are not near-duplicates of an earlier one of the same digit"""
+    keep = []
+    for digit in range(1, 10):
+        kept = []
+        for i in np.flatnonzero(labels == digit):
+            if not kept or (features[kept] @ features[i]).max() < max_similarity:
+                kept.append(i)
+        keep.extend(kept)
+    return np.array(sorted(keep))
+
+def save_model(path, features, labels):
+    """Store templates as int8 rows; cosine similarity ignores the per-row scale this loses"""
+    scale = 127 / np.abs(features).max(axis=1, keepdims=True)
+    np.savez_compressed(path, features=np.round(features * scale).astype(np.int8), labels=labels)
+
+def load_model(path):
+    data = np.load(path)
+    features = data['features'].astype(np.float32)
+    features /= np.linalg.norm(features, axis=1, keepdims=True)
+    return features, data['labels']
+
+def get_model():
+    """Load the digit model from LOCAL_OCR_MODEL or the bundled MODEL_PATH (.npz with features/labels).
+
+    Without either file, build one from whatever TRAINING_FONTS are installed.
+    """
+    global _model
+    if _model is None:
+        path = os.getenv('LOCAL_OCR_MODEL') or MODEL_PATH
+        if os.path.exists(path):
+            _model = load_model(path)
+        else:
+            features, labels, _ = build_model()
+            _model = (features, labels)
+    return _model
+
+def decode_image(data):
+    """Decode encoded image bytes into a grayscale image"""
+    buffer = np.frombuffer(data, np.uint8)
+    gray = cv2.imdecode(buffer, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        raise ValueError('Could not decode image.')
+    return gray
+
+def _order_corners(pts):
+    """Return corners as top-left, top-right, bottom-right, bottom-left"""
+    s = pts.sum(axis=1)
+    d = np.diff(pts, axis=1).ravel()
+    return np.array([pts[np.argmin(s)], pts[np.argmin(d)], pts[np.argmax(s)], pts[np.argmax(d)]], np.float32)
+
+def find_grid(binary):
+    """Find the outer grid as the largest quadrilateral contour, falling back to the whole image"""
+    contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    min_area = 0.2 * binary.shape[0] * binary.shape[1]
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True):
+        if cv2.contourArea(contour) < min_area:
+            break
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) == 4:
+            return _order_corners(approx.reshape(4, 2).astype(np.float32))
+    h, w = binary.shape
+    return np.array([[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]], np.float32)
+
+def _cell_glyph(cell):
+    """Return the binary mask of the digit in a cell, or None if the cell is empty.
+
+    Every sizeable component near the middle counts, so strokes that thresholding
+    broke apart (thin fonts, downscaled photos) stay one glyph.
+    """
+    count, labels, stats, centroids = cv2.connectedComponentsWithStats(cell, connectivity=8)
+    h, w = cell.shape
+    central = []
+    for i in range(1, count):
+        cx, cy = centroids[i]
+        # Skip grid-line remnants hugging the edges and specks away from the middle
+        if abs(cx - w / 2) <= w * 0.3 and abs(cy - h / 2) <= h * 0.3:
+            central.append(i)
+    if not central:
+        return None
+    largest = max(stats[i, cv2.CC_STAT_AREA] for i in central)
+    keep = [i for i in central if stats[i, cv2.CC_STAT_AREA] >= 0.15 * largest]
+    area = sum(stats[i, cv2.CC_STAT_AREA] for i in keep)
+    top = min(stats[i, cv2.CC_STAT_TOP] for i in keep)
+    bottom = max(stats[i, cv2.CC_STAT_TOP] + stats[i, cv2.CC_STAT_HEIGHT] for i in keep)
+    if area < MIN_INK * h * w and bottom - top < MIN_GLYPH_HEIGHT * h:
+        return None
+    return np.isin(labels, keep).astype(np.uint8) * 255
+
+def local_ocr(data):
+    """Read a Sudoku grid from encoded image bytes without the network. Returns (grid, timings in ms)."""
+    if cv2 is None:
+        raise RuntimeError('The local OCR engine needs opencv-python and numpy installed.')
+    timings = {}
+    start = stage = time.perf_counter()
+
+    def lap(name):
+        nonlocal stage
+        now = time.perf_counter()
+        timings[name] = round((now - stage) * 1000, 3)
+        stage = now
+
+    gray = decode_image(data)
+    lap('decode_ms')
+
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    binary = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2)
+    lap('threshold_ms')
+
+    corners = find_grid(binary)
+    lap('contour_ms')
+
+    target = np.array([[0, 0], [WARP_SIZE - 1, 0], [WARP_SIZE - 1, WARP_SIZE - 1], [0, WARP_SIZE - 1]], np.float32)
+    transform = cv2.getPerspectiveTransform(corners, target)
+    warped = cv2.warpPerspective(gray, transform, (WARP_SIZE, WARP_SIZE))
+    _, warped = cv2.threshold(warped, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    lap('warp_ms')
+
+    step = WARP_SIZE // 9
+    margin = int(step * CELL_MARGIN)
+    positions, glyphs = [], []
+    for row in range(9):
+        for col in range(9):
+            cell = warped[row * step + margin:(row + 1) * step - margin, col * step + margin:(col + 1) * step - margin]
+            mask = _cell_glyph(cell)
+            if mask is not None:
+                positions.append((row, col))
+                glyphs.append(_normalize_glyph(mask))
+    lap('segment_ms')
+
+    grid = [[0 for _ in range(9)] for _ in range(9)]
+    if glyphs:
+        features, labels = get_model()
+        # Nearest template by cosine similarity, for all cells in one matrix product
+        best = np.argmax(np.array(glyphs) @ features.T, axis=1)
+        for (row, col), index in zip(positions, best):
+            grid[row][col] = int(labels[index])
+    lap('classify_ms')
+
+    timings['total_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return grid, timings
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build the digit templates of the local OCR engine')
+    parser.add_argument('--build-model', action='store_true', required=True)
+    parser.add_argument('--fonts', nargs='+', default=list(TRAINING_FONTS), help='TrueType fonts, as paths or names Pillow can find')
+    parser.add_argument('--output', default=MODEL_PATH)
+    args = parser.parse_args()
+    features, labels, used = build_model(args.fonts)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    save_model(args.output, features, labels)
+    print(f'{len(labels)} templates from the Hershey fonts and {", ".join(used) or "no TrueType fonts"} -> {args.output}')
@@ -249,24 +249,20 @@ document.addEventListener('DOMContentLoaded', () => {
             return;
         }
         
-        const reader = new FileReader();
-        reader.onload = function(evt) {
-            const base64Image = evt.target.result;
-            displayImage(base64Image);
-            processImageWithAPI(base64Image);
-        };
-        
-        reader.onerror = function() {
-            updateStatus('Error reading file', 'error', 'fas fa-exclamation-triangle');
-        };
-        
-        reader.readAsDataURL(file);
+        displayImage(file);
+        processImageWithAPI(file);
     }
     
     // Display uploaded image on canvas
-    function displayImage(base64Image) {
+    function displayImage(file) {
         const img = new Image();
+        const imageUrl = URL.createObjectURL(file);
+        img.onerror = function() {
+            URL.revokeObjectURL(imageUrl);
+            updateStatus('Error reading file', 'error', 'fas fa-exclamation-triangle');
+        };
         img.onload = function() {
+            URL.revokeObjectURL(imageUrl);
             canvas.width = 450;
             canvas.height = 450;
             ctx.clearRect(0, 0, canvas.width, canvas.height);
@@ -289,20 +285,20 @@ document.addEventListener('DOMContentLoaded', () => {
             ctx.drawImage(img, offsetX, offsetY, drawWidth, drawHeight);
             canvas.classList.add('visible');
         };
-        img.src = base64Image;
+        img.src = imageUrl;
     }
 
-    async function processImageWithAPI(base64Image) {
+    async function processImageWithAPI(file) {
         setLoading(true, 'Analyzing image with AI...');
         updateStatus('Processing image...', 'info', 'fas fa-cog fa-spin');
         
         try {
+            // Send the file as-is in a multipart body rather than as base64 inside JSON
+            const formData = new FormData();
+            formData.append('image', file);
             const response = await fetch('http://127.0.0.1:5000/process-image', {
                 method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ image: base64Image }),
+                body: formData,
             });
 
             if (!response.ok) {
@@ -0,0 +1,456 @@
+import time
+from functools import lru_cache
+from math import isqrt
+
+class BudgetExceeded(Exception):
+    """Raised when a search runs out of its node or time budget, or is cancelled"""
+
+    def __init__(self, reason):
+        super().__init__(f'Solver budget exceeded ({reason}).')
+        self.reason = reason
+
+class SearchBudget:
+    """Node-expansion and wall-clock limits for one search, plus an optional cancellation check"""
+
+    CHECK_EVERY = 64  # Nodes between clock/cancellation checks
+
+    def __init__(self, max_nodes=None, timeout_ms=None, cancelled=None):
+        self.max_nodes = max_nodes
+        self.deadline = time.perf_counter() + timeout_ms / 1000 if timeout_ms else None
+        self.cancelled = cancelled
+        self.nodes = 0
+
+    def spend(self):
+        """Account for one node expansion, raising BudgetExceeded once a limit is hit"""
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise BudgetExceeded('nodes')
+        if self.nodes % self.CHECK_EVERY == 0:
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise BudgetExceeded('time')
+            if self.cancelled is not None and self.cancelled():
+                raise BudgetExceeded('cancelled')
+
+def is_valid(board, row, col, num):
+    """Check if placing num at board[row][col] is valid according to Sudoku rules"""
+    size = len(board)
+    box = isqrt(size)
+
+    # Check row
+    for x in range(size):
+        if board[row][x] == num:
+            return False
+
+    # Check column
+    for x in range(size):
+        if board[x][col] == num:
+            return False
+
+    # Check box x box sub-grid
+    start_row = row - row % box
+    start_col = col - col % box
+    for i in range(box):
+        for j in range(box):
+            if board[start_row + i][start_col + j] == num:
+                return False
+
+    return True
+
+def solve_sudoku(board, stats=None, budget=None):
+    """Solve Sudoku puzzle using backtracking algorithm"""
+    if stats is None:
+        stats = {}
+    stats.setdefault('nodes', 0)
+    stats.setdefault('backtracks', 0)
+    if find_conflict(board) is not None:
+        return False  # is_valid only looks at new digits, so conflicting givens would "solve"
+    return _backtrack(board, stats, budget)
+
+def _backtrack(board, stats, budget):
+    size = len(board)
+    for row in range(size):
+        for col in range(size):
+            if board[row][col] == 0:  # Empty cell found
+                stats['nodes'] += 1
+                if budget is not None:
+                    budget.spend()
+                for num in range(1, size + 1):  # Try numbers 1-size
+                    if is_valid(board, row, col, num):
+                        board[row][col] = num
+                        if _backtrack(board, stats, budget):
+                            return True
+                        board[row][col] = 0  # Backtrack
+                        stats['backtracks'] += 1
+                return False  # No valid number found
+    return True  # All cells filled successfully
+
+# --- board geometry ---
+class Geometry:
+    """Lookup tables for a size x size board made of box x box boxes (size = box ** 2).
+
+    Cells are indexed row-major. Digit d is stored as the bit 1 << (d - 1), so a
+    row/column/box mask holds every digit already placed in that unit.
+    """
+
+    def __init__(self, box):
+        size = box * box
+        self.box = box
+        self.size = size
+        self.cells = size * size
+        self.all_digits = (1 << size) - 1
+        self.row = [i // size for i in range(self.cells)]
+        self.col = [i % size for i in range(self.cells)]
+        self.box_of = [(i // (size * box)) * box + (i % size) // box for i in range(self.cells)]
+        self.units = (
+            [[r * size + c for c in range(size)] for r in range(size)]
+            + [[r * size + c for r in range(size)] for c in range(size)]
+            + [[i for i in range(self.cells) if self.box_of[i] == b] for b in range(size)]
+        )
+        self.digit = {1 << d: d + 1 for d in range(size)}
+        if size <= 16:
+            self.popcount = [bin(m).count('1') for m in range(self.all_digits + 1)].__getitem__
+        else:
+            self.popcount = lambda m: bin(m).count('1')
+
+@lru_cache(maxsize=None)
+def geometry(size):
+    """Return the Geometry for a size x size board. Raises ValueError unless size is a perfect square."""
+    box = isqrt(size)
+    if size < 1 or box * box != size:
+        raise ValueError(f'Board size must be a perfect square, got {size}.')
+    return Geometry(box)
+
+def find_conflict(board):
+    """(row, col) of the first given that repeats a digit of its row, column or box, else None"""
+    g = geometry(len(board))
+    rows, cols, boxes = [0] * g.size, [0] * g.size, [0] * g.size
+    for i in range(g.cells):
+        num = board[g.row[i]][g.col[i]]
+        if not num:
+            continue
+        bit = 1 << (num - 1)
+        r, c, b = g.row[i], g.col[i], g.box_of[i]
+        if (rows[r] | cols[c] | boxes[b]) & bit:
+            return r, c
+        rows[r] |= bit
+        cols[c] |= bit
+        boxes[b] |= bit
+    return None
+
+def is_solution(board, solution):
+    """True if solution is a complete, rule-abiding grid that keeps every given of board"""
+    g = geometry(len(board))
+    if len(solution) != g.size or any(len(row) != g.size for row in solution):
+        return False
+    for r in range(g.size):
+        for c in range(g.size):
+            if board[r][c] and solution[r][c] != board[r][c]:
+                return False
+    digits = set(range(1, g.size + 1))
+    flat = [solution[g.row[i]][g.col[i]] for i in range(g.cells)]
+    return all({flat[i] for i in unit} == digits for unit in g.units)
+
+# --- bitmask engine ---
+def _place(g, cells, rows, cols, boxes, trail, i, bit):
+    cells[i] = bit
+    rows[g.row[i]] |= bit
+    cols[g.col[i]] |= bit
+    boxes[g.box_of[i]] |= bit
+    trail.append(i)
+
+def _undo(g, cells, rows, cols, boxes, trail, mark):
+    ROW, COL, BOX = g.row, g.col, g.box_of
+    while len(trail) > mark:
+        i = trail.pop()
+        bit = cells[i]
+        cells[i] = 0
+        rows[ROW[i]] ^= bit
+        cols[COL[i]] ^= bit
+        boxes[BOX[i]] ^= bit
+
+def _propagate(g, cells, rows, cols, boxes, trail):
+    """Place naked and hidden singles until none are left. Returns False on a contradiction."""
+    ROW, COL, BOX, ALL_DIGITS = g.row, g.col, g.box_of, g.all_digits
+    changed = True
+    while changed:
+        changed = False
+        # Naked singles: an empty cell with exactly one candidate
+        for i in range(g.cells):
+            if cells[i]:
+                continue
+            cand = ALL_DIGITS & ~(rows[ROW[i]] | cols[COL[i]] | boxes[BOX[i]])
+            if not cand:
+                return False
+            if not cand & (cand - 1):
+                _place(g, cells, rows, cols, boxes, trail, i, cand)
+                changed = True
+        if changed:
+            continue
+
+        # Hidden singles: a digit that fits in only one cell of a unit
+        for unit in g.units:
+            placed = once = twice = 0
+            for i in unit:
+                if cells[i]:
+                    placed |= cells[i]
+                    continue
+                cand = ALL_DIGITS & ~(rows[ROW[i]] | cols[COL[i]] | boxes[BOX[i]])
+                twice |= once & cand
+                once |= cand
+            if placed | once != ALL_DIGITS:
+                return False  # Some digit has nowhere to go in this unit
+            singles = once & ~twice
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                for i in unit:
+                    if not cells[i] and not (rows[ROW[i]] | cols[COL[i]] | boxes[BOX[i]]) & bit:
+                        _place(g, cells, rows, cols, boxes, trail, i, bit)
+                        break
+                else:
+                    return False
+                changed = True
+    return True
+
+def _search(g, cells, rows, cols, boxes, trail, stats, budget):
+    if not _propagate(g, cells, rows, cols, boxes, trail):
+        return False
+
+    # Branch on the empty cell with the fewest candidates (MRV)
+    ROW, COL, BOX, ALL_DIGITS, popcount = g.row, g.col, g.box_of, g.all_digits, g.popcount
+    best = -1
+    best_cand = 0
+    best_count = g.size + 1
+    for i in range(g.cells):
+        if cells[i]:
+            continue
+        cand = ALL_DIGITS & ~(rows[ROW[i]] | cols[COL[i]] | boxes[BOX[i]])
+        count = popcount(cand)
+        if count < best_count:
+            best, best_cand, best_count = i, cand, count
+            if count == 2:
+                break
+    if best < 0:
+        return True  # All cells filled
+
+    stats['nodes'] += 1
+    if budget is not None:
+        budget.spend()
+    while best_cand:
+        bit = best_cand & -best_cand
+        best_cand ^= bit
+        mark = len(trail)
+        _place(g, cells, rows, cols, boxes, trail, best, bit)
+        if _search(g, cells, rows, cols, boxes, trail, stats, budget):
+            return True
+        _undo(g, cells, rows, cols, boxes, trail, mark)
+        stats['backtracks'] += 1
+    return False
+
+def solve_bitmask(board, stats=None, budget=None):
+    """Solve Sudoku puzzle of any square box size in place using candidate bitmasks, singles propagation and MRV branching"""
+    if stats is None:
+        stats = {}
+    stats.setdefault('nodes', 0)
+    stats.setdefault('backtracks', 0)
+
+    g = geometry(len(board))
+    cells = [0] * g.cells
+    rows, cols, boxes = [0] * g.size, [0] * g.size, [0] * g.size
+    trail = []
+    for i in range(g.cells):
+        num = board[g.row[i]][g.col[i]]
+        if not num:
+            continue
+        bit = 1 << (num - 1)
+        if (rows[g.row[i]] | cols[g.col[i]] | boxes[g.box_of[i]]) & bit:
+            return False  # Givens already conflict
+        _place(g, cells, rows, cols, boxes, trail, i, bit)
+
+    if not _search(g, cells, rows, cols, boxes, trail, stats, budget):
+        return False
+    for i in range(g.cells):
+        board[g.row[i]][g.col[i]] = g.digit[cells[i]]
+    return True
+
+# --- Dancing Links engine ---
+class DancingLinks:
+    """Knuth's Algorithm X over a toroidal doubly linked list kept in flat index arrays"""
+
+    def __init__(self, n_cols):
+        # Node 0 is the root header, nodes 1..n_cols are column headers
+        n = n_cols + 1
+        self.L = [i - 1 for i in range(n)]
+        self.R = [i + 1 for i in range(n)]
+        self.L[0] = n_cols
+        self.R[n_cols] = 0
+        self.U = list(range(n))
+        self.D = list(range(n))
+        self.C = list(range(n))
+        self.S = [0] * n
+        self.row = [-1] * n
+
+    def add_row(self, row_id, cols):
+        """Append a row covering the given 1-based columns"""
+        L, R, U, D, C = self.L, self.R, self.U, self.D, self.C
+        first = -1
+        for c in cols:
+            i = len(C)
+            C.append(c)
+            self.row.append(row_id)
+            U.append(U[c])
+            D.append(c)
+            D[U[c]] = i
+            U[c] = i
+            self.S[c] += 1
+            if first < 0:
+                first = i
+                L.append(i)
+                R.append(i)
+            else:
+                L.append(L[first])
+                R.append(first)
+                R[L[first]] = i
+                L[first] = i
+        return first
+
+    def cover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[c]] = c
+        L[R[c]] = c
+
+    def search(self, limit, stats, partial, first, budget=None):
+        """Count exact covers up to limit. The rows of the first cover found are copied into first."""
+        R, L, D, C, S = self.R, self.L, self.D, self.C, self.S
+        if R[0] == 0:
+            if not first:
+                first.extend(partial)
+            return 1
+
+        # Branch on the column with the fewest remaining rows
+        c = R[0]
+        best, size = c, S[c]
+        while c and size > 1:
+            if S[c] < size:
+                best, size = c, S[c]
+            c = R[c]
+        if size == 0:
+            return 0
+
+        stats['nodes'] += 1
+        if budget is not None:
+            budget.spend()
+        self.cover(best)
+        count = 0
+        r = D[best]
+        while r != best:
+            partial.append(self.row[r])
+            j = R[r]
+            while j != r:
+                self.cover(C[j])
+                j = R[j]
+            count += self.search(limit - count, stats, partial, first, budget)
+            j = L[r]
+            while j != r:
+                self.uncover(C[j])
+                j = L[j]
+            partial.pop()
+            if count >= limit:
+                break
+            stats['backtracks'] += 1
+            r = D[r]
+        self.uncover(best)
+        return count
+
+def _dlx_search(board, limit, stats, budget=None):
+    """Run Algorithm X on the Sudoku exact-cover matrix. Returns (count, rows of the first solution)."""
+    stats.setdefault('nodes', 0)
+    stats.setdefault('backtracks', 0)
+
+    # Columns: one per cell, then row/digit, column/digit and box/digit
+    g = geometry(len(board))
+    n, cells = g.size, g.cells
+    dlx = DancingLinks(4 * cells)
+    givens = []
+    for i in range(cells):
+        num = board[g.row[i]][g.col[i]]
+        for d in ([num - 1] if num else range(n)):
+            first = dlx.add_row(i * n + d, (
+                1 + i,
+                1 + cells + g.row[i] * n + d,
+                1 + 2 * cells + g.col[i] * n + d,
+                1 + 3 * cells + g.box_of[i] * n + d,
+            ))
+            if num:
+                givens.append(first)
+
+    # Select the rows of the givens up front
+    covered = set()
+    for node in givens:
+        j = node
+        while True:
+            c = dlx.C[j]
+            if c in covered:
+                return 0, []  # Givens already conflict
+            covered.add(c)
+            dlx.cover(c)
+            j = dlx.R[j]
+            if j == node:
+                break
+
+    solution = []
+    count = dlx.search(limit, stats, [], solution, budget)
+    return count, solution
+
+def count_solutions(board, limit=2, stats=None, budget=None):
+    """Count the solutions of board, stopping once limit is reached"""
+    if stats is None:
+        stats = {}
+    count, _ = _dlx_search(board, limit, stats, budget)
+    return count
+
+def solve_dlx(board, stats=None, budget=None):
+    """Solve Sudoku puzzle in place using Dancing Links"""
+    if stats is None:
+        stats = {}
+    count, solution = _dlx_search(board, 1, stats, budget)
+    if not count:
+        return False
+    n = len(board)
+    for row_id in solution:
+        i, d = divmod(row_id, n)
+        board[i // n][i % n] = d + 1
+    return True
+
+# Engines selectable through the /solve-puzzle "engine" field. Each is called as
+# solver(board, stats=None, budget=None) and may raise BudgetExceeded. The
+# backtracking solver is kept as the reference implementation for cross-checking.
+SOLVERS = {
+    'bitmask': solve_bitmask,
+    'dlx': solve_dlx,
+    'backtracking': solve_sudoku,
+}
+DEFAULT_SOLVER = 'bitmask'
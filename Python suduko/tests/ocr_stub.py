@@ -0,0 +1,64 @@
+"""In-process stand-in for the OCR.space endpoint, for OCR_API_URL in tests"""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures', 'ocr', 'clean_easy_dense.json')
+
+def fixture():
+    """(OCR.space response, expected board line) of a recorded request"""
+    with open(FIXTURE) as f:
+        data = json.load(f)
+    return data['response'], data['expected']
+
+class StubOCRServer:
+    """Answers POSTs with scripted (status, body, delay) replies, the last one repeating.
+
+    Records every request's headers and body size, and the most requests ever in flight at once.
+    """
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+        self.in_flight = self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('content-length') or 0))
+                with stub._lock:
+                    status, reply, delay = stub.replies[min(len(stub.requests), len(stub.replies) - 1)]
+                    stub.requests.append({'headers': dict(self.headers), 'bytes': len(body)})
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                try:
+                    time.sleep(delay)
+                    data = json.dumps(reply).encode()
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client gave up waiting
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}/parse/image'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
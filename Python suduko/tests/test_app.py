@@ -0,0 +1,115 @@
+import base64
+import io
+import os
+
+import pytest
+from PIL import Image
+
+# Import-time configuration: no OCR.space key needed, no background puzzle generation
+os.environ.setdefault('OCR_ENGINE', 'local')
+os.environ.setdefault('PUZZLE_POOL_SIZE', '0')
+
+import app as flask_app
+from cache import ImageHashCache, SolutionCache
+from ocr_client import OCRClient, parse_ocr_result
+from ocr_stub import StubOCRServer, fixture
+from test_cache import PUZZLE, SOLUTION, board_of, conflicting_board
+from test_ocr_client import sudoku_image
+
+OCR_RESPONSE, OCR_EXPECTED = fixture()
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(flask_app, 'solution_cache', SolutionCache(db_path=str(tmp_path / 'solutions.db')))
+    return flask_app.app.test_client()
+
+def test_solve_puzzle(client):
+    response = client.post('/solve-puzzle', json={'board': board_of(PUZZLE)})
+    assert response.status_code == 200
+    assert response.get_json()['solution'] == board_of(SOLUTION)
+
+@pytest.mark.parametrize('first', ['backtracking', 'bitmask', 'dlx'])
+def test_conflicting_givens_rejected_for_every_engine(client, first):
+    board = conflicting_board()
+    for engine in (first, 'bitmask', 'dlx', 'backtracking'):
+        for use_cache in (True, False):
+            response = client.post('/solve-puzzle', json={'board': board, 'engine': engine, 'cache': use_cache})
+            assert response.status_code == 400, (engine, use_cache)
+            assert response.get_json() == {'error': 'No solution exists for this Sudoku puzzle.', 'conflict': [0, 8]}
+    assert flask_app.solution_cache.stats()['size'] == 0
+
+@pytest.mark.parametrize('value', [True, False, 0, -1, 'abc', 1.5])
+def test_budget_rejects_non_positive_integers(client, value):
+    response = client.post('/solve-puzzle', json={'board': board_of(PUZZLE), 'max_nodes': value})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'max_nodes must be a positive integer.'
+
+@pytest.mark.parametrize('limit', [True, False, 0, 1.5, 'two'])
+def test_analyze_rejects_non_integer_limits(client, limit):
+    response = client.post('/analyze-puzzle', json={'board': board_of(PUZZLE), 'limit': limit})
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Limit must be an integer')
+
+def test_asgi_analyze_rejects_boolean_limit():
+    from starlette.testclient import TestClient
+    import asgi
+    with TestClient(asgi.app) as asgi_client:
+        response = asgi_client.post('/analyze-puzzle', json={'board': board_of(PUZZLE), 'limit': True})
+    assert response.status_code == 400
+    assert response.json()['error'].startswith('Limit must be an integer')
+
+@pytest.fixture
+def remote(monkeypatch):
+    """The app's OCR client pointed at a stub OCR.space, with an empty image-hash cache"""
+    with StubOCRServer([(200, OCR_RESPONSE, 0)]) as stub:
+        monkeypatch.setattr(flask_app, 'OCR_API_KEY', 'key')
+        monkeypatch.setattr(flask_app, 'ocr_client', OCRClient(stub.url, 'key', retries=0))
+        monkeypatch.setattr(flask_app, 'ocr_cache', ImageHashCache())
+        yield stub
+
+def png_bytes(img):
+    buffer = io.BytesIO()
+    img.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+IMAGE = png_bytes(sudoku_image(OCR_EXPECTED))
+OCR_GRID = parse_ocr_result(OCR_RESPONSE['ParsedResults'][0])
+
+@pytest.mark.parametrize('send', ['multipart', 'binary', 'base64', 'data_url'])
+def test_remote_ocr_upload_paths(client, remote, send):
+    encoded = base64.b64encode(IMAGE).decode()
+    if send == 'multipart':
+        response = client.post('/process-image', data={'image': (io.BytesIO(IMAGE), 'grid.png'), 'engine': 'remote'})
+    elif send == 'binary':
+        response = client.post('/process-image?engine=remote', data=IMAGE, content_type='image/png')
+    elif send == 'base64':
+        response = client.post('/process-image', json={'image': encoded, 'engine': 'remote'})
+    else:
+        response = client.post('/process-image', json={'image': f'data:image/png;base64,{encoded}', 'engine': 'remote'})
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body['grid'] == OCR_GRID and not body['cached']
+    upload = body['upload']
+    assert upload['bytes_in'] == len(IMAGE)
+    assert 0 < upload['bytes_forwarded'] < remote.requests[0]['bytes']  # the file part, without the form around it
+    assert upload['bytes_saved'] == (len(IMAGE) + 2) // 3 * 4 - upload['bytes_forwarded']
+
+def test_remote_ocr_serves_near_duplicates_from_the_cache(client, remote):
+    client.post('/process-image?engine=remote', data=IMAGE, content_type='image/png')
+    buffer = io.BytesIO()
+    sudoku_image(OCR_EXPECTED).save(buffer, 'JPEG', quality=70)
+    response = client.post('/process-image?engine=remote', data=buffer.getvalue(), content_type='image/jpeg')
+    body = response.get_json()
+    assert body['cached'] and body['grid'] == OCR_GRID
+    assert len(remote.requests) == 1
+
+def test_decompression_bomb_is_a_bad_request(client, remote, monkeypatch):
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 10000)  # The 360x360 image is over twice this
+    response = client.post('/process-image?engine=remote', data=IMAGE, content_type='image/png')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Could not decode image.'
+    assert remote.requests == []
+
+def test_undecodable_upload_is_a_bad_request(client, remote):
+    response = client.post('/process-image?engine=remote', data=b'not an image', content_type='application/octet-stream')
+    assert response.status_code == 400
@@ -0,0 +1,75 @@
+import gzip
+import os
+import re
+
+import pytest
+
+os.environ.setdefault('OCR_ENGINE', 'local')
+os.environ.setdefault('PUZZLE_POOL_SIZE', '0')
+
+import app as flask_app
+
+@pytest.fixture
+def client():
+    return flask_app.app.test_client()
+
+def fingerprinted(client, name):
+    html = client.get('/', headers={'Accept-Encoding': 'identity'}).get_data(as_text=True)
+    stem, ext = os.path.splitext(name)
+    match = re.search(rf'(?:src|href)="({re.escape(stem)}\.[0-9a-f]{{10}}{re.escape(ext)})"', html)
+    assert match, f'{name} is not fingerprinted in index.html'
+    return match.group(1)
+
+@pytest.mark.parametrize('name', ['script.js', 'style.css'])
+def test_fingerprinted_urls_are_immutable(client, name):
+    url = fingerprinted(client, name)
+    response = client.get(f'/{url}')
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    with open(os.path.join(flask_app.assets.root, name), 'rb') as f:
+        assert response.get_data() == f.read()
+    plain = client.get(f'/{name}')
+    assert plain.headers['Cache-Control'] == 'no-cache'
+
+def test_root_is_revalidated(client):
+    response = client.get('/')
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert response.headers['Content-Type'] == 'text/html; charset=utf-8'
+
+@pytest.mark.parametrize('path', ['', 'script.js', 'style.css'])
+def test_strong_etag_answers_304(client, path):
+    first = client.get(f'/{path}', headers={'Accept-Encoding': 'gzip'})
+    etag = first.headers['ETag']
+    assert re.fullmatch(r'"[0-9a-f]{16}-gzip"', etag)
+    again = client.get(f'/{path}', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.get_data() == b''
+    assert again.headers['ETag'] == etag
+    other = client.get(f'/{path}', headers={'Accept-Encoding': 'identity', 'If-None-Match': etag})
+    assert other.status_code == 200  # a different representation has a different tag
+
+def test_gzip_negotiation(client):
+    response = client.get('/script.js', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    identity = client.get('/script.js', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in identity.headers
+    assert gzip.decompress(response.get_data()) == identity.get_data()
+    refused = client.get('/script.js', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in refused.headers
+
+def test_brotli_preferred_when_accepted(client):
+    brotli = pytest.importorskip('brotli')
+    response = client.get('/script.js', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    identity = client.get('/script.js', headers={'Accept-Encoding': 'identity'})
+    assert brotli.decompress(response.get_data()) == identity.get_data()
+    no_br = client.get('/script.js', headers={'Accept-Encoding': 'br;q=0, gzip'})
+    assert no_br.headers['Content-Encoding'] == 'gzip'
+
+@pytest.mark.parametrize('path', ['.env', 'app.py', 'asgi.py', 'requirements.txt', 'tests/test_assets.py', '../app.py', 'static/app.py'])
+def test_files_outside_the_asset_list_are_not_found(client, path):
+    response = client.get(f'/{path}')
+    assert response.status_code == 404
+    assert response.get_json() == {'error': 'Not found.'}
@@ -0,0 +1,54 @@
+import json
+from concurrent.futures import Future
+
+import pytest
+
+import batch
+from batch import parse_batch_text, submit_batch
+
+EASY = '530070000600195000098000060800060003400803001700020006060000280000419005000080079'
+
+@pytest.fixture
+def flags(monkeypatch):
+    flags = bytearray(batch.MAX_CONCURRENT_BATCHES)
+    monkeypatch.setattr(batch, '_cancel_flags', flags)
+    return flags
+
+def running_future():
+    future = Future()
+    future.set_running_or_notify_cancel()  # Running futures can no longer be cancelled
+    return future
+
+def test_slot_stays_taken_while_a_cancelled_worker_runs(flags):
+    slot = batch._free_slots.pop()
+    future = running_future()
+    futures = {future: 1}
+    batch._batches['test'] = (slot, futures)
+    lines = batch._stream('test', 'bitmask', 2, futures, {0: {'index': 0, 'error': 'bad'}}, 'input', False)
+    assert json.loads(next(lines))['index'] == 0
+    lines.close()  # The client went away mid-batch
+
+    assert flags[slot] == 1
+    assert slot not in batch._free_slots  # The worker could still read the flag
+    future.set_result((False, None, 0.0, {}, 'cancelled'))
+    assert slot in batch._free_slots
+
+def test_slot_released_after_every_running_future(flags):
+    slot = batch._free_slots.pop()
+    futures = [running_future(), running_future()]
+    finished = Future()
+    finished.set_result(None)
+    batch._release_slot(slot, futures + [finished])
+    futures[0].set_result(None)
+    assert slot not in batch._free_slots
+    futures[1].set_result(None)
+    assert batch._free_slots.count(slot) == 1
+
+def test_batch_solves_and_frees_its_slot():
+    free = len(batch._free_slots)
+    jobs = parse_batch_text(f'{EASY}\nnot a puzzle\n')
+    _, lines = submit_batch(jobs, 'bitmask', as_text=True, max_workers=1)
+    results = [json.loads(line) for line in lines]
+    assert results[0]['solution'].startswith('534678912')
+    assert 'error' in results[1]
+    assert len(batch._free_slots) == free
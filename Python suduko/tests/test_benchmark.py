@@ -0,0 +1,29 @@
+from benchmark import compare
+
+def results(p50_ms, nodes_total, backtracks_total=10, timeouts=0, per_sec=1000.0, accuracy=1.0):
+    return {
+        'solvers': {'hard': {'dlx': {
+            'solved': 10 - timeouts, 'timeouts': timeouts, 'p50_ms': p50_ms, 'total_ms': p50_ms * 10,
+            'nodes_total': nodes_total, 'backtracks_total': backtracks_total,
+        }}},
+        'ocr_parse': {'fixtures': 6, 'per_sec': per_sec, 'accuracy': accuracy},
+    }
+
+BASELINE = results(1.0, 1000)
+
+def test_timing_is_advisory_by_default():
+    problems, advisories = compare(results(3.0, 1000, per_sec=100.0), BASELINE, 0.25)
+    assert problems == []
+    assert len(advisories) == 3
+
+def test_gated_timing_ignores_slowdowns_under_the_floor():
+    problems, _ = compare(results(3.0, 1000), BASELINE, 0.25, gate_timing=True)
+    assert problems == []
+    problems, _ = compare(results(100.0, 1000), BASELINE, 0.25, gate_timing=True)
+    assert [p.split(':')[1].split()[0] for p in problems] == ['p50_ms', 'total_ms']
+
+def test_counts_and_accuracy_always_gate():
+    problems, _ = compare(results(1.0, 1300, backtracks_total=20, timeouts=1, accuracy=0.9), BASELINE, 0.25)
+    assert len(problems) == 5  # timeouts, solved, nodes, backtracks, accuracy
+    problems, _ = compare(results(1.0, 1200), BASELINE, 0.25)
+    assert problems == []
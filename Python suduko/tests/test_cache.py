@@ -0,0 +1,74 @@
+import sqlite3
+from functools import partial
+
+from cache import SolutionCache, canonicalize, flatten, unflatten
+from solver import SOLVERS, is_solution
+
+PUZZLE = '530070000600195000098000060800060003400803001700020006060000280000419005000080079'
+SOLUTION = '534678912672195348198342567859761423426853791713924856961537284287419635345286179'
+
+def board_of(line):
+    return [[int(ch) for ch in line[r * 9:r * 9 + 9]] for r in range(9)]
+
+def conflicting_board():
+    board = board_of(PUZZLE)
+    board[0][8] = 5  # Row 0 already has a 5
+    return board
+
+def test_solution_fixture_is_valid():
+    assert is_solution(board_of(PUZZLE), board_of(SOLUTION))
+
+def test_isomorphic_puzzle_hits(tmp_path):
+    cache = SolutionCache(db_path=str(tmp_path / 'solutions.db'))
+    board = board_of(PUZZLE)
+    solution, hit = cache.solve(board, SOLVERS['bitmask'])
+    assert not hit and solution == board_of(SOLUTION)
+    transposed = [list(row) for row in zip(*board)]
+    solution, hit = cache.solve(transposed, SOLVERS['bitmask'])
+    assert hit and is_solution(transposed, solution)
+
+def test_conflicting_givens_never_reach_the_cache(tmp_path):
+    path = tmp_path / 'solutions.db'
+    cache = SolutionCache(db_path=str(path))
+    board = conflicting_board()
+    for engine in ('backtracking', 'bitmask', 'dlx'):
+        solution, hit = cache.solve(board, partial(SOLVERS[engine], stats={}))
+        assert solution is None and not hit, engine
+    assert cache.stats()['size'] == 0
+    assert sqlite3.connect(path).execute('SELECT COUNT(*) FROM solutions').fetchone()[0] == 0
+
+def test_invalid_solution_is_refused():
+    cache = SolutionCache()
+    board = board_of(PUZZLE)
+    wrong = board_of(SOLUTION)
+    wrong[0][0], wrong[0][1] = wrong[0][1], wrong[0][0]  # Breaks a given and two columns
+    assert not cache.store(board, wrong)
+    assert cache.lookup(board) == (False, None)
+    assert cache.solve(board, lambda b: b.__setitem__(0, wrong[0]) or True) == (None, False)
+
+def test_poisoned_disk_entry_is_dropped(tmp_path):
+    # A database written before solutions were verified may hold a grid that breaks the rules
+    path = str(tmp_path / 'solutions.db')
+    SolutionCache(db_path=path)
+    board = board_of(PUZZLE)
+    key, perm, labels = canonicalize(board)
+    bogus = bytes([1] * 81)
+    with sqlite3.connect(path) as db:
+        db.execute('INSERT INTO solutions VALUES (?, ?)', (key, bogus))
+    cache = SolutionCache(db_path=path)
+    assert cache.lookup(board) == (False, None)
+    assert sqlite3.connect(path).execute('SELECT COUNT(*) FROM solutions').fetchone()[0] == 0
+    solution, hit = cache.solve(board, SOLVERS['dlx'])
+    assert not hit and solution == board_of(SOLUTION)
+
+def test_unsolvable_is_remembered():
+    cache = SolutionCache()
+    board = [[0] * 9 for _ in range(9)]
+    board[0][1:] = range(1, 9)
+    board[1][0] = 9
+    assert cache.solve(board, SOLVERS['bitmask']) == (None, False)
+    assert cache.solve(board, SOLVERS['bitmask']) == (None, True)
+
+def test_flatten_round_trip():
+    board = board_of(PUZZLE)
+    assert unflatten(flatten(board)) == board
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+import time
+
+from generator import PuzzlePool, generate_puzzle
+from solver import count_solutions, is_solution
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_generated_puzzle_is_unique_and_rated():
+    puzzle, solution, rating, _ = generate_puzzle('easy', seed=1)
+    assert rating['difficulty'] == 'easy'
+    assert count_solutions(puzzle, 2) == 1
+    assert is_solution(puzzle, solution)
+
+def test_pool_starts_on_first_take_and_stops():
+    pool = PuzzlePool(target=1, workers=1)
+    assert not pool.stats()['running']
+    assert pool.take('easy') is None  # Starts the pool; nothing is ready yet
+    assert pool.stats()['running']
+    deadline = time.monotonic() + 60
+    while not pool.stats()['pools']['easy']['depth'] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    pool.stop()
+    assert not pool.stats()['running']
+    assert pool.take('easy') is not None
+    pool._thread.join(5)
+    assert not pool._thread.is_alive()
+
+def test_app_import_leaves_pool_stopped():
+    # A fresh interpreter: the test app module is imported with the pool disabled
+    env = {**os.environ, 'OCR_ENGINE': 'local', 'PUZZLE_POOL_SIZE': '2'}
+    code = 'import app, multiprocessing; print(app.puzzle_pool.stats()["running"], len(multiprocessing.active_children()))'
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ['False', '0']
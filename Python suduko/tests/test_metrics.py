@@ -0,0 +1,101 @@
+import os
+import re
+
+import pytest
+
+os.environ.setdefault('OCR_ENGINE', 'local')
+os.environ.setdefault('PUZZLE_POOL_SIZE', '0')
+
+import app as flask_app
+import metrics
+from test_cache import PUZZLE, board_of
+
+SAMPLE = re.compile(r'([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{((?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*",?)*)\})? (\S+)')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\\n]|\\.)*)"')
+
+def parse(text):
+    """Check text against the Prometheus exposition format; returns {family: (type, [(name, labels, value)])}"""
+    assert text.endswith('\n')
+    families, current = {}, None
+    for line in text.splitlines():
+        if line.startswith('# HELP '):
+            current = line.split()[2]
+            assert current not in families, f'{current} declared twice'
+        elif line.startswith('# TYPE '):
+            _, _, name, kind = line.split()
+            assert name == current and kind in ('counter', 'gauge', 'histogram')
+            families[name] = (kind, [])
+        else:
+            match = SAMPLE.fullmatch(line)
+            assert match, f'not a sample line: {line!r}'
+            name, labels, value = match.groups()
+            kind, samples = families[current]
+            suffixes = ('_bucket', '_sum', '_count') if kind == 'histogram' else ('',)
+            assert any(name == current + suffix for suffix in suffixes), f'{name} outside its family {current}'
+            float(value.replace('+Inf', 'inf'))
+            samples.append((name, dict(LABEL.findall(labels or '')), value))
+    return families
+
+def value(families, family, name, **labels):
+    for sample, sample_labels, v in families[family][1]:
+        if sample == name and all(sample_labels.get(k) == str(want) for k, want in labels.items()):
+            return float(v)
+    return 0.0
+
+@pytest.fixture
+def client():
+    return flask_app.app.test_client()
+
+def test_metrics_endpoint_is_valid_prometheus_text(client):
+    client.get('/cache-stats')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    families = parse(response.get_data(as_text=True))
+    assert families['sudoku_solves_total'][0] == 'counter'
+    kind, samples = families['sudoku_http_request_duration_seconds']
+    assert kind == 'histogram'
+    buckets = [float(v) for name, labels, v in samples if name.endswith('_bucket') and labels['route'] == '/cache-stats']
+    assert buckets == sorted(buckets) and buckets[-1] == value(
+        families, 'sudoku_http_request_duration_seconds', 'sudoku_http_request_duration_seconds_count', route='/cache-stats')
+
+def test_label_values_are_escaped():
+    counter = metrics.Counter('test_escape_total', 'Escaping check.', ('name',))
+    try:
+        counter.inc(name='a"b\\c\nd')
+        families = parse(metrics.render())
+        assert families['test_escape_total'][1] == [('test_escape_total', {'name': 'a\\"b\\\\c\\nd'}, '1')]
+    finally:
+        metrics._metrics.remove(counter)
+
+@pytest.mark.parametrize('engine', ['bitmask', 'dlx'])
+def test_solve_increments_engine_counters(client, engine, monkeypatch):
+    monkeypatch.setattr(flask_app, 'solution_cache', None)
+    before = parse(client.get('/metrics').get_data(as_text=True))
+    response = client.post('/solve-puzzle', json={'board': board_of(PUZZLE), 'engine': engine})
+    assert response.status_code == 200
+    after = parse(client.get('/metrics').get_data(as_text=True))
+    solves = ('sudoku_solves_total', 'sudoku_solves_total')
+    assert value(after, *solves, engine=engine, outcome='solved') == value(before, *solves, engine=engine, outcome='solved') + 1
+    count = ('sudoku_solve_nodes', 'sudoku_solve_nodes_count')
+    assert value(after, *count, engine=engine) == value(before, *count, engine=engine) + 1
+    nodes = ('sudoku_solver_nodes_total', 'sudoku_solver_nodes_total')
+    assert value(after, *nodes, engine=engine) >= value(before, *nodes, engine=engine)
+
+def test_profile_included_then_busy_while_another_runs(client, monkeypatch):
+    monkeypatch.setattr(flask_app, 'PROFILING_ENABLED', True)
+    response = client.get('/cache-stats', headers={'X-Profile': '5'})
+    assert response.headers['X-Profile'] == 'included'
+    assert 'function calls' in response.get_json()['profile']
+
+    # Another request holds the profiler: this one is served unprofiled
+    other = metrics.RequestProfile()
+    assert other.start()
+    try:
+        response = client.get('/cache-stats', headers={'X-Profile': '5'})
+    finally:
+        other.stop()
+    assert response.status_code == 200
+    assert response.headers['X-Profile'] == 'busy'
+    assert 'profile' not in response.get_json()
+    assert client.get('/cache-stats', headers={'X-Profile': '5'}).headers['X-Profile'] == 'included'
@@ -0,0 +1,137 @@
+import asyncio
+import io
+import threading
+import time
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+import cache
+from cache import ImageHashCache, image_hash
+from ocr_client import AsyncOCRClient, OCRBusyError, OCRClient, OCRRequestError, OCRTimeoutError
+from ocr_stub import StubOCRServer, fixture
+
+RESPONSE, EXPECTED = fixture()
+OK = (200, RESPONSE, 0)
+UNAVAILABLE = (503, {'error': 'busy'}, 0)
+
+def sync_parse(url, **options):
+    return OCRClient(url, 'key', backoff=0.01, **options).parse_image({'language': 'eng'})
+
+def async_parse(url, **options):
+    async def run():
+        client = AsyncOCRClient(url, 'key', backoff=0.01, **options)
+        try:
+            return await client.parse_image({'language': 'eng'})
+        finally:
+            await client.aclose()
+    return asyncio.run(run())
+
+PARSERS = pytest.mark.parametrize('parse', [sync_parse, async_parse], ids=['sync', 'async'])
+
+@PARSERS
+def test_retries_with_backoff_until_success(parse):
+    with StubOCRServer([UNAVAILABLE, UNAVAILABLE, OK]) as stub:
+        assert parse(stub.url, retries=3) == RESPONSE
+    assert len(stub.requests) == 3
+    assert stub.requests[0]['headers']['apikey'] == 'key'
+
+@PARSERS
+def test_gives_up_after_the_last_retry(parse):
+    with StubOCRServer([UNAVAILABLE]) as stub:
+        with pytest.raises(OCRRequestError):
+            parse(stub.url, retries=2)
+    assert len(stub.requests) == 3
+
+@PARSERS
+def test_slow_service_maps_to_timeout(parse):
+    with StubOCRServer([(200, RESPONSE, 1.0)]) as stub:
+        start = time.perf_counter()
+        with pytest.raises(OCRTimeoutError):
+            parse(stub.url, timeout=0.2, retries=0)
+    assert time.perf_counter() - start < 0.9
+
+def test_sync_concurrency_cap():
+    with StubOCRServer([(200, RESPONSE, 0.1)]) as stub:
+        client = OCRClient(stub.url, 'key', max_concurrency=2)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(client.parse_image({}))) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert results == [RESPONSE] * 6
+    assert stub.peak_in_flight == 2
+
+def test_async_concurrency_cap():
+    async def run(url):
+        client = AsyncOCRClient(url, 'key', max_concurrency=2)
+        try:
+            return await asyncio.gather(*(client.parse_image({}) for _ in range(6)))
+        finally:
+            await client.aclose()
+
+    with StubOCRServer([(200, RESPONSE, 0.1)]) as stub:
+        assert asyncio.run(run(stub.url)) == [RESPONSE] * 6
+    assert stub.peak_in_flight == 2
+
+def test_sync_busy_when_no_slot_frees_up():
+    with StubOCRServer([OK]) as stub:
+        client = OCRClient(stub.url, 'key', timeout=0.1, max_concurrency=1)
+        client._slots.acquire()
+        with pytest.raises(OCRBusyError):
+            client.parse_image({})
+    assert stub.requests == []
+
+def test_async_busy_when_no_slot_frees_up():
+    async def run(url):
+        client = AsyncOCRClient(url, 'key', timeout=0.1, max_concurrency=1)
+        await client._slots.acquire()
+        try:
+            await client.parse_image({})
+        finally:
+            await client.aclose()
+
+    with StubOCRServer([OK]) as stub:
+        with pytest.raises(OCRBusyError):
+            asyncio.run(run(stub.url))
+    assert stub.requests == []
+
+def sudoku_image(digits, quality=None):
+    """A 360x360 grid with digits drawn into cells; JPEG-recompressed if quality is given"""
+    img = Image.new('L', (360, 360), 255)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=28)
+    for k in range(10):
+        width = 3 if k % 3 == 0 else 1
+        draw.line([(k * 40, 0), (k * 40, 360)], fill=0, width=width)
+        draw.line([(0, k * 40), (360, k * 40)], fill=0, width=width)
+    for i, ch in enumerate(digits):
+        if ch != '0':
+            r, c = divmod(i, 9)
+            draw.text((c * 40 + 20, r * 40 + 20), ch, fill=0, font=font, anchor='mm')
+    if quality:
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG', quality=quality)
+        img = Image.open(io.BytesIO(buffer.getvalue()))
+    return img
+
+def test_near_duplicate_image_hits_the_cache():
+    ocr_cache = ImageHashCache()
+    ocr_cache.put(image_hash(sudoku_image(EXPECTED)), [[1] * 9] * 9)
+    assert ocr_cache.get(image_hash(sudoku_image(EXPECTED, quality=60))) == [[1] * 9] * 9
+    other = EXPECTED[::-1]
+    assert ocr_cache.get(image_hash(sudoku_image(other))) is None
+    assert (ocr_cache.hits, ocr_cache.misses) == (1, 1)
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    ocr_cache = ImageHashCache(ttl=60)
+    key = image_hash(sudoku_image(EXPECTED))
+    ocr_cache.put(key, [[2] * 9] * 9)
+    now[0] += 59
+    assert ocr_cache.get(key) is not None
+    now[0] += 2
+    assert ocr_cache.get(key) is None
+    assert ocr_cache.stats()['size'] == 0
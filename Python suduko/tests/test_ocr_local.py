@@ -0,0 +1,96 @@
+import glob
+import io
+import os
+import random
+
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+np = pytest.importorskip('numpy')
+from PIL import Image, ImageDraw, ImageFont
+
+import ocr_local
+
+ACCURACY_THRESHOLD = 0.98  # Over every rendered cell, empty ones included
+FONT_THRESHOLD = 0.95  # For each font on its own
+FONT_DIRS = ('/usr/share/fonts', '/usr/local/share/fonts', os.path.expanduser('~/.fonts'), '/Library/Fonts', 'C:/Windows/Fonts')
+# Text faces worth checking when installed; symbol and emoji fonts have no usable digits
+FONT_FAMILIES = ('DejaVu', 'Liberation', 'Free', 'Noto', 'Ubuntu', 'Roboto', 'OpenSans', 'Lato', 'SourceCodePro', 'arial', 'times', 'cour', 'verdana')
+HERSHEY_FONTS = ('FONT_HERSHEY_SIMPLEX', 'FONT_HERSHEY_DUPLEX', 'FONT_HERSHEY_COMPLEX', 'FONT_HERSHEY_TRIPLEX')
+
+def installed_fonts(limit=16):
+    found = []
+    for directory in FONT_DIRS:
+        for path in sorted(glob.glob(os.path.join(directory, '**', '*.ttf'), recursive=True)):
+            name = os.path.basename(path)
+            if name.startswith(FONT_FAMILIES) and 'Oblique' not in name and 'Italic' not in name:
+                found.append(path)
+    return found[:limit]
+
+def digit_grid(seed):
+    """9x9 grid with every digit several times and about a fifth of the cells empty"""
+    rng = random.Random(seed)
+    return [[rng.choice([0, 1, 2, 3, 4, 5, 6, 7, 8, 9]) for _ in range(9)] for _ in range(9)]
+
+def grid_lines(draw_line, cell, pad):
+    for i in range(10):
+        p = pad + i * cell
+        width = 4 if i % 3 == 0 else 2
+        draw_line((pad, p), (pad + 9 * cell, p), width)
+        draw_line((p, pad), (p, pad + 9 * cell), width)
+
+def render_truetype(font_path, grid, cell, fraction, pad=20):
+    side = cell * 9 + 2 * pad
+    img = Image.new('L', (side, side), 255)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.truetype(font_path, int(cell * fraction))
+    grid_lines(lambda a, b, width: draw.line([a, b], fill=0, width=width), cell, pad)
+    for r, row in enumerate(grid):
+        for c, digit in enumerate(row):
+            if digit:
+                draw.text((pad + c * cell + cell / 2, pad + r * cell + cell / 2), str(digit), font=font, fill=0, anchor='mm')
+    buffer = io.BytesIO()
+    img.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+def render_hershey(font, grid, cell=50, pad=20):
+    side = cell * 9 + 2 * pad
+    img = np.full((side, side), 255, np.uint8)
+    grid_lines(lambda a, b, width: cv2.line(img, a, b, 0, width), cell, pad)
+    for r, row in enumerate(grid):
+        for c, digit in enumerate(row):
+            if digit:
+                (w, h), _ = cv2.getTextSize(str(digit), font, 1.2, 2)
+                cv2.putText(img, str(digit), (pad + c * cell + (cell - w) // 2, pad + r * cell + (cell + h) // 2), font, 1.2, 0, 2, cv2.LINE_AA)
+    return cv2.imencode('.png', img)[1].tobytes()
+
+def accuracy(images):
+    """(correct cells, cells) of local_ocr over (expected grid, image bytes) pairs"""
+    correct = total = 0
+    for grid, data in images:
+        read, _ = ocr_local.local_ocr(data)
+        correct += sum(a == b for want, got in zip(grid, read) for a, b in zip(want, got))
+        total += 81
+    return correct, total
+
+def test_bundled_model_loads():
+    assert os.path.exists(ocr_local.MODEL_PATH)
+    features, labels = ocr_local.load_model(ocr_local.MODEL_PATH)
+    assert set(labels.tolist()) == set(range(1, 10))
+    assert np.allclose(np.linalg.norm(features, axis=1), 1, atol=1e-4)
+
+def test_rendered_digits_read_back():
+    scores = {}
+    for name in HERSHEY_FONTS:
+        scores[name] = accuracy((digit_grid(seed), render_hershey(getattr(cv2, name), digit_grid(seed))) for seed in range(2))
+    for path in installed_fonts():
+        layouts = ((50, 0.6), (40, 0.7), (64, 0.5))  # Cell px and digit height as a fraction of the cell
+        scores[os.path.basename(path)] = accuracy(
+            (digit_grid(seed), render_truetype(path, digit_grid(seed), cell, fraction))
+            for seed, (cell, fraction) in enumerate(layouts)
+        )
+    correct = sum(c for c, _ in scores.values())
+    total = sum(t for _, t in scores.values())
+    weak = {name: round(c / t, 3) for name, (c, t) in scores.items() if c / t < FONT_THRESHOLD}
+    assert not weak, f'Fonts below {FONT_THRESHOLD:.0%}: {weak}'
+    assert correct / total >= ACCURACY_THRESHOLD, f'{correct}/{total} cells read correctly'
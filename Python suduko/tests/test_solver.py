@@ -0,0 +1,75 @@
+import glob
+import os
+
+import pytest
+
+from batch import parse_batch_text
+from solver import SOLVERS, BudgetExceeded, SearchBudget, count_solutions
+
+CORPORA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'corpora')
+# Naive backtracking needs up to ~30 s on the hard corpora; past this it is skipped, not failed
+BACKTRACKING_NODES = 20000
+
+def corpus_boards():
+    boards = []
+    for path in sorted(glob.glob(os.path.join(CORPORA_DIR, '*.txt'))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path) as f:
+            for i, (board, error) in enumerate(parse_batch_text(f.read())):
+                assert error is None, f'{path}: {error}'
+                boards.append(pytest.param(board, id=f'{name}-{i}'))
+    return boards
+
+def assert_solves(board, solution):
+    n = len(board)
+    digits = set(range(1, n + 1))
+    box = int(n ** 0.5)
+    for r in range(n):
+        assert set(solution[r]) == digits
+        assert {solution[c][r] for c in range(n)} == digits
+    for br in range(0, n, box):
+        for bc in range(0, n, box):
+            assert {solution[r][c] for r in range(br, br + box) for c in range(bc, bc + box)} == digits
+    for r in range(n):
+        for c in range(n):
+            if board[r][c]:
+                assert solution[r][c] == board[r][c]
+
+@pytest.mark.parametrize('board', corpus_boards())
+def test_engines_agree_on_corpus(board):
+    assert count_solutions(board) == 1
+    solutions = {}
+    for engine, solver in SOLVERS.items():
+        work = [row[:] for row in board]
+        budget = SearchBudget(max_nodes=BACKTRACKING_NODES) if engine == 'backtracking' else None
+        try:
+            assert solver(work, {}, budget)
+        except BudgetExceeded:
+            continue
+        assert_solves(board, work)
+        solutions[engine] = work
+    assert solutions['bitmask'] == solutions['dlx']
+    if 'backtracking' in solutions:
+        assert solutions['backtracking'] == solutions['bitmask']
+
+@pytest.mark.parametrize('engine', list(SOLVERS))
+def test_engines_report_unsolvable(engine):
+    # Consistent givens, but (0, 0) has no candidate left: 1-8 in its row, 9 in its column
+    board = [[0] * 9 for _ in range(9)]
+    board[0][1:] = range(1, 9)
+    board[1][0] = 9
+    assert not SOLVERS[engine]([row[:] for row in board], {})
+
+@pytest.mark.parametrize('engine', ['bitmask', 'dlx'])
+def test_16x16_engines_agree(engine):
+    board = [[0] * 16 for _ in range(16)]
+    board[0][:4] = [1, 2, 3, 4]
+    work = [row[:] for row in board]
+    assert SOLVERS[engine](work, {})
+    assert_solves(board, work)
+
+def test_budget_stops_search():
+    board = [[0] * 9 for _ in range(9)]
+    with pytest.raises(BudgetExceeded) as e:
+        SOLVERS['backtracking']([row[:] for row in board], {}, SearchBudget(max_nodes=10))
+    assert e.value.reason == 'nodes'
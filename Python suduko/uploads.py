@@ -0,0 +1,80 @@
+import base64
+import binascii
+import io
+import tempfile
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+SPOOL_MAX_SIZE = 1024 * 1024  # Uploads above this spill from memory to a temp file
+CHUNK_SIZE = 64 * 1024
+
+def read_upload(req):
+    """Return the uploaded image as a binary file object, whatever way it was sent.
+
+    Accepts multipart/form-data (an "image" file field), a raw binary body
+    (image/* or application/octet-stream), or the original JSON
+    {"image": "<base64>"}. Raises ValueError if no image is present.
+    """
+    if req.mimetype == 'multipart/form-data':
+        upload = req.files.get('image')
+        if upload is None or not upload.filename:
+            raise ValueError('No image provided')
+        # Werkzeug has already spooled the part to memory or a temp file
+        return upload.stream
+
+    if req.is_json:
+        return decode_base64_image((req.get_json() or {}).get('image'))
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    while True:
+        chunk = req.stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        spool.write(chunk)
+    if not spool.tell():
+        raise ValueError('No image provided')
+    spool.seek(0)
+    return spool
+
+def decode_base64_image(image):
+    """Wrap a base64 string or data URL as a binary file object"""
+    if not image or not isinstance(image, str):
+        raise ValueError('No image provided')
+    if image.startswith('data:'):
+        image = image.split(',', 1)[1]
+    try:
+        return io.BytesIO(base64.b64decode(image))
+    except (binascii.Error, ValueError):
+        raise ValueError('Could not decode image.')
+
+def upload_size(upload):
+    upload.seek(0, io.SEEK_END)
+    size = upload.tell()
+    upload.seek(0)
+    return size
+
+def load_grayscale(upload, max_edge=1024):
+    """Decode an upload as a grayscale image no larger than max_edge on its longer side.
+    Raises ValueError if the upload is not an image.
+    """
+    try:
+        with Image.open(upload) as img:
+            img.draft('L', (max_edge, max_edge))  # JPEG can decode straight at a reduced scale
+            img = ImageOps.exif_transpose(img).convert('L')
+            img.thumbnail((max_edge, max_edge), Image.LANCZOS, reducing_gap=2.0)
+            return img
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        raise ValueError('Could not decode image.')
+    finally:
+        upload.seek(0)
+
+def encode_for_ocr(img, jpeg_quality=85):
+    """Re-encode a grayscale image as whichever of PNG or JPEG comes out smaller.
+    Returns (data, mimetype, filetype).
+    """
+    png, jpeg = io.BytesIO(), io.BytesIO()
+    img.save(png, 'PNG')
+    img.save(jpeg, 'JPEG', quality=jpeg_quality)
+    if png.tell() <= jpeg.tell():
+        return png.getvalue(), 'image/png', 'PNG'
+    return jpeg.getvalue(), 'image/jpeg', 'JPG'